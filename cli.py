@@ -0,0 +1,150 @@
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+from typing import List
+from domain.exceptions import DomainError
+
+IMPORTERS = ("customers", "products")
+REBUILDS = ("customer-stats", "order-totals")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Warehouse data import/export")
+    parser.add_argument("--database")
+    parser.add_argument("--chunk-size", type=int)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="upsert CSV or JSONL rows")
+    import_parser.add_argument("entity", choices=IMPORTERS)
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"])
+
+    export_parser = commands.add_parser("export", help="write orders as JSONL")
+    export_parser.add_argument("entity", choices=["orders"])
+    export_parser.add_argument("path", nargs="?", default="-")
+
+    report_parser = commands.add_parser(
+        "report", help="order totals and per-customer summaries in parallel"
+    )
+    report_parser.add_argument("--workers", type=int)
+    report_parser.add_argument("--shard-size", type=int)
+
+    rebuild_parser = commands.add_parser(
+        "rebuild", help="recompute derived tables from orders"
+    )
+    rebuild_parser.add_argument("entity", choices=REBUILDS)
+
+    check_parser = commands.add_parser(
+        "check", help="report orders whose stored total drifted from their lines"
+    )
+    check_parser.add_argument("entity", choices=["order-totals"])
+    check_parser.add_argument("--tolerance", type=float)
+    return parser
+
+
+def report(args: argparse.Namespace) -> int:
+    # pylint: disable=import-outside-toplevel
+    from infrastructure.database import DATABASE_URL
+    from infrastructure.parallel import SHARD_SIZE, run_batch_checkout
+
+    result = run_batch_checkout(
+        args.database or DATABASE_URL, args.workers, args.shard_size or SHARD_SIZE
+    )
+    summary = {
+        "orders": len(result.totals),
+        "total": result.grand_total,
+        "customers": {
+            customer_id: {"orders": s.orders, "total": s.total}
+            for customer_id, s in sorted(result.customers.items())
+        },
+    }
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+def rebuild(engine, entity: str) -> int:
+    # pylint: disable=import-outside-toplevel
+    from domain.services import CustomerService, OrderService
+    from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+    try:
+        with factory() as uow:
+            if entity == "order-totals":
+                return OrderService(uow).rebuild_totals()
+            return CustomerService(uow).rebuild_stats()
+    finally:
+        factory.remove()
+
+
+def check_order_totals(engine, tolerance: float | None) -> int:
+    # pylint: disable=import-outside-toplevel
+    from domain.repositories import TOTAL_TOLERANCE
+    from domain.services import OrderService
+    from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+    try:
+        with factory() as uow:
+            drifts = OrderService(uow).total_drift(
+                TOTAL_TOLERANCE if tolerance is None else tolerance
+            )
+    finally:
+        factory.remove()
+    for drift in drifts:
+        record = {
+            "id_": drift.order_id,
+            "stored": drift.stored,
+            "computed": drift.computed,
+        }
+        print(json.dumps(record))
+    print(f"drifted order-totals: {len(drifts)}", file=sys.stderr)
+    return 1 if drifts else 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "report":
+        return report(args)
+    # pylint: disable=import-outside-toplevel
+    from infrastructure import transfer
+    from infrastructure.database import DATABASE_URL, create_database_engine
+    from infrastructure.schema import ensure_schema
+
+    engine = create_database_engine(args.database or DATABASE_URL)
+    ensure_schema(engine)
+    chunk_size = args.chunk_size or transfer.CHUNK_SIZE
+    try:
+        if args.command == "import":
+            fmt = args.format or transfer.detect_format(args.path)
+            importer = getattr(transfer, f"import_{args.entity}")
+            with open(args.path, newline="", encoding="utf-8") as file:
+                count = importer(
+                    engine, transfer.read_records(file, fmt), chunk_size
+                )
+            print(f"imported {args.entity}: {count}", file=sys.stderr)
+        elif args.command == "rebuild":
+            count = rebuild(engine, args.entity)
+            print(f"rebuilt {args.entity}: {count}", file=sys.stderr)
+        elif args.command == "check":
+            return check_order_totals(engine, args.tolerance)
+        else:
+            with (
+                nullcontext(sys.stdout)
+                if args.path == "-"
+                else open(args.path, "w", encoding="utf-8")
+            ) as out:
+                count = transfer.export_orders(engine, out, chunk_size)
+            print(f"exported {args.entity}: {count}", file=sys.stderr)
+    except (DomainError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Generic,
+)
+from .models import (
+    Product,
+    Order,
+    Customer,
+    CustomerStats,
+    TotalDrift,
+    Wishlist,
+    ProductLinesHeader,
+)
+from .repositories import TOTAL_TOLERANCE
+
+if TYPE_CHECKING:
+    from .catalog import CatalogSnapshot
+
+T = TypeVar("T")
+
+
+class AsyncBaseRepository(ABC, Generic[T]):
+    # pylint: disable=duplicate-code
+    @abstractmethod
+    async def add(self, entity: T):
+        pass
+
+    @abstractmethod
+    async def get(self, id_: int) -> T:
+        pass
+
+    @abstractmethod
+    async def list(self, ids: List[int] | None = None) -> List[T]:
+        pass
+
+    @abstractmethod
+    async def update(self, id_: int, entity: T):
+        pass
+
+    @abstractmethod
+    async def delete(self, id_: int):
+        pass
+
+    @abstractmethod
+    async def add_many(self, entities: List[T]):
+        pass
+
+    @abstractmethod
+    async def get_many(self, ids: List[int]) -> List[T]:
+        pass
+
+    @abstractmethod
+    async def update_many(self, entities: List[T]):
+        pass
+
+    @abstractmethod
+    async def delete_many(self, ids: List[int]):
+        pass
+
+    @abstractmethod
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> AsyncIterator[T]:
+        pass
+
+
+class AsyncProductRepository(AsyncBaseRepository[Product]):
+    @abstractmethod
+    async def reserve(self, quantities: Dict[int, int]):
+        pass
+
+    @abstractmethod
+    async def snapshot(self) -> "CatalogSnapshot":
+        pass
+
+
+class AsyncCustomerRepository(AsyncBaseRepository[Customer]):
+    pass
+
+
+class AsyncWishlistRepository(AsyncBaseRepository[Wishlist]):
+    @abstractmethod
+    async def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        pass
+
+    @abstractmethod
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        pass
+
+    @abstractmethod
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+
+class AsyncOrderRepository(AsyncBaseRepository[Order]):
+    # pylint: disable=duplicate-code
+    @abstractmethod
+    async def list_by_customer(self, customer_id: int) -> List[Order]:
+        pass
+
+    @abstractmethod
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        pass
+
+    @abstractmethod
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def total(self, order_id: int) -> float:
+        pass
+
+    @abstractmethod
+    async def totals(self, order_ids: List[int]) -> Dict[int, float]:
+        pass
+
+    @abstractmethod
+    async def add_from_wishlists(
+        self, wishlist_ids: List[int], order_ids: List[int] | None = None
+    ) -> Dict[int, int]:
+        pass
+
+    @abstractmethod
+    async def customer_stats(self, customer_id: int) -> CustomerStats:
+        pass
+
+    @abstractmethod
+    async def rebuild_customer_stats(self) -> int:
+        pass
+
+    @abstractmethod
+    async def total_drift(
+        self, tolerance: float = TOTAL_TOLERANCE
+    ) -> List[TotalDrift]:
+        pass
+
+    @abstractmethod
+    async def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        pass
+
+    @abstractmethod
+    async def mark_reserved(self, order_id: int) -> bool:
+        pass
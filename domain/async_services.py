@@ -0,0 +1,245 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Type,
+)
+from .exceptions import ConcurrencyError
+from .models import (
+    Product,
+    Order,
+    Customer,
+    CustomerStats,
+    TotalDrift,
+    Wishlist,
+    ProductLinesHeader,
+)
+from .pagination import Page, decode_cursor
+from .async_unit_of_work import AsyncUnitOfWork
+from .async_repositories import AsyncBaseRepository
+from .repositories import TOTAL_TOLERANCE
+from .services import ChunkedService
+
+if TYPE_CHECKING:
+    from .catalog import CatalogSnapshot
+
+T = TypeVar("T")
+
+
+class AsyncBaseService(ChunkedService[T]):
+    def __init__(
+        self, uow: AsyncUnitOfWork, repo: AsyncBaseRepository[T], model: Type[T]
+    ):
+        super().__init__(uow, repo, model)
+
+    async def create(self, **kwargs) -> T:
+        entity = self.model(**kwargs)
+        await self.repo.add(entity)
+        await self.uow.commit()
+        return entity
+
+    async def get(self, id_: int) -> T:
+        return await self.repo.get(id_)
+
+    async def list(self, ids: List[int] | None = None) -> List[T]:
+        return await self.repo.list(ids)
+
+    async def update(self, id_: int, entity: T) -> T:
+        await self.repo.update(id_, entity)
+        await self.uow.commit()
+        return entity
+
+    async def delete(self, id_: int):
+        await self.repo.delete(id_)
+        await self.uow.commit()
+
+    def iterate(
+        self, batch_size: int | None = None, cursor: str | None = None
+    ) -> AsyncIterator[T]:
+        return self.repo.iter_all(
+            batch_size=batch_size or self.chunk_size, after_id=decode_cursor(cursor)
+        )
+
+    async def page(self, limit: int, cursor: str | None = None) -> Page[T]:
+        items = []
+        entities = self.repo.iter_all(batch_size=limit, after_id=decode_cursor(cursor))
+        async for entity in entities:
+            items.append(entity)
+            if len(items) == limit:
+                break
+        return Page.of(items, limit)
+
+    async def create_many(
+        self, items: Iterable[Dict[str, Any]], chunk_size: int | None = None
+    ) -> List[T]:
+        entities = []
+        for chunk in self._chunks(items, chunk_size):
+            batch = [self.model(**kwargs) for kwargs in chunk]
+            await self.repo.add_many(batch)
+            await self.uow.commit()
+            entities.extend(batch)
+        return entities
+
+    async def get_many(
+        self, ids: Iterable[int], chunk_size: int | None = None
+    ) -> List[T]:
+        entities = []
+        for chunk in self._chunks(ids, chunk_size):
+            entities.extend(await self.repo.get_many(chunk))
+        return entities
+
+    async def update_many(
+        self, entities: Iterable[T], chunk_size: int | None = None
+    ) -> List[T]:
+        updated = []
+        for chunk in self._chunks(entities, chunk_size):
+            await self.repo.update_many(chunk)
+            await self.uow.commit()
+            updated.extend(chunk)
+        return updated
+
+    async def delete_many(self, ids: Iterable[int], chunk_size: int | None = None):
+        for chunk in self._chunks(ids, chunk_size):
+            await self.repo.delete_many(chunk)
+            await self.uow.commit()
+
+
+class AsyncProductService(AsyncBaseService[Product]):
+    def __init__(self, uow: AsyncUnitOfWork):
+        super().__init__(uow, uow.product_repo, Product)
+
+    async def snapshot(self) -> "CatalogSnapshot":
+        return await self.repo.snapshot()
+
+
+class AsyncCustomerService(AsyncBaseService[Customer]):
+    def __init__(self, uow: AsyncUnitOfWork):
+        super().__init__(uow, uow.customer_repo, Customer)
+
+    async def stats(self, customer_id: int) -> CustomerStats:
+        return await self.uow.order_repo.customer_stats(customer_id)
+
+    async def last_order(self, customer_id: int) -> Order | None:
+        stats = await self.stats(customer_id)
+        if stats.last_order_id is None:
+            return None
+        return await self.uow.order_repo.get(stats.last_order_id)
+
+    async def rebuild_stats(self) -> int:
+        rebuilt = await self.uow.order_repo.rebuild_customer_stats()
+        await self.uow.commit()
+        return rebuilt
+
+
+class AsyncWishlistService(AsyncBaseService[Wishlist]):
+    def __init__(self, uow: AsyncUnitOfWork):
+        super().__init__(uow, uow.wishlist_repo, Wishlist)
+
+    async def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        return await self.repo.list_by_customer(customer_id)
+
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return await self.repo.list_headers(ids)
+
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.repo.project(columns, ids, id_range)
+
+    async def add_product_to_wishlist(
+        self, wishlist_id: int, product: Product, quantity: int = 1
+    ):
+        wishlist = await self.get(wishlist_id)
+        wishlist.add_product(product, quantity)
+        await self.update(wishlist_id, wishlist)
+        return wishlist
+
+    async def create_order_from_wishlist(self, wishlist_id: int, order_id: int):
+        await self.uow.order_repo.add_from_wishlists([wishlist_id], [order_id])
+        await self.uow.commit()
+        return await self.uow.order_repo.get(order_id)
+
+    async def convert_many(self, wishlist_ids: List[int]) -> Dict[int, int]:
+        converted = await self.uow.order_repo.add_from_wishlists(wishlist_ids)
+        await self.uow.commit()
+        return converted
+
+
+class AsyncOrderService(AsyncBaseService[Order]):
+    def __init__(self, uow: AsyncUnitOfWork):
+        super().__init__(uow, uow.order_repo, Order)
+
+    async def list_by_customer(self, customer_id: int) -> List[Order]:
+        return await self.repo.list_by_customer(customer_id)
+
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return await self.repo.list_headers(ids)
+
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.repo.project(columns, ids, id_range)
+
+    async def checkout_order(self, order_id: int) -> float:
+        return await self.repo.total(order_id)
+
+    async def checkout_many(
+        self, order_ids: Iterable[int], chunk_size: int | None = None
+    ) -> Dict[int, float]:
+        totals = {}
+        for chunk in self._chunks(order_ids, chunk_size):
+            totals.update(await self.repo.totals(chunk))
+        return totals
+
+    async def total_drift(
+        self, tolerance: float = TOTAL_TOLERANCE
+    ) -> List[TotalDrift]:
+        return await self.repo.total_drift(tolerance)
+
+    async def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        rebuilt = await self.repo.rebuild_totals(tolerance)
+        await self.uow.commit()
+        return rebuilt
+
+    async def reserve_stock(self, order_id: int, retries: int = 3) -> int:
+        attempt = 1
+        while True:
+            order = await self.get(order_id)
+            try:
+                if not await self.repo.mark_reserved(order_id):
+                    return 0
+                await self.uow.product_repo.reserve(order.quantities())
+                await self.uow.commit()
+                return attempt
+            except ConcurrencyError:
+                await self.uow.rollback()
+                if attempt > retries:
+                    raise
+            except Exception:
+                await self.uow.rollback()
+                raise
+            attempt += 1
+
+    async def add_product_to_order(
+        self, order_id: int, product: Product, quantity: int = 1
+    ):
+        order = await self.get(order_id)
+        order.add_product(product, quantity)
+        await self.update(order_id, order)
+        return order
@@ -0,0 +1,82 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from domain.exceptions import BatchRolledBackError
+from domain.async_repositories import (
+    AsyncProductRepository,
+    AsyncOrderRepository,
+    AsyncCustomerRepository,
+    AsyncWishlistRepository,
+)
+from domain.unit_of_work import BaseUnitOfWork, CommitBatch
+
+
+class AsyncUnitOfWork(BaseUnitOfWork, ABC):
+    @abstractmethod
+    def __init__(
+        self,
+        product_repo: AsyncProductRepository,
+        order_repo: AsyncOrderRepository,
+        customer_repo: AsyncCustomerRepository,
+        wishlist_repo: AsyncWishlistRepository,
+    ):
+        super().__init__(product_repo, order_repo, customer_repo, wishlist_repo)
+
+    @abstractmethod
+    async def __aenter__(self):
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        pass
+
+    async def commit(self):
+        if self._batch_discarded():
+            await self._rollback()
+            raise BatchRolledBackError(self._batch_discarded())
+        if self._request_commit():
+            await self._flush()
+
+    async def rollback(self):
+        discarded = self._count_discarded()
+        await self._rollback()
+        if discarded:
+            raise BatchRolledBackError(self._batch_discarded())
+
+    @asynccontextmanager
+    async def batch(
+        self, max_operations: int | None = None, max_delay_ms: float | None = None
+    ) -> AsyncIterator[CommitBatch]:
+        # pylint: disable=duplicate-code
+        if self._batch is not None:
+            yield self._batch
+            return
+        self._batch = batch = CommitBatch(max_operations, max_delay_ms)
+        try:
+            yield batch
+        except BatchRolledBackError:
+            raise
+        except BaseException:
+            self._count_discarded()
+            await self._rollback()
+            raise
+        else:
+            if batch.discarded:
+                await self._rollback()
+                raise BatchRolledBackError(batch.discarded)
+            if batch.pending:
+                await self._flush()
+        finally:
+            self._batch = None
+
+    async def _flush(self):
+        await self._commit()
+        self._count_committed()
+
+    @abstractmethod
+    async def _commit(self):
+        pass
+
+    @abstractmethod
+    async def _rollback(self):
+        pass
@@ -0,0 +1,82 @@
+from typing import Dict, Iterable, Sequence
+import numpy as np
+from .exceptions import ProductsNotFoundError
+from .models import Product, ProductLines
+
+
+class CatalogSnapshot:
+    def __init__(
+        self, ids: Iterable[int], prices: Iterable[float], stock: Iterable[int]
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.stock = np.asarray(stock, dtype=np.int64)
+        self.index: Dict[int, int] = {
+            id_: row for row, id_ in enumerate(self.ids.tolist())
+        }
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "CatalogSnapshot":
+        products = list(products)
+        return cls(
+            [p.id_ for p in products],
+            [p.price for p in products],
+            [p.quantity for p in products],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(self, product_ids: Iterable[int]) -> np.ndarray:
+        product_ids = list(product_ids)
+        missing = [i for i in product_ids if i not in self.index]
+        if missing:
+            raise ProductsNotFoundError(missing)
+        return np.fromiter(
+            (self.index[i] for i in product_ids), dtype=np.int64, count=len(product_ids)
+        )
+
+    def _flatten(self, orders: Sequence[ProductLines]):
+        order_rows = np.fromiter(
+            (n for n, order in enumerate(orders) for _ in order.lines),
+            dtype=np.int64,
+        )
+        rows = self.rows(product_id for order in orders for product_id in order.lines)
+        quantities = np.fromiter(
+            (line.quantity for order in orders for line in order.lines.values()),
+            dtype=np.int64,
+            count=len(rows),
+        )
+        return order_rows, rows, quantities
+
+    def order_totals(self, orders: Sequence[ProductLines]) -> np.ndarray:
+        order_rows, rows, quantities = self._flatten(orders)
+        amounts = self.prices[rows] * quantities
+        return np.bincount(order_rows, weights=amounts, minlength=len(orders))
+
+    def demand(self, orders: Sequence[ProductLines]) -> np.ndarray:
+        _, rows, quantities = self._flatten(orders)
+        demand = np.bincount(rows, weights=quantities, minlength=len(self))
+        return demand.astype(np.int64)
+
+    def stock_check(self, orders: Sequence[ProductLines]) -> np.ndarray:
+        order_rows, rows, quantities = self._flatten(orders)
+        short = self.stock[rows] < quantities
+        return np.bincount(order_rows, weights=short, minlength=len(orders)) == 0
+
+    def reprice(
+        self,
+        multiplier: float | Sequence[float] = 1.0,
+        product_ids: Iterable[int] | None = None,
+        prices: Sequence[float] | None = None,
+    ) -> "CatalogSnapshot":
+        rows = slice(None) if product_ids is None else self.rows(product_ids)
+        new_prices = self.prices.copy()
+        if prices is not None:
+            new_prices[rows] = np.asarray(prices, dtype=np.float64)
+        else:
+            new_prices[rows] *= np.asarray(multiplier, dtype=np.float64)
+        snapshot = CatalogSnapshot.__new__(CatalogSnapshot)
+        snapshot.ids, snapshot.prices, snapshot.stock = self.ids, new_prices, self.stock
+        snapshot.index = self.index
+        return snapshot
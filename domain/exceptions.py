@@ -0,0 +1,55 @@
+from typing import Iterable
+
+
+class DomainError(Exception):
+    pass
+
+
+class EntitiesNotFoundError(DomainError):
+    entity = "Entities"
+
+    def __init__(self, ids: Iterable[int], entity: str | None = None):
+        self.ids = sorted(set(ids))
+        if entity is not None:
+            self.entity = entity
+        super().__init__(f"{self.entity} not found: {self.ids}")
+
+
+class ProductsNotFoundError(EntitiesNotFoundError):
+    entity = "Products"
+
+
+class InvalidCursorError(DomainError):
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"Invalid cursor: {cursor!r}")
+
+
+class DuplicateEntityError(DomainError):
+    def __init__(self, ids: Iterable[int], entity: str = "Entities"):
+        self.ids = sorted(set(ids))
+        self.entity = entity
+        super().__init__(f"{entity} already exist: {self.ids}")
+
+
+class OutOfStockError(DomainError):
+    def __init__(self, ids: Iterable[int]):
+        self.ids = sorted(set(ids))
+        super().__init__(f"Not enough stock for products: {self.ids}")
+
+
+class ConcurrencyError(DomainError):
+    pass
+
+
+class BatchRolledBackError(DomainError):
+    def __init__(self, discarded: int):
+        self.discarded = discarded
+        super().__init__(f"Rollback inside a batch discarded {discarded} operations")
+
+
+class InvalidRecordError(DomainError):
+    def __init__(self, line: int, reason: str):
+        self.line = line
+        self.reason = reason
+        super().__init__(f"Invalid record on line {line}: {reason}")
@@ -1,45 +1,170 @@
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     id_: int
     name: str
     quantity: int
     price: float
+    version: int | None = field(default=None, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Customer:
     id_: int
     name: str
 
 
-@dataclass
-class Order:
+@dataclass(frozen=True, slots=True)
+class OrderLine:
+    product: Product
+    quantity: int = 1
+    unit_price: float | None = field(default=None, compare=False)
+
+    def total(self) -> float:
+        price = self.product.price if self.unit_price is None else self.unit_price
+        return price * self.quantity
+
+
+@dataclass(frozen=True, slots=True)
+class LineChanges:
+    customer_id: int | None
+    added: Dict[int, int]
+    changed: Dict[int, int]
+    removed: List[int]
+
+    @classmethod
+    def between(
+        cls, customer_id: int, quantities: Dict[int, int], entity: "ProductLines"
+    ) -> "LineChanges":
+        current = entity.quantities()
+        return cls(
+            customer_id=(
+                entity.customer.id_ if entity.customer.id_ != customer_id else None
+            ),
+            added={i: n for i, n in current.items() if i not in quantities},
+            changed={
+                i: n
+                for i, n in current.items()
+                if i in quantities and quantities[i] != n
+            },
+            removed=[i for i in quantities if i not in current],
+        )
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.customer_id is not None or self.added or self.changed or self.removed
+        )
+
+
+@dataclass(init=False, slots=True)
+class ProductLines:
     id_: int
     customer: Customer
-    products: List[Product] = field(default_factory=list)
+    lines: Dict[int, OrderLine]
+    _original: Tuple[int, Dict[int, int]] | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __init__(
+        self,
+        id_: int,
+        customer: Customer,
+        products: Iterable[Product] = (),
+        lines: Iterable[OrderLine] = (),
+    ):
+        self.id_ = id_
+        self.customer = customer
+        self.lines = {}
+        self._original = None
+        for product in products:
+            self.add_product(product)
+        for line in lines:
+            self._add_line(line)
+
+    @property
+    def products(self) -> List[Product]:
+        return [line.product for line in self.lines.values()]
+
+    def quantities(self) -> Dict[int, int]:
+        return {product_id: line.quantity for product_id, line in self.lines.items()}
+
+    def mark_clean(self) -> None:
+        self._original = (self.customer.id_, self.quantities())
+
+    def changes(self) -> LineChanges | None:
+        if self._original is None:
+            return None
+        return LineChanges.between(*self._original, self)
+
+    def add_product(self, product: Product, quantity: int = 1) -> None:
+        self._add_line(OrderLine(product=product, quantity=quantity))
+
+    def _add_line(self, line: OrderLine) -> None:
+        previous = self.lines.get(line.product.id_)
+        if previous is not None:
+            line = replace(previous, quantity=previous.quantity + line.quantity)
+        self.lines[line.product.id_] = line
+        self._line_changed(previous, line)
 
-    def add_product(self, product: Product) -> None:
-        if product in self.products:
-            self.products[self.products.index(product)].quantity += 1
+    def remove_product(self, product_id: int, quantity: int | None = None) -> None:
+        line = self.lines[product_id]
+        if quantity is None or quantity >= line.quantity:
+            del self.lines[product_id]
         else:
-            self.products.append(product)
+            self.lines[product_id] = replace(line, quantity=line.quantity - quantity)
+        self._line_changed(line, self.lines.get(product_id))
 
-    def checkout(self) -> float:
-        return sum(product.price * product.quantity for product in self.products)
+    def _line_changed(self, previous: OrderLine | None, current: OrderLine | None):
+        pass
 
 
-@dataclass
-class Wishlist:
+@dataclass(frozen=True, slots=True)
+class ProductLinesHeader:
     id_: int
     customer: Customer
-    products: List[Product] = field(default_factory=list)
 
-    def add_product(self, product: Product) -> None:
-        if product in self.products:
-            self.products[self.products.index(product)].quantity += 1
-        else:
-            self.products.append(product)
+
+@dataclass(frozen=True, slots=True)
+class TotalDrift:
+    order_id: int
+    stored: float
+    computed: float
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerStats:
+    customer_id: int
+    order_count: int = 0
+    total_spent: float = 0.0
+    last_order_id: int | None = None
+
+
+@dataclass(init=False, slots=True)
+class Order(ProductLines):
+    _total: float = field(default=0.0, repr=False, compare=False)
+
+    def __init__(
+        self,
+        id_: int,
+        customer: Customer,
+        products: Iterable[Product] = (),
+        lines: Iterable[OrderLine] = (),
+    ):
+        self._total = 0.0
+        ProductLines.__init__(self, id_, customer, products, lines)
+
+    def checkout(self) -> float:
+        return self._total
+
+    def _line_changed(self, previous: OrderLine | None, current: OrderLine | None):
+        self._total += (current.total() if current else 0.0) - (
+            previous.total() if previous else 0.0
+        )
+
+
+@dataclass(init=False, slots=True)
+class Wishlist(ProductLines):
+    pass
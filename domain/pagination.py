@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Generic, Iterable, Iterator, List, TypeVar
+from .exceptions import InvalidCursorError
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def encode_cursor(after_id: int) -> str:
+    payload = json.dumps({"after": after_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after_id = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(cursor) from e
+    if not isinstance(after_id, int):
+        raise InvalidCursorError(cursor)
+    return after_id
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: str | None = None
+
+    @classmethod
+    def of(cls, items: List[T], limit: int) -> "Page[T]":
+        next_cursor = encode_cursor(items[-1].id_) if len(items) == limit else None
+        return cls(items=items, next_cursor=next_cursor)
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable
+
+
+@dataclass(slots=True)
+class CustomerSummary:
+    orders: int = 0
+    total: float = 0.0
+
+    def merge(self, other: "CustomerSummary") -> None:
+        self.orders += other.orders
+        self.total += other.total
+
+
+@dataclass(slots=True)
+class CheckoutReport:
+    totals: Dict[int, float] = field(default_factory=dict)
+    customers: Dict[int, CustomerSummary] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "CheckoutReport":
+        report = cls()
+        for row in rows:
+            report.add(row["id_"], row["customer_id"], row["total"])
+        return report
+
+    @property
+    def grand_total(self) -> float:
+        return sum(self.totals.values())
+
+    def add(self, order_id: int, customer_id: int, total: float) -> None:
+        self.totals[order_id] = total
+        summary = self.customers.setdefault(customer_id, CustomerSummary())
+        summary.merge(CustomerSummary(orders=1, total=total))
+
+    def merge(self, other: "CheckoutReport") -> None:
+        self.totals.update(other.totals)
+        for customer_id, summary in other.customers.items():
+            self.customers.setdefault(customer_id, CustomerSummary()).merge(summary)
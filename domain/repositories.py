@@ -1,9 +1,42 @@
 from abc import ABC, abstractmethod
-from typing import List, TypeVar, Generic
-from .models import Product, Order, Customer, Wishlist
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Generic,
+)
+from .models import (
+    Product,
+    Order,
+    Customer,
+    CustomerStats,
+    TotalDrift,
+    Wishlist,
+    ProductLinesHeader,
+)
+
+if TYPE_CHECKING:
+    from .catalog import CatalogSnapshot
 
 T = TypeVar("T")
 
+PROJECTION_COLUMNS = ("id_", "customer_id", "customer_name", "line_count", "total")
+
+TOTAL_TOLERANCE = 1e-6
+
+
+def validate_projection(columns: Sequence[str]):
+    unknown = [c for c in columns if c not in PROJECTION_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(
+            f"Unknown columns {unknown}, expected some of {list(PROJECTION_COLUMNS)}"
+        )
+
 
 class BaseRepository(ABC, Generic[T]):
     @abstractmethod
@@ -26,9 +59,37 @@ class BaseRepository(ABC, Generic[T]):
     def delete(self, id_: int):
         pass
 
+    @abstractmethod
+    def add_many(self, entities: List[T]):
+        pass
+
+    @abstractmethod
+    def get_many(self, ids: List[int]) -> List[T]:
+        pass
+
+    @abstractmethod
+    def update_many(self, entities: List[T]):
+        pass
+
+    @abstractmethod
+    def delete_many(self, ids: List[int]):
+        pass
+
+    @abstractmethod
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[T]:
+        pass
+
 
 class ProductRepository(BaseRepository[Product]):
-    pass
+    @abstractmethod
+    def reserve(self, quantities: Dict[int, int]):
+        pass
+
+    @abstractmethod
+    def snapshot(self) -> "CatalogSnapshot":
+        pass
 
 
 class CustomerRepository(BaseRepository[Customer]):
@@ -36,8 +97,76 @@ class CustomerRepository(BaseRepository[Customer]):
 
 
 class WishlistRepository(BaseRepository[Wishlist]):
-    pass
+    @abstractmethod
+    def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        pass
+
+    @abstractmethod
+    def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        pass
+
+    @abstractmethod
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        pass
 
 
 class OrderRepository(BaseRepository[Order]):
-    pass
+    @abstractmethod
+    def list_by_customer(self, customer_id: int) -> List[Order]:
+        pass
+
+    @abstractmethod
+    def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        pass
+
+    @abstractmethod
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def total(self, order_id: int) -> float:
+        pass
+
+    @abstractmethod
+    def totals(self, order_ids: List[int]) -> Dict[int, float]:
+        pass
+
+    @abstractmethod
+    def add_from_wishlists(
+        self, wishlist_ids: List[int], order_ids: List[int] | None = None
+    ) -> Dict[int, int]:
+        pass
+
+    @abstractmethod
+    def customer_stats(self, customer_id: int) -> CustomerStats:
+        pass
+
+    @abstractmethod
+    def rebuild_customer_stats(self) -> int:
+        pass
+
+    @abstractmethod
+    def total_drift(self, tolerance: float = TOTAL_TOLERANCE) -> List[TotalDrift]:
+        pass
+
+    @abstractmethod
+    def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        pass
+
+    @abstractmethod
+    def mark_reserved(self, order_id: int) -> bool:
+        pass
@@ -1,17 +1,55 @@
-from typing import List, TypeVar, Generic, Type
-from .models import Product, Order, Customer, Wishlist
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Generic,
+    Type,
+)
+from .exceptions import ConcurrencyError
+from .models import (
+    Product,
+    Order,
+    Customer,
+    CustomerStats,
+    TotalDrift,
+    Wishlist,
+    ProductLinesHeader,
+)
+from .pagination import Page, chunked, decode_cursor
 from .unit_of_work import UnitOfWork
-from .repositories import BaseRepository
+from .repositories import TOTAL_TOLERANCE, BaseRepository
+
+if TYPE_CHECKING:
+    from .catalog import CatalogSnapshot
 
 T = TypeVar("T")
 
 
-class BaseService(Generic[T]):
-    def __init__(self, uow: UnitOfWork, repo: BaseRepository[T], model: Type[T]):
+class ChunkedService(Generic[T]):
+    chunk_size = 1000
+
+    def __init__(self, uow, repo, model: Type[T]):
         self.uow = uow
         self.repo = repo
         self.model = model
 
+    def _chunks(
+        self, items: Iterable[Any], chunk_size: int | None
+    ) -> Iterator[List[Any]]:
+        return chunked(items, chunk_size or self.chunk_size)
+
+
+class BaseService(ChunkedService[T]):
+    def __init__(self, uow: UnitOfWork, repo: BaseRepository[T], model: Type[T]):
+        super().__init__(uow, repo, model)
+
     def create(self, **kwargs) -> T:
         entity = self.model(**kwargs)
         self.repo.add(entity)
@@ -33,49 +71,176 @@ class BaseService(Generic[T]):
         self.repo.delete(id_)
         self.uow.commit()
 
+    def iterate(
+        self, batch_size: int | None = None, cursor: str | None = None
+    ) -> Iterator[T]:
+        return self.repo.iter_all(
+            batch_size=batch_size or self.chunk_size, after_id=decode_cursor(cursor)
+        )
+
+    def page(self, limit: int, cursor: str | None = None) -> Page[T]:
+        entities = self.repo.iter_all(batch_size=limit, after_id=decode_cursor(cursor))
+        return Page.of(list(islice(entities, limit)), limit)
+
+    def create_many(
+        self, items: Iterable[Dict[str, Any]], chunk_size: int | None = None
+    ) -> List[T]:
+        entities = []
+        for chunk in self._chunks(items, chunk_size):
+            batch = [self.model(**kwargs) for kwargs in chunk]
+            self.repo.add_many(batch)
+            self.uow.commit()
+            entities.extend(batch)
+        return entities
+
+    def get_many(self, ids: Iterable[int], chunk_size: int | None = None) -> List[T]:
+        entities = []
+        for chunk in self._chunks(ids, chunk_size):
+            entities.extend(self.repo.get_many(chunk))
+        return entities
+
+    def update_many(
+        self, entities: Iterable[T], chunk_size: int | None = None
+    ) -> List[T]:
+        updated = []
+        for chunk in self._chunks(entities, chunk_size):
+            self.repo.update_many(chunk)
+            self.uow.commit()
+            updated.extend(chunk)
+        return updated
+
+    def delete_many(self, ids: Iterable[int], chunk_size: int | None = None):
+        for chunk in self._chunks(ids, chunk_size):
+            self.repo.delete_many(chunk)
+            self.uow.commit()
+
 
 class ProductService(BaseService[Product]):
     def __init__(self, uow: UnitOfWork):
         super().__init__(uow, uow.product_repo, Product)
 
+    def snapshot(self) -> "CatalogSnapshot":
+        return self.repo.snapshot()
+
 
 class CustomerService(BaseService[Customer]):
     def __init__(self, uow: UnitOfWork):
         super().__init__(uow, uow.customer_repo, Customer)
 
+    def stats(self, customer_id: int) -> CustomerStats:
+        return self.uow.order_repo.customer_stats(customer_id)
+
+    def last_order(self, customer_id: int) -> Order | None:
+        stats = self.stats(customer_id)
+        if stats.last_order_id is None:
+            return None
+        return self.uow.order_repo.get(stats.last_order_id)
+
+    def rebuild_stats(self) -> int:
+        rebuilt = self.uow.order_repo.rebuild_customer_stats()
+        self.uow.commit()
+        return rebuilt
+
 
 class WishlistService(BaseService[Wishlist]):
     def __init__(self, uow: UnitOfWork):
         super().__init__(uow, uow.wishlist_repo, Wishlist)
 
-    def add_product_to_wishlist(self, wishlist_id: int, product: Product):
+    def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        return self.repo.list_by_customer(customer_id)
+
+    def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return self.repo.list_headers(ids)
+
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return self.repo.project(columns, ids, id_range)
+
+    def add_product_to_wishlist(
+        self, wishlist_id: int, product: Product, quantity: int = 1
+    ):
         wishlist = self.get(wishlist_id)
-        wishlist.add_product(product)
+        wishlist.add_product(product, quantity)
         self.update(wishlist_id, wishlist)
-        self.uow.commit()
         return wishlist
 
     def create_order_from_wishlist(self, wishlist_id: int, order_id: int):
-        wishlist = self.get(wishlist_id)
-        order = Order(
-            id_=order_id, customer=wishlist.customer, products=wishlist.products
-        )
-        self.uow.order_repo.add(order)
+        self.uow.order_repo.add_from_wishlists([wishlist_id], [order_id])
         self.uow.commit()
-        return order
+        return self.uow.order_repo.get(order_id)
+
+    def convert_many(self, wishlist_ids: List[int]) -> Dict[int, int]:
+        converted = self.uow.order_repo.add_from_wishlists(wishlist_ids)
+        self.uow.commit()
+        return converted
 
 
 class OrderService(BaseService[Order]):
     def __init__(self, uow: UnitOfWork):
         super().__init__(uow, uow.order_repo, Order)
 
+    def list_by_customer(self, customer_id: int) -> List[Order]:
+        return self.repo.list_by_customer(customer_id)
+
+    def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return self.repo.list_headers(ids)
+
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return self.repo.project(columns, ids, id_range)
+
     def checkout_order(self, order_id: int) -> float:
-        order = self.get(order_id)
-        return order.checkout()
+        return self.repo.total(order_id)
+
+    def checkout_many(
+        self, order_ids: Iterable[int], chunk_size: int | None = None
+    ) -> Dict[int, float]:
+        totals = {}
+        for chunk in self._chunks(order_ids, chunk_size):
+            totals.update(self.repo.totals(chunk))
+        return totals
 
-    def add_product_to_order(self, order_id: int, product: Product):
+    def total_drift(self, tolerance: float = TOTAL_TOLERANCE) -> List[TotalDrift]:
+        return self.repo.total_drift(tolerance)
+
+    def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        rebuilt = self.repo.rebuild_totals(tolerance)
+        self.uow.commit()
+        return rebuilt
+
+    def reserve_stock(self, order_id: int, retries: int = 3) -> int:
+        attempt = 1
+        while True:
+            order = self.get(order_id)
+            try:
+                if not self.repo.mark_reserved(order_id):
+                    return 0
+                self.uow.product_repo.reserve(order.quantities())
+                self.uow.commit()
+                return attempt
+            except ConcurrencyError:
+                self.uow.rollback()
+                if attempt > retries:
+                    raise
+            except Exception:
+                self.uow.rollback()
+                raise
+            attempt += 1
+
+    def add_product_to_order(self, order_id: int, product: Product, quantity: int = 1):
         order = self.get(order_id)
-        order.add_product(product)
+        order.add_product(product, quantity)
         self.update(order_id, order)
-        self.uow.commit()
         return order
@@ -1,4 +1,9 @@
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+from domain.exceptions import BatchRolledBackError
 from domain.repositories import (
     ProductRepository,
     OrderRepository,
@@ -7,35 +12,69 @@ from domain.repositories import (
 )
 
 
-class UnitOfWork(ABC):
-    @abstractmethod
+@dataclass
+class CommitStats:
+    requested: int = 0
+    committed: int = 0
+    discarded: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.committed - self.discarded
+
+
+class CommitBatch:
     def __init__(
-        self,
-        product_repo: ProductRepository,
-        order_repo: OrderRepository,
-        customer_repo: CustomerRepository,
-        wishlist_repo: WishlistRepository,
+        self, max_operations: int | None = None, max_delay_ms: float | None = None
     ):
+        self.max_operations = max_operations
+        self.max_delay_ms = max_delay_ms
+        self.pending = 0
+        self.discarded = 0
+        self._started: float | None = None
+
+    def defer(self) -> bool:
+        if self._started is None:
+            self._started = time.monotonic()
+        self.pending += 1
+        if self.max_operations is not None and self.pending >= self.max_operations:
+            return True
+        elapsed_ms = (time.monotonic() - self._started) * 1000
+        return self.max_delay_ms is not None and elapsed_ms >= self.max_delay_ms
+
+    def reset(self) -> int:
+        pending, self.pending, self._started = self.pending, 0, None
+        return pending
+
+
+class BaseUnitOfWork:
+    def __init__(self, product_repo, order_repo, customer_repo, wishlist_repo):
         self._product_repo = product_repo
         self._order_repo = order_repo
         self._customer_repo = customer_repo
         self._wishlist_repo = wishlist_repo
+        self.commit_stats = CommitStats()
+        self._batch: CommitBatch | None = None
 
-    @abstractmethod
-    def __enter__(self):
-        pass
+    def _batch_discarded(self) -> int:
+        return 0 if self._batch is None else self._batch.discarded
 
-    @abstractmethod
-    def __exit__(self, exception_type, exception_value, traceback):
-        pass
+    def _request_commit(self) -> bool:
+        self.commit_stats.requested += 1
+        return self._batch is None or self._batch.defer()
 
-    @abstractmethod
-    def commit(self):
-        pass
+    def _count_discarded(self) -> int:
+        if self._batch is None:
+            return 0
+        discarded = self._batch.reset()
+        self._batch.discarded += discarded
+        self.commit_stats.discarded += discarded
+        return discarded
 
-    @abstractmethod
-    def rollback(self):
-        pass
+    def _count_committed(self):
+        self.commit_stats.committed += 1
+        if self._batch is not None:
+            self._batch.reset()
 
     @property
     def product_repo(self):
@@ -52,3 +91,73 @@ class UnitOfWork(ABC):
     @property
     def wishlist_repo(self):
         return self._wishlist_repo
+
+
+class UnitOfWork(BaseUnitOfWork, ABC):
+    @abstractmethod
+    def __init__(
+        self,
+        product_repo: ProductRepository,
+        order_repo: OrderRepository,
+        customer_repo: CustomerRepository,
+        wishlist_repo: WishlistRepository,
+    ):
+        super().__init__(product_repo, order_repo, customer_repo, wishlist_repo)
+
+    @abstractmethod
+    def __enter__(self):
+        pass
+
+    @abstractmethod
+    def __exit__(self, exception_type, exception_value, traceback):
+        pass
+
+    def commit(self):
+        if self._batch_discarded():
+            self._rollback()
+            raise BatchRolledBackError(self._batch_discarded())
+        if self._request_commit():
+            self._flush()
+
+    def rollback(self):
+        discarded = self._count_discarded()
+        self._rollback()
+        if discarded:
+            raise BatchRolledBackError(self._batch_discarded())
+
+    @contextmanager
+    def batch(
+        self, max_operations: int | None = None, max_delay_ms: float | None = None
+    ) -> Iterator[CommitBatch]:
+        if self._batch is not None:
+            yield self._batch
+            return
+        self._batch = batch = CommitBatch(max_operations, max_delay_ms)
+        try:
+            yield batch
+        except BatchRolledBackError:
+            raise
+        except BaseException:
+            self._count_discarded()
+            self._rollback()
+            raise
+        else:
+            if batch.discarded:
+                self._rollback()
+                raise BatchRolledBackError(batch.discarded)
+            if batch.pending:
+                self._flush()
+        finally:
+            self._batch = None
+
+    def _flush(self):
+        self._commit()
+        self._count_committed()
+
+    @abstractmethod
+    def _commit(self):
+        pass
+
+    @abstractmethod
+    def _rollback(self):
+        pass
@@ -0,0 +1,213 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import (
+    Select,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from domain.models import CustomerStats, TotalDrift
+from .orm import CustomerStatsORM, OrderORM, OrderProductORM, ProductORM
+
+OrderSummaries = Dict[int, Tuple[int, float]]
+
+_orders = OrderORM.__table__
+_order_lines = OrderProductORM.__table__
+_products = ProductORM.__table__
+_stats = CustomerStatsORM.__table__
+_new_stats = sqlite_insert(_stats)
+
+_UPSERT_CUSTOMER_STATS = text(
+    str(
+        _new_stats.on_conflict_do_update(
+            index_elements=[_stats.c.customer_id],
+            set_={
+                "order_count": _stats.c.order_count + _new_stats.excluded.order_count,
+                "total_spent": _stats.c.total_spent + _new_stats.excluded.total_spent,
+                "last_order_id": func.coalesce(
+                    func.max(
+                        func.coalesce(_stats.c.last_order_id, literal_column("0")),
+                        _new_stats.excluded.last_order_id,
+                    ),
+                    _stats.c.last_order_id,
+                ),
+            },
+        ).compile(dialect=sqlite.dialect(paramstyle="named"))
+    )
+)
+
+_ORDER_SUMMARIES = select(_orders.c.id_, _orders.c.total, _orders.c.customer_id).where(
+    _orders.c.id_.in_(bindparam("order_ids", expanding=True))
+)
+
+
+def summaries_from_rows(rows: Iterable[Any]) -> OrderSummaries:
+    return {id_: (customer_id, float(total)) for id_, total, customer_id in rows}
+
+
+def _order_summaries(session: Session, ids: Iterable[int]) -> OrderSummaries:
+    ids = list(ids)
+    if not ids:
+        return {}
+    return summaries_from_rows(session.execute(_ORDER_SUMMARIES, {"order_ids": ids}))
+
+
+def apply_customer_stats(
+    session: Session, before: OrderSummaries, after: OrderSummaries
+):
+    deltas: Dict[int, Dict[str, Any]] = {}
+    shrunk = set()
+
+    def delta(customer_id: int) -> Dict[str, Any]:
+        return deltas.setdefault(
+            customer_id,
+            {
+                "customer_id": customer_id,
+                "order_count": 0,
+                "total_spent": 0.0,
+                "last_order_id": None,
+            },
+        )
+
+    for order_id, (customer_id, total) in before.items():
+        delta(customer_id)["total_spent"] -= total
+        if after.get(order_id, (None,))[0] != customer_id:
+            delta(customer_id)["order_count"] -= 1
+            shrunk.add(customer_id)
+    for order_id, (customer_id, total) in after.items():
+        row = delta(customer_id)
+        row["total_spent"] += total
+        if before.get(order_id, (None,))[0] != customer_id:
+            row["order_count"] += 1
+            row["last_order_id"] = max(row["last_order_id"] or 0, order_id)
+    if deltas:
+        session.execute(_UPSERT_CUSTOMER_STATS, list(deltas.values()))
+    if shrunk:
+        session.execute(
+            update(_stats)
+            .where(_stats.c.customer_id.in_(shrunk))
+            .values(
+                last_order_id=select(func.max(_orders.c.id_))
+                .where(_orders.c.customer_id == _stats.c.customer_id)
+                .scalar_subquery()
+            )
+        )
+
+
+@contextmanager
+def tracking_customer_stats(
+    session: Session, ids: List[int]
+) -> Iterator[OrderSummaries]:
+    before = _order_summaries(session, ids)
+    after: OrderSummaries = {}
+    yield after
+    unreported = [i for i in ids if i not in after]
+    after.update(_order_summaries(session, unreported))
+    apply_customer_stats(session, before, after)
+
+
+def load_customer_stats(session: Session, customer_id: int) -> CustomerStats:
+    row = session.execute(
+        select(
+            _stats.c.order_count, _stats.c.total_spent, _stats.c.last_order_id
+        ).where(_stats.c.customer_id == customer_id)
+    ).one_or_none()
+    if row is None:
+        return CustomerStats(customer_id=customer_id)
+    return CustomerStats(customer_id, *row)
+
+
+def backfill_customer_stats(session: Session) -> int:
+    session.execute(delete(_stats))
+    result = session.execute(
+        insert(_stats).from_select(
+            ["customer_id", "order_count", "total_spent", "last_order_id"],
+            select(
+                _orders.c.customer_id,
+                func.count(),  # pylint: disable=not-callable
+                func.sum(_orders.c.total),
+                func.max(_orders.c.id_),
+            ).group_by(_orders.c.customer_id),
+        )
+    )
+    return result.rowcount
+
+
+def _line_amount() -> Any:
+    return func.coalesce(
+        func.sum(
+            func.coalesce(OrderProductORM.unit_price, ProductORM.price)
+            * OrderProductORM.quantity
+        ),
+        0.0,
+    )
+
+
+def lines_total(parent_key: Any, parent_id: Any) -> Any:
+    line_class = parent_key.class_
+    return (
+        select(_line_amount())
+        .select_from(line_class)
+        .join(ProductORM, ProductORM.id_ == line_class.product_id)
+        .where(parent_key == parent_id)
+        .scalar_subquery()
+    )
+
+
+_REFRESH_ORDER_TOTALS = (
+    update(_orders)
+    .where(_orders.c.id_.in_(bindparam("order_ids", expanding=True)))
+    .values(total=lines_total(OrderProductORM.order_id, _orders.c.id_))
+    .returning(_orders.c.id_, _orders.c.total, _orders.c.customer_id)
+)
+
+
+def refresh_order_totals(session: Session, ids: Iterable[int]) -> OrderSummaries:
+    ids = list(ids)
+    if not ids:
+        return {}
+    rows = session.execute(_REFRESH_ORDER_TOTALS, {"order_ids": ids})
+    return summaries_from_rows(rows)
+
+
+_FREEZE_UNIT_PRICES = (
+    update(_order_lines)
+    .where(_order_lines.c.unit_price.is_(None))
+    .values(
+        unit_price=select(_products.c.price)
+        .where(_products.c.id_ == _order_lines.c.product_id)
+        .scalar_subquery()
+    )
+)
+
+
+def freeze_unit_prices(session: Session) -> int:
+    return session.execute(_FREEZE_UNIT_PRICES).rowcount
+
+
+def _order_totals_query() -> Select:
+    return (
+        select(OrderORM.id_, _line_amount().label("total"))
+        .outerjoin(OrderProductORM, OrderProductORM.order_id == OrderORM.id_)
+        .outerjoin(ProductORM, ProductORM.id_ == OrderProductORM.product_id)
+        .group_by(OrderORM.id_)
+    )
+
+
+def find_total_drift(session: Session, tolerance: float) -> List[TotalDrift]:
+    computed = _order_totals_query().subquery()
+    rows = session.execute(
+        select(_orders.c.id_, _orders.c.total, computed.c.total)
+        .join(computed, computed.c.id_ == _orders.c.id_)
+        .where(func.abs(_orders.c.total - computed.c.total) > tolerance)
+        .order_by(_orders.c.id_)
+    )
+    return [TotalDrift(*row) for row in rows]
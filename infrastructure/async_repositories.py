@@ -0,0 +1,204 @@
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from domain.async_repositories import (
+    AsyncProductRepository,
+    AsyncOrderRepository,
+    AsyncCustomerRepository,
+    AsyncWishlistRepository,
+)
+from domain.models import (
+    Order,
+    Product,
+    Customer,
+    CustomerStats,
+    TotalDrift,
+    Wishlist,
+    ProductLinesHeader,
+)
+from domain.repositories import TOTAL_TOLERANCE, BaseRepository
+from .identity_map import IdentityMap
+from .repositories import (
+    SqlAlchemyProductRepository,
+    SqlAlchemyOrderRepository,
+    SqlAlchemyCustomerRepository,
+    SqlAlchemyWishlistRepository,
+)
+
+if TYPE_CHECKING:
+    from domain.catalog import CatalogSnapshot
+
+T = TypeVar("T")
+
+
+class AsyncSqlAlchemyRepository(Generic[T]):
+    sync_repository: Type[BaseRepository[T]]
+
+    def __init__(self, session: AsyncSession, identity_map: IdentityMap | None = None):
+        self.session = session
+        self.identity_map = (
+            IdentityMap(maxsize=0) if identity_map is None else identity_map
+        )
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session):
+            repo = self.sync_repository(session, self.identity_map)
+            return getattr(repo, method)(*args, **kwargs)
+
+        return await self.session.run_sync(call)
+
+    async def add(self, entity: T):
+        return await self._run("add", entity)
+
+    async def get(self, id_: int) -> T:
+        return await self._run("get", id_)
+
+    async def list(self, ids: List[int] | None = None) -> List[T]:
+        return await self._run("list", ids)
+
+    async def update(self, id_: int, entity: T):
+        return await self._run("update", id_, entity)
+
+    async def delete(self, id_: int):
+        return await self._run("delete", id_)
+
+    async def add_many(self, entities: List[T]):
+        return await self._run("add_many", entities)
+
+    async def get_many(self, ids: List[int]) -> List[T]:
+        return await self._run("get_many", ids)
+
+    async def update_many(self, entities: List[T]):
+        return await self._run("update_many", entities)
+
+    async def delete_many(self, ids: List[int]):
+        return await self._run("delete_many", ids)
+
+    async def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> AsyncIterator[T]:
+        while True:
+            batch = await self.session.run_sync(
+                lambda session, after_id=after_id: list(
+                    islice(
+                        self.sync_repository(session).iter_all(batch_size, after_id),
+                        batch_size,
+                    )
+                )
+            )
+            for entity in batch:
+                yield entity
+            if len(batch) < batch_size:
+                return
+            after_id = batch[-1].id_
+
+
+class AsyncSqlAlchemyProductRepository(
+    AsyncSqlAlchemyRepository[Product], AsyncProductRepository
+):
+    sync_repository = SqlAlchemyProductRepository
+
+    async def reserve(self, quantities: Dict[int, int]):
+        return await self._run("reserve", quantities)
+
+    async def snapshot(self) -> "CatalogSnapshot":
+        return await self._run("snapshot")
+
+
+class AsyncSqlAlchemyCustomerRepository(
+    AsyncSqlAlchemyRepository[Customer], AsyncCustomerRepository
+):
+    sync_repository = SqlAlchemyCustomerRepository
+
+
+class AsyncSqlAlchemyOrderRepository(
+    AsyncSqlAlchemyRepository[Order], AsyncOrderRepository
+):
+    sync_repository = SqlAlchemyOrderRepository
+
+    async def list(
+        self, ids: List[int] | None = None, loader: str = "selectin"
+    ) -> List[Order]:
+        return await self._run("list", ids, loader)
+
+    async def list_by_customer(self, customer_id: int) -> List[Order]:
+        return await self._run("list_by_customer", customer_id)
+
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return await self._run("list_headers", ids)
+
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._run("project", columns, ids, id_range)
+
+    async def total(self, order_id: int) -> float:
+        return await self._run("total", order_id)
+
+    async def totals(self, order_ids: List[int]) -> Dict[int, float]:
+        return await self._run("totals", order_ids)
+
+    async def add_from_wishlists(
+        self, wishlist_ids: List[int], order_ids: List[int] | None = None
+    ) -> Dict[int, int]:
+        return await self._run("add_from_wishlists", wishlist_ids, order_ids)
+
+    async def customer_stats(self, customer_id: int) -> CustomerStats:
+        return await self._run("customer_stats", customer_id)
+
+    async def rebuild_customer_stats(self) -> int:
+        return await self._run("rebuild_customer_stats")
+
+    async def total_drift(
+        self, tolerance: float = TOTAL_TOLERANCE
+    ) -> List[TotalDrift]:
+        return await self._run("total_drift", tolerance)
+
+    async def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        return await self._run("rebuild_totals", tolerance)
+
+    async def mark_reserved(self, order_id: int) -> bool:
+        return await self._run("mark_reserved", order_id)
+
+
+class AsyncSqlAlchemyWishlistRepository(
+    AsyncSqlAlchemyRepository[Wishlist], AsyncWishlistRepository
+):
+    sync_repository = SqlAlchemyWishlistRepository
+
+    async def list(
+        self, ids: List[int] | None = None, loader: str = "selectin"
+    ) -> List[Wishlist]:
+        return await self._run("list", ids, loader)
+
+    async def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        return await self._run("list_by_customer", customer_id)
+
+    async def list_headers(
+        self, ids: List[int] | None = None
+    ) -> List[ProductLinesHeader]:
+        return await self._run("list_headers", ids)
+
+    async def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._run("project", columns, ids, id_range)
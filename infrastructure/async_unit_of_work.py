@@ -0,0 +1,39 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from domain.async_unit_of_work import AsyncUnitOfWork
+from infrastructure.identity_map import IdentityMap
+from infrastructure.async_repositories import (
+    AsyncSqlAlchemyProductRepository,
+    AsyncSqlAlchemyOrderRepository,
+    AsyncSqlAlchemyCustomerRepository,
+    AsyncSqlAlchemyWishlistRepository,
+)
+
+
+class AsyncSqlAlchemyUnitOfWork(AsyncUnitOfWork):
+    def __init__(self, session: AsyncSession, identity_map_size: int = 1024):
+        self.identity_map = IdentityMap(maxsize=identity_map_size)
+        super().__init__(
+            AsyncSqlAlchemyProductRepository(session, self.identity_map),
+            AsyncSqlAlchemyOrderRepository(session, self.identity_map),
+            AsyncSqlAlchemyCustomerRepository(session, self.identity_map),
+            AsyncSqlAlchemyWishlistRepository(session, self.identity_map),
+        )
+        self.session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        if exception_type is not None:
+            await self.session.rollback()
+        else:
+            await self.session.commit()
+        self.identity_map.clear()
+        await self.session.close()
+
+    async def _commit(self):
+        await self.session.commit()
+
+    async def _rollback(self):
+        self.identity_map.clear()
+        await self.session.rollback()
@@ -1 +1,66 @@
+from typing import Any, Dict
+from urllib.parse import quote
+from sqlalchemy import Engine, create_engine, event, make_url
+
 DATABASE_URL = "sqlite:///warehouse.db"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///warehouse.db"
+
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+}
+SQLITE_READ_PRAGMAS: Dict[str, Any] = {
+    name: value
+    for name, value in SQLITE_PRAGMAS.items()
+    if name not in ("journal_mode", "synchronous")
+}
+
+
+def create_database_engine(
+    url: str = DATABASE_URL,
+    pragmas: Dict[str, Any] | None = None,
+    **engine_options,
+) -> Engine:
+    engine = create_engine(url, **engine_options)
+    if engine.dialect.name == "sqlite":
+        set_sqlite_pragmas(engine, SQLITE_PRAGMAS if pragmas is None else pragmas)
+    return engine
+
+
+def read_only_url(url: str = DATABASE_URL) -> str:
+    parsed = make_url(url)
+    database = parsed.database or ""
+    if parsed.get_backend_name() != "sqlite" or database in ("", ":memory:"):
+        raise ValueError(f"Read-only connections need an SQLite file, got {url!r}")
+    if not database.startswith("file:"):
+        database = "file:" + quote(database)
+    query = {**parsed.query, "mode": "ro", "uri": "true"}
+    return parsed.set(database=database, query=query).render_as_string(
+        hide_password=False
+    )
+
+
+def create_read_only_engine(
+    url: str = DATABASE_URL,
+    pragmas: Dict[str, Any] | None = None,
+    **engine_options,
+) -> Engine:
+    return create_database_engine(
+        read_only_url(url),
+        SQLITE_READ_PRAGMAS if pragmas is None else pragmas,
+        **engine_options,
+    )
+
+
+def set_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entities: OrderedDict[Tuple[type, Hashable], Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, key: Tuple[type, Hashable]) -> bool:
+        return key in self._entities
+
+    def get_or_load(self, model: Type[T], id_: Hashable, loader: Callable[[], T]) -> T:
+        key = (model, id_)
+        if key in self._entities:
+            self.hits += 1
+            self._entities.move_to_end(key)
+            return self._entities[key]
+        self.misses += 1
+        entity = loader()
+        self.put(model, id_, entity)
+        return entity
+
+    def put(self, model: type, id_: Hashable, entity: Any):
+        if self.maxsize <= 0:
+            return
+        key = (model, id_)
+        self._entities[key] = entity
+        self._entities.move_to_end(key)
+        while len(self._entities) > self.maxsize:
+            self._entities.popitem(last=False)
+
+    def invalidate(self, model: type, ids: Iterable[Hashable]):
+        for id_ in ids:
+            self._entities.pop((model, id_), None)
+
+    def invalidate_model(self, model: type):
+        for key in [key for key in self._entities if key[0] is model]:
+            del self._entities[key]
+
+    def clear(self):
+        self._entities.clear()
@@ -0,0 +1,542 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import replace
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from domain.exceptions import (
+    DuplicateEntityError,
+    EntitiesNotFoundError,
+    OutOfStockError,
+    ProductsNotFoundError,
+)
+from domain.models import (
+    Customer,
+    CustomerStats,
+    Order,
+    OrderLine,
+    Product,
+    ProductLinesHeader,
+    TotalDrift,
+    Wishlist,
+)
+from domain.repositories import (
+    TOTAL_TOLERANCE,
+    CustomerRepository,
+    OrderRepository,
+    ProductRepository,
+    WishlistRepository,
+    validate_projection,
+)
+from domain.unit_of_work import UnitOfWork
+
+if TYPE_CHECKING:
+    from domain.catalog import CatalogSnapshot
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+OrderRow = Tuple[int, Dict[int, Tuple[int, float]], float]
+
+
+class Journal:
+    def __init__(self):
+        self._entries: List[Tuple["InMemoryRepository", int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, repo: "InMemoryRepository", id_: int, previous: Any):
+        self._entries.append((repo, id_, previous))
+
+    def commit(self):
+        self._entries.clear()
+
+    def rollback(self, savepoint: int = 0):
+        while len(self._entries) > savepoint:
+            repo, id_, previous = self._entries.pop()
+            repo.restore(id_, previous)
+
+
+class _Reservations:
+    def __init__(self, journal: Journal):
+        self.journal = journal
+        self._ids: Set[int] = set()
+
+    def __contains__(self, id_: int) -> bool:
+        return id_ in self._ids
+
+    def set(self, id_: int, reserved: bool):
+        if (id_ in self._ids) != reserved:
+            self.journal.record(self, id_, not reserved)
+            self.restore(id_, reserved)
+
+    def restore(self, id_: int, previous: bool):
+        if previous:
+            self._ids.add(id_)
+        else:
+            self._ids.discard(id_)
+
+
+class InMemoryRepository(ABC, Generic[T]):
+    entity = "Entities"
+
+    def __init__(self, journal: Journal):
+        self.journal = journal
+        self._rows: Dict[int, Any] = {}
+        self._ids: List[int] = []
+
+    # pylint: disable=duplicate-code
+    @abstractmethod
+    def _to_row(self, entity: T) -> Any:
+        pass
+
+    @abstractmethod
+    def _from_row(self, id_: int, row: Any) -> T:
+        pass
+
+    def _validate(self, entities: List[T]):
+        pass
+
+    def _index(self, id_: int, row: Any):
+        pass
+
+    def _unindex(self, id_: int, row: Any):
+        pass
+
+    # pylint: enable=duplicate-code
+    def restore(self, id_: int, previous: Any):
+        current = self._rows.pop(id_, _MISSING)
+        if current is not _MISSING:
+            self._unindex(id_, current)
+            if previous is _MISSING:
+                del self._ids[bisect_left(self._ids, id_)]
+        if previous is not _MISSING:
+            if current is _MISSING:
+                insort(self._ids, id_)
+            self._rows[id_] = previous
+            self._index(id_, previous)
+
+    def _put(self, id_: int, row: Any):
+        previous = self._rows.get(id_, _MISSING)
+        self.journal.record(self, id_, previous)
+        if previous is not _MISSING:
+            self._unindex(id_, previous)
+        else:
+            insort(self._ids, id_)
+        self._rows[id_] = row
+        self._index(id_, row)
+
+    def _remove(self, id_: int):
+        previous = self._rows.pop(id_)
+        del self._ids[bisect_left(self._ids, id_)]
+        self.journal.record(self, id_, previous)
+        self._unindex(id_, previous)
+
+    def _require(self, ids: List[int]):
+        missing = [i for i in ids if i not in self._rows]
+        if missing:
+            raise EntitiesNotFoundError(missing, self.entity)
+
+    def add(self, entity: T):
+        self.add_many([entity])
+
+    def get(self, id_: int) -> T:
+        self._require([id_])
+        return self._from_row(id_, self._rows[id_])
+
+    def list(self, ids: List[int] | None = None) -> List[T]:
+        if not ids:
+            return [self._from_row(i, self._rows[i]) for i in self._ids]
+        return [self._from_row(i, self._rows[i]) for i in ids if i in self._rows]
+
+    def update(self, id_: int, entity: T):
+        self._require([id_])
+        self._validate([entity])
+        self._put(id_, self._to_row(entity))
+        return self.get(id_)
+
+    def delete(self, id_: int):
+        self._require([id_])
+        self._remove(id_)
+
+    def add_many(self, entities: List[T]):
+        ids = [e.id_ for e in entities]
+        duplicates = [i for i in ids if i in self._rows]
+        if duplicates or len(set(ids)) != len(ids):
+            raise DuplicateEntityError(duplicates or ids, self.entity)
+        self._validate(entities)
+        for entity in entities:
+            self._put(entity.id_, self._to_row(entity))
+
+    def get_many(self, ids: List[int]) -> List[T]:
+        self._require(ids)
+        return [self._from_row(i, self._rows[i]) for i in ids]
+
+    def update_many(self, entities: List[T]):
+        self._require([e.id_ for e in entities])
+        self._validate(entities)
+        for entity in entities:
+            self._put(entity.id_, self._to_row(entity))
+
+    def delete_many(self, ids: List[int]):
+        for id_ in ids:
+            if id_ in self._rows:
+                self._remove(id_)
+
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[T]:
+        while True:
+            start = 0 if after_id is None else bisect_right(self._ids, after_id)
+            batch = [
+                self._from_row(i, self._rows[i])
+                for i in self._ids[start : start + batch_size]
+            ]
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            after_id = batch[-1].id_
+
+
+class InMemoryProductRepository(InMemoryRepository[Product], ProductRepository):
+    entity = "Products"
+
+    def _to_row(self, entity: Product) -> Tuple[str, int, float]:
+        return entity.name, entity.quantity, entity.price
+
+    def _from_row(self, id_: int, row: Tuple[str, int, float]) -> Product:
+        name, quantity, price = row
+        return Product(id_=id_, name=name, quantity=quantity, price=price)
+
+    def snapshot(self) -> "CatalogSnapshot":
+        # pylint: disable-next=import-outside-toplevel
+        from domain.catalog import CatalogSnapshot
+
+        ids = sorted(self._rows)
+        return CatalogSnapshot(
+            ids,
+            [self._rows[i][2] for i in ids],
+            [self._rows[i][1] for i in ids],
+        )
+
+    def reserve(self, quantities: Dict[int, int]):
+        self.require(set(quantities))
+        short = [i for i, n in quantities.items() if self._rows[i][1] < n]
+        if short:
+            raise OutOfStockError(short)
+        for id_, reserved in quantities.items():
+            name, quantity, price = self._rows[id_]
+            self._put(id_, (name, quantity - reserved, price))
+
+    def price(self, id_: int) -> float:
+        return self._rows[id_][2]
+
+    def require(self, ids: Set[int]):
+        missing = [i for i in ids if i not in self._rows]
+        if missing:
+            raise ProductsNotFoundError(missing)
+
+
+class InMemoryCustomerRepository(InMemoryRepository[Customer], CustomerRepository):
+    entity = "Customers"
+
+    def require(self, ids: Set[int]):
+        self._require(sorted(ids))
+
+    def _to_row(self, entity: Customer) -> str:
+        return entity.name
+
+    def _from_row(self, id_: int, row: str) -> Customer:
+        return Customer(id_=id_, name=row)
+
+
+class InMemoryLinesRepository(InMemoryRepository[T]):
+    model: type
+
+    def __init__(
+        self,
+        journal: Journal,
+        products: InMemoryProductRepository,
+        customers: InMemoryCustomerRepository,
+    ):
+        super().__init__(journal)
+        self.products = products
+        self.customers = customers
+        self._by_customer: Dict[int, Set[int]] = {}
+
+    def _to_row(self, entity) -> Tuple[int, Dict[int, int]]:
+        return entity.customer.id_, {
+            product_id: line.quantity for product_id, line in entity.lines.items()
+        }
+
+    def _from_row(self, id_: int, row: Tuple[int, Dict[int, int]]) -> T:
+        customer_id, lines = row
+        return self.model(
+            id_=id_,
+            customer=self.customers.get(customer_id),
+            lines=self._lines(lines),
+        )
+
+    def _lines(self, lines: Dict[int, int]) -> List[OrderLine]:
+        return [
+            OrderLine(product=self.products.get(product_id), quantity=quantity)
+            for product_id, quantity in lines.items()
+        ]
+
+    def list_by_customer(self, customer_id: int) -> List[T]:
+        ids = sorted(self._by_customer.get(customer_id, ()))
+        return [self._from_row(i, self._rows[i]) for i in ids]
+
+    def list_headers(self, ids: List[int] | None = None) -> List[ProductLinesHeader]:
+        return [
+            ProductLinesHeader(id_=i, customer=self.customers.get(self._rows[i][0]))
+            for i in self._selected(ids)
+        ]
+
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        validate_projection(columns)
+        rows = []
+        for i in self._selected(ids):
+            if id_range is not None and not id_range[0] <= i <= id_range[1]:
+                continue
+            row = self._rows[i]
+            customer_id, lines = row[0], row[1]
+            values = {
+                "id_": i,
+                "customer_id": customer_id,
+                "customer_name": self.customers.get(customer_id).name,
+                "line_count": len(lines),
+                "total": self._row_total(row),
+            }
+            rows.append({c: values[c] for c in columns})
+        return rows
+
+    def rows(self, ids: List[int]) -> List[Tuple[int, Dict[int, int]]]:
+        self._require(ids)
+        return [self._rows[i] for i in ids]
+
+    def _selected(self, ids: List[int] | None) -> List[int]:
+        if not ids:
+            return sorted(self._rows)
+        return sorted(i for i in set(ids) if i in self._rows)
+
+    def _row_total(self, row: Tuple[int, Dict[int, int]]) -> float:
+        return self._total(row[1])
+
+    def _total(self, lines: Dict[int, int]) -> float:
+        return float(
+            sum(
+                self.products.price(product_id) * quantity
+                for product_id, quantity in lines.items()
+            )
+        )
+
+    def _validate(self, entities: List[T]):
+        self.customers.require({e.customer.id_ for e in entities})
+        self.products.require({id_ for e in entities for id_ in e.lines})
+
+    def _index(self, id_: int, row: Tuple[int, Dict[int, int]]):
+        self._by_customer.setdefault(row[0], set()).add(id_)
+
+    def _unindex(self, id_: int, row: Tuple[int, Dict[int, int]]):
+        ids = self._by_customer[row[0]]
+        ids.discard(id_)
+        if not ids:
+            del self._by_customer[row[0]]
+
+
+class InMemoryWishlistRepository(InMemoryLinesRepository[Wishlist], WishlistRepository):
+    entity = "Wishlists"
+    model = Wishlist
+
+
+class InMemoryOrderRepository(InMemoryLinesRepository[Order], OrderRepository):
+    entity = "Orders"
+    model = Order
+
+    def __init__(
+        self,
+        journal: Journal,
+        products: InMemoryProductRepository,
+        customers: InMemoryCustomerRepository,
+        wishlists: InMemoryWishlistRepository,
+    ):
+        super().__init__(journal, products, customers)
+        self.wishlists = wishlists
+        self._stats: Dict[int, CustomerStats] = {}
+        self._reserved = _Reservations(journal)
+
+    def _to_row(self, entity: Order) -> OrderRow:
+        lines = {
+            product_id: self._priced(product_id, line.quantity, line.unit_price)
+            for product_id, line in entity.lines.items()
+        }
+        return entity.customer.id_, lines, self._priced_total(lines)
+
+    def _from_row(self, id_: int, row: OrderRow) -> Order:
+        customer_id, lines, _ = row
+        return Order(
+            id_=id_,
+            customer=self.customers.get(customer_id),
+            lines=[
+                OrderLine(
+                    product=self.products.get(product_id),
+                    quantity=quantity,
+                    unit_price=unit_price,
+                )
+                for product_id, (quantity, unit_price) in lines.items()
+            ],
+        )
+
+    def _priced(
+        self, product_id: int, quantity: int, unit_price: float | None = None
+    ) -> Tuple[int, float]:
+        if unit_price is None:
+            unit_price = self.products.price(product_id)
+        return quantity, unit_price
+
+    @staticmethod
+    def _priced_total(lines: Dict[int, Tuple[int, float]]) -> float:
+        return float(sum(price * quantity for quantity, price in lines.values()))
+
+    def _row_total(self, row: OrderRow) -> float:
+        return row[2]
+
+    def _index(self, id_: int, row: OrderRow):
+        super()._index(id_, row)
+        customer_id, _, total = row
+        stats = self._stats.get(customer_id, CustomerStats(customer_id))
+        self._stats[customer_id] = replace(
+            stats,
+            order_count=stats.order_count + 1,
+            total_spent=stats.total_spent + total,
+            last_order_id=max(stats.last_order_id or 0, id_),
+        )
+
+    def _unindex(self, id_: int, row: OrderRow):
+        super()._unindex(id_, row)
+        customer_id, _, total = row
+        stats = self._stats[customer_id]
+        self._stats[customer_id] = replace(
+            stats,
+            order_count=stats.order_count - 1,
+            total_spent=stats.total_spent - total,
+            last_order_id=max(self._by_customer.get(customer_id, ()), default=None),
+        )
+
+    def customer_stats(self, customer_id: int) -> CustomerStats:
+        return self._stats.get(customer_id, CustomerStats(customer_id))
+
+    def rebuild_customer_stats(self) -> int:
+        self._stats = {}
+        for id_, (customer_id, _, total) in sorted(self._rows.items()):
+            stats = self._stats.get(customer_id, CustomerStats(customer_id))
+            self._stats[customer_id] = replace(
+                stats,
+                order_count=stats.order_count + 1,
+                total_spent=stats.total_spent + total,
+                last_order_id=id_,
+            )
+        return len(self._stats)
+
+    def total_drift(self, tolerance: float = TOTAL_TOLERANCE) -> List[TotalDrift]:
+        drifts = (
+            TotalDrift(id_, total, self._priced_total(lines))
+            for id_, (_, lines, total) in sorted(self._rows.items())
+        )
+        return [d for d in drifts if abs(d.stored - d.computed) > tolerance]
+
+    def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        drifts = self.total_drift(tolerance)
+        for drift in drifts:
+            customer_id, lines, _ = self._rows[drift.order_id]
+            self._put(drift.order_id, (customer_id, lines, drift.computed))
+        return len(drifts)
+
+    def total(self, order_id: int) -> float:
+        self._require([order_id])
+        return self._rows[order_id][2]
+
+    def mark_reserved(self, order_id: int) -> bool:
+        self._require([order_id])
+        if order_id in self._reserved:
+            return False
+        self._reserved.set(order_id, True)
+        return True
+
+    def _remove(self, id_: int):
+        super()._remove(id_)
+        self._reserved.set(id_, False)
+
+    def totals(self, order_ids: List[int]) -> Dict[int, float]:
+        self._require(order_ids)
+        return {i: self._rows[i][2] for i in order_ids}
+
+    def add_from_wishlists(
+        self, wishlist_ids: List[int], order_ids: List[int] | None = None
+    ) -> Dict[int, int]:
+        if order_ids is None:
+            wishlist_ids = sorted(set(wishlist_ids))
+            first_id = max(self._rows, default=0) + 1
+            order_ids = list(range(first_id, first_id + len(wishlist_ids)))
+        elif len(order_ids) != len(wishlist_ids):
+            raise ValueError("Expected one order id per wishlist")
+        rows = self.wishlists.rows(wishlist_ids)
+        duplicates = [i for i in order_ids if i in self._rows]
+        if duplicates or len(set(order_ids)) != len(order_ids):
+            raise DuplicateEntityError(duplicates or order_ids, self.entity)
+        for order_id, (customer_id, quantities) in zip(order_ids, rows):
+            lines = {i: self._priced(i, n) for i, n in quantities.items()}
+            self._put(order_id, (customer_id, lines, self._priced_total(lines)))
+        return dict(zip(wishlist_ids, order_ids))
+
+
+class InMemoryUnitOfWork(UnitOfWork):
+    def __init__(self):
+        self.journal = Journal()
+        products = InMemoryProductRepository(self.journal)
+        customers = InMemoryCustomerRepository(self.journal)
+        wishlists = InMemoryWishlistRepository(self.journal, products, customers)
+        super().__init__(
+            products,
+            InMemoryOrderRepository(self.journal, products, customers, wishlists),
+            customers,
+            wishlists,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        if exception_type is not None:
+            self.rollback()
+        else:
+            self.commit()
+
+    def _commit(self):
+        self.journal.commit()
+
+    def _rollback(self):
+        self.journal.rollback()
+
+    def snapshot(self) -> int:
+        return len(self.journal)
+
+    def restore(self, snapshot: int):
+        self.journal.rollback(snapshot)
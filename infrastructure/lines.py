@@ -0,0 +1,187 @@
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, List
+from sqlalchemy import Float, Integer, bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from domain.exceptions import EntitiesNotFoundError, ProductsNotFoundError
+from domain.models import LineChanges, ProductLines
+from .aggregates import OrderSummaries, lines_total, summaries_from_rows
+from .orm import (
+    CustomerORM,
+    OrderORM,
+    OrderProductORM,
+    ProductORM,
+    WishlistORM,
+    WishlistProductORM,
+)
+
+LINE_KEYS = {
+    OrderORM: OrderProductORM.order_id,
+    WishlistORM: WishlistProductORM.wishlist_id,
+}
+
+
+def check_products_exist(session: Session, ids: Iterable[int]):
+    ids = set(ids)
+    if not ids:
+        return
+    found = set(session.scalars(select(ProductORM.id_).where(ProductORM.id_.in_(ids))))
+    if len(found) != len(ids):
+        raise ProductsNotFoundError(ids - found)
+
+
+def check_customer_exists(session: Session, customer_id: int):
+    found = session.scalar(
+        select(CustomerORM.id_).where(CustomerORM.id_ == customer_id)
+    )
+    if found is None:
+        raise EntitiesNotFoundError([customer_id], "Customers")
+
+
+def _header_update(parent_class: Any) -> Any:
+    parent = parent_class.__table__
+    statement = (
+        update(parent)
+        .where(parent.c.id_ == bindparam("parent_id"))
+        .values(
+            customer_id=func.coalesce(
+                bindparam("customer_id", type_=Integer), parent.c.customer_id
+            )
+        )
+    )
+    if "total" not in parent.c:
+        return statement
+    return statement.values(
+        total=lines_total(LINE_KEYS[parent_class], bindparam("parent_id"))
+    ).returning(parent.c.id_, parent.c.total, parent.c.customer_id)
+
+
+_HEADER_UPDATES = {
+    parent_class: _header_update(parent_class) for parent_class in LINE_KEYS
+}
+
+
+def _line_insert(parent_class: Any) -> Any:
+    parent_key = LINE_KEYS[parent_class]
+    lines = parent_key.class_.__table__
+    statement = insert(lines).values(
+        {
+            parent_key.key: bindparam("line_parent"),
+            "product_id": bindparam("line_product"),
+            "quantity": bindparam("line_quantity"),
+        }
+    )
+    if "unit_price" not in lines.c:
+        return statement
+    return statement.values(
+        unit_price=func.coalesce(
+            bindparam("line_price", type_=Float),
+            select(ProductORM.price)
+            .where(ProductORM.id_ == bindparam("line_product"))
+            .scalar_subquery(),
+        )
+    )
+
+
+_LINE_INSERTS = {parent_class: _line_insert(parent_class) for parent_class in LINE_KEYS}
+
+
+def _line_row(
+    parent_id: int, product_id: int, quantity: int, unit_price: float | None = None
+) -> Dict[str, Any]:
+    return {
+        "line_parent": parent_id,
+        "line_product": product_id,
+        "line_quantity": quantity,
+        "line_price": unit_price,
+    }
+
+
+def insert_lines(session: Session, parent_class: Any, entities: Iterable[ProductLines]):
+    rows = [
+        _line_row(entity.id_, product_id, line.quantity, line.unit_price)
+        for entity in entities
+        for product_id, line in entity.lines.items()
+    ]
+    if rows:
+        session.execute(_LINE_INSERTS[parent_class], rows)
+
+
+def write_line_changes(
+    session: Session,
+    parent_class: Any,
+    id_: int,
+    entity: ProductLines,
+    track: Callable[[Session, List[int]], ContextManager[OrderSummaries]] | None = None,
+):
+    parent_key = LINE_KEYS[parent_class]
+    line_class = parent_key.class_
+    changes = entity.changes()
+    if changes is None:
+        customer_id = session.scalar(
+            select(parent_class.customer_id).where(parent_class.id_ == id_)
+        )
+        if customer_id is None:
+            raise EntitiesNotFoundError([id_], parent_class.__tablename__.title())
+        quantities = session.execute(
+            select(line_class.product_id, line_class.quantity).where(parent_key == id_)
+        )
+        changes = LineChanges.between(customer_id, dict(quantities.all()), entity)
+    if changes:
+        if changes.customer_id is not None:
+            check_customer_exists(session, changes.customer_id)
+        check_products_exist(session, changes.added)
+        with nullcontext({}) if track is None else track(session, [id_]) as after:
+            after.update(_apply_line_changes(session, parent_class, id_, changes))
+    entity.mark_clean()
+
+
+def _apply_line_changes(
+    session: Session, parent_class: Any, id_: int, changes: LineChanges
+) -> OrderSummaries:
+    parent_key = LINE_KEYS[parent_class]
+    line_class = parent_key.class_
+    lines = line_class.__table__
+    stores_total = "total" in parent_class.__table__.c
+    if changes.removed:
+        session.execute(
+            delete(lines).where(
+                lines.c[parent_key.key] == id_,
+                lines.c.product_id.in_(changes.removed),
+            )
+        )
+    if changes.changed:
+        session.execute(
+            update(lines)
+            .where(
+                lines.c[parent_key.key] == id_,
+                lines.c.product_id == bindparam("line_product"),
+            )
+            .values(quantity=bindparam("line_quantity")),
+            [
+                {"line_product": i, "line_quantity": n}
+                for i, n in changes.changed.items()
+            ],
+        )
+    if changes.added:
+        session.execute(
+            _LINE_INSERTS[parent_class],
+            [_line_row(id_, i, n) for i, n in changes.added.items()],
+        )
+    summaries: OrderSummaries = {}
+    if stores_total or changes.customer_id is not None:
+        result = session.execute(
+            _HEADER_UPDATES[parent_class],
+            {"parent_id": id_, "customer_id": changes.customer_id},
+        )
+        if stores_total:
+            summaries = summaries_from_rows(result)
+    for instance in list(session.identity_map.values()):
+        if isinstance(instance, parent_class):
+            stale = instance.id_ == id_
+        else:
+            stale = isinstance(instance, line_class) and (
+                getattr(instance, parent_key.key) == id_
+            )
+        if stale:
+            session.expire(instance)
+    return summaries
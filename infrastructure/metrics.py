@@ -0,0 +1,171 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Iterator, Tuple
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import CursorResult, ExceptionContext, Result
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?, ...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class QueryStats:  # pylint: disable=too-many-instance-attributes
+    name: str
+    statements: int = 0
+    seconds: float = 0.0
+    rows_affected: int = 0
+    rows_returned: int = 0
+    entities_loaded: int = 0
+    by_shape: Dict[str, StatementStats] = field(default_factory=dict)
+    repeated: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, shape: str, seconds: float, rows_affected: int):
+        self.statements += 1
+        self.seconds += seconds
+        self.rows_affected += max(rows_affected, 0)
+        stats = self.by_shape.setdefault(shape, StatementStats())
+        stats.count += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def merge(self, other: "QueryStats"):
+        self.statements += other.statements
+        self.seconds += other.seconds
+        self.rows_affected += other.rows_affected
+        self.rows_returned += other.rows_returned
+        self.entities_loaded += other.entities_loaded
+        for shape, stats in other.by_shape.items():
+            own = self.by_shape.setdefault(shape, StatementStats())
+            own.count += stats.count
+            own.seconds += stats.seconds
+            own.max_seconds = max(own.max_seconds, stats.max_seconds)
+        for shape, count in other.repeated.items():
+            self.repeated[shape] = max(self.repeated.get(shape, 0), count)
+
+
+class QueryMetrics:
+    def __init__(
+        self,
+        repeat_threshold: int = 10,
+        on_stats: Callable[[QueryStats], None] | None = None,
+    ):
+        self.repeat_threshold = repeat_threshold
+        self.on_stats = on_stats
+        self.totals: Dict[str, QueryStats] = {}
+        self._scopes: ContextVar[Tuple[QueryStats, ...]] = ContextVar(
+            f"query_scopes_{id(self)}", default=()
+        )
+
+    def attach(self, engine: Engine):
+        if not event.contains(engine, "before_cursor_execute", self._before_execute):
+            event.listen(engine, "before_cursor_execute", self._before_execute)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+            event.listen(engine, "handle_error", self._on_error)
+
+    def detach(self, engine: Engine):
+        if event.contains(engine, "before_cursor_execute", self._before_execute):
+            event.remove(engine, "before_cursor_execute", self._before_execute)
+            event.remove(engine, "after_cursor_execute", self._after_execute)
+            event.remove(engine, "handle_error", self._on_error)
+
+    def attach_session(self, session: Session):
+        if not event.contains(session, "loaded_as_persistent", self._loaded):
+            event.listen(session, "loaded_as_persistent", self._loaded)
+            event.listen(session, "do_orm_execute", self._count_rows)
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[QueryStats]:
+        stats = QueryStats(name=name)
+        token = self._scopes.set(self._scopes.get() + (stats,))
+        try:
+            yield stats
+        finally:
+            self._scopes.reset(token)
+            self.totals.setdefault(name, QueryStats(name=name)).merge(stats)
+            if self.on_stats is not None:
+                self.on_stats(stats)
+
+    def instrument(self, service):
+        for name in dir(type(service)):
+            method = getattr(service, name)
+            if name.startswith("_") or not callable(method):
+                continue
+            scope_name = f"{type(service).__name__}.{name}"
+            setattr(service, name, self._wrap(scope_name, method))
+        return service
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.scope(name):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    def _before_execute(self, conn, _cursor, _statement, _parameters, _context, _many):
+        conn.info.setdefault("query_metrics_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, _parameters, _context, _many):
+        started = conn.info.get("query_metrics_started")
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        scopes = self._scopes.get()
+        if not scopes:
+            return
+        shape = statement_shape(statement)
+        for stats in scopes:
+            stats.record(shape, seconds, cursor.rowcount)
+            count = stats.by_shape[shape].count
+            if count > self.repeat_threshold and shape not in stats.repeated:
+                logger.warning(
+                    "Possible N+1 in %s: statement repeated more than %d times: %s",
+                    stats.name,
+                    self.repeat_threshold,
+                    shape,
+                )
+            if count > self.repeat_threshold:
+                stats.repeated[shape] = count
+
+    def _on_error(self, context: ExceptionContext):
+        if context.connection is None:
+            return
+        started = context.connection.info.get("query_metrics_started")
+        if started:
+            started.pop()
+
+    def _count_rows(self, state: ORMExecuteState) -> Result | None:
+        scopes = self._scopes.get()
+        options = state.execution_options
+        if not scopes or options.get("yield_per") or options.get("stream_results"):
+            return None
+        result = state.invoke_statement()
+        if isinstance(result, CursorResult) and not result.returns_rows:
+            return result
+        frozen = result.freeze()
+        for stats in scopes:
+            stats.rows_returned += len(frozen.data)
+        return frozen()
+
+    def _loaded(self, _session, _instance):
+        for stats in self._scopes.get():
+            stats.entities_loaded += 1
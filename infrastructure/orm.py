@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Float, ForeignKey
+from sqlalchemy import Boolean, Integer, String, Float, ForeignKey
 from sqlalchemy.orm import relationship, DeclarativeBase, mapped_column, Mapped
 
 
@@ -9,9 +9,12 @@ class Base(DeclarativeBase):
 class ProductORM(Base):
     __tablename__ = "products"
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String)
+    name: Mapped[str] = mapped_column(String, index=True)
     quantity: Mapped[int] = mapped_column(Integer)
     price: Mapped[float] = mapped_column(Float)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class CustomerORM(Base):
@@ -26,36 +29,57 @@ class OrderProductORM(Base):
         Integer, ForeignKey("orders.id_"), primary_key=True
     )
     product_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("products.id_"), primary_key=True
+        Integer, ForeignKey("products.id_"), primary_key=True, index=True
     )
+    quantity: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    unit_price: Mapped[float | None] = mapped_column(Float, nullable=True)
     product: Mapped[ProductORM] = relationship(lazy="joined")
 
 
 class OrderORM(Base):
     __tablename__ = "orders"
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
-    customer_id: Mapped[int] = mapped_column(Integer, ForeignKey("customers.id_"))
+    customer_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("customers.id_"), index=True
+    )
+    total: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+    reserved: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default="0"
+    )
     customer: Mapped[CustomerORM] = relationship(lazy="joined")
     products: Mapped[list[OrderProductORM]] = relationship(
         cascade="all, delete-orphan", backref="orders"
     )
 
 
+class CustomerStatsORM(Base):
+    __tablename__ = "customer_stats"
+    customer_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("customers.id_"), primary_key=True
+    )
+    order_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_spent: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+    last_order_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
 class WishlistProductORM(Base):
     __tablename__ = "wishlist_products"
     wishlist_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("wishlists.id_"), primary_key=True
     )
     product_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("products.id_"), primary_key=True
+        Integer, ForeignKey("products.id_"), primary_key=True, index=True
     )
+    quantity: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     product: Mapped[ProductORM] = relationship(lazy="joined")
 
 
 class WishlistORM(Base):
     __tablename__ = "wishlists"
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
-    customer_id: Mapped[int] = mapped_column(Integer, ForeignKey("customers.id_"))
+    customer_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("customers.id_"), index=True
+    )
     customer: Mapped[CustomerORM] = relationship(lazy="joined")
     products: Mapped[list[WishlistProductORM]] = relationship(
         cascade="all, delete-orphan", backref="wishlists"
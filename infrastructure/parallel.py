@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from sqlalchemy import Engine, func, select
+from sqlalchemy.orm import Session
+from domain.reports import CheckoutReport
+from domain.services import OrderService
+from .database import create_database_engine, create_read_only_engine
+from .orm import OrderORM
+from .schema import ensure_schema
+from .unit_of_work import SqlAlchemyUnitOfWork
+
+SHARD_SIZE = 10_000
+
+_REPORT_COLUMNS = ("id_", "customer_id", "total")
+
+_engine: Engine | None = None
+
+
+def shard_ranges(first_id: int, last_id: int, shard_size: int) -> List[Tuple[int, int]]:
+    if shard_size < 1:
+        raise ValueError("shard_size must be positive")
+    return [
+        (start, min(start + shard_size - 1, last_id))
+        for start in range(first_id, last_id + 1, shard_size)
+    ]
+
+
+def _init_worker(url: str):
+    global _engine  # pylint: disable=global-statement
+    _engine = create_read_only_engine(url)
+
+
+def checkout_shard(shard: Tuple[int, int]) -> CheckoutReport:
+    return _checkout(_engine, shard)
+
+
+def _checkout(engine: Engine, shard: Tuple[int, int]) -> CheckoutReport:
+    with SqlAlchemyUnitOfWork(Session(engine)) as uow:
+        rows = OrderService(uow).project(_REPORT_COLUMNS, id_range=shard)
+    return CheckoutReport.from_rows(rows)
+
+
+def _order_id_bounds(engine: Engine) -> Tuple[int, int] | None:
+    with engine.connect() as connection:
+        first_id, last_id = connection.execute(
+            select(func.min(OrderORM.id_), func.max(OrderORM.id_))
+        ).one()
+    return None if first_id is None else (first_id, last_id)
+
+
+def run_batch_checkout(
+    url: str, workers: int | None = None, shard_size: int = SHARD_SIZE
+) -> CheckoutReport:
+    report = CheckoutReport()
+    engine = create_database_engine(url)
+    try:
+        ensure_schema(engine)
+        bounds = _order_id_bounds(engine)
+        shards = [] if bounds is None else shard_ranges(*bounds, shard_size)
+        if workers == 1:
+            for shard in shards:
+                report.merge(_checkout(engine, shard))
+            return report
+    finally:
+        engine.dispose()
+    if not shards:
+        return report
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(url,)
+    ) as executor:
+        for shard_report in executor.map(checkout_shard, shards):
+            report.merge(shard_report)
+    return report
@@ -1,12 +1,68 @@
-from typing import List
-from sqlalchemy.orm import Session
-from domain.models import Order, Product, Customer, Wishlist
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+from sqlalchemy import (
+    Integer,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, joinedload, lazyload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from domain.exceptions import (
+    ConcurrencyError,
+    EntitiesNotFoundError,
+    OutOfStockError,
+    ProductsNotFoundError,
+)
+from domain.models import (
+    Customer,
+    CustomerStats,
+    Order,
+    OrderLine,
+    Product,
+    ProductLinesHeader,
+    TotalDrift,
+    Wishlist,
+)
 from domain.repositories import (
     ProductRepository,
     OrderRepository,
     CustomerRepository,
     WishlistRepository,
+    TOTAL_TOLERANCE,
+    validate_projection,
+)
+from .aggregates import (
+    apply_customer_stats,
+    backfill_customer_stats,
+    find_total_drift,
+    freeze_unit_prices,
+    load_customer_stats,
+    refresh_order_totals,
+    tracking_customer_stats,
+)
+from .identity_map import IdentityMap
+from .lines import (
+    LINE_KEYS,
+    check_customer_exists,
+    check_products_exist,
+    insert_lines,
+    write_line_changes,
 )
+from .routing import SessionRouter
 from .orm import (
     ProductORM,
     OrderORM,
@@ -16,13 +72,274 @@ from .orm import (
     OrderProductORM,
 )
 
+if TYPE_CHECKING:
+    from domain.catalog import CatalogSnapshot
+
+
+def _get_products_by_ids(session: Session, ids: Iterable[int]) -> List[ProductORM]:
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return []
+    product_orms = session.query(ProductORM).filter(ProductORM.id_.in_(ids)).all()
+    found: Dict[int, ProductORM] = {p.id_: p for p in product_orms}
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise ProductsNotFoundError(missing)
+    return [found[i] for i in ids]
+
+
+def _ordered(entities: Dict[int, object], ids: List[int], entity: str) -> list:
+    missing = [i for i in ids if i not in entities]
+    if missing:
+        raise EntitiesNotFoundError(missing, entity)
+    return [entities[i] for i in ids]
+
+
+def _iter_keyset(
+    session: Session,
+    orm_class: Any,
+    from_orm: Callable[[Any], Any],
+    batch_size: int,
+    after_id: int | None,
+    *options,
+) -> Iterator[Any]:
+    while True:
+        query = select(orm_class).order_by(orm_class.id_).limit(batch_size)
+        if after_id is not None:
+            query = query.where(orm_class.id_ > after_id)
+        batch = [from_orm(row) for row in session.scalars(query.options(*options))]
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        after_id = batch[-1].id_
+
+
+_LOADERS = {"selectin": selectinload, "joined": joinedload, "lazy": lazyload}
+
+
+def _loader_option(relationship: Any, loader: str) -> Any:
+    if loader not in _LOADERS:
+        raise ValueError(f"Unknown loader {loader!r}, expected one of {list(_LOADERS)}")
+    return _LOADERS[loader](relationship)
+
+
+def _list_headers(
+    session: Session, parent_class: Any, ids: List[int] | None
+) -> List[ProductLinesHeader]:
+    query = (
+        select(parent_class.id_, CustomerORM.id_, CustomerORM.name)
+        .join(CustomerORM, CustomerORM.id_ == parent_class.customer_id)
+        .order_by(parent_class.id_)
+    )
+    if ids:
+        query = query.where(parent_class.id_.in_(ids))
+    return [
+        ProductLinesHeader(
+            id_=id_, customer=Customer(id_=customer_id, name=customer_name)
+        )
+        for id_, customer_id, customer_name in session.execute(query)
+    ]
+
+
+def _project(
+    session: Session,
+    parent_class: Any,
+    columns: Sequence[str],
+    ids: List[int] | None,
+    id_range: Tuple[int, int] | None = None,
+) -> List[Dict[str, Any]]:
+    validate_projection(columns)
+    parent_key = LINE_KEYS[parent_class]
+    line_class = parent_key.class_
+    stored_total = getattr(parent_class, "total", None)
+    expressions = {
+        "id_": parent_class.id_,
+        "customer_id": parent_class.customer_id,
+        "customer_name": CustomerORM.name,
+        # pylint: disable-next=not-callable
+        "line_count": func.count(line_class.product_id),
+        "total": (
+            func.coalesce(func.sum(ProductORM.price * line_class.quantity), 0.0)
+            if stored_total is None
+            else stored_total
+        ),
+    }
+    computed_total = "total" in columns and stored_total is None
+    query = (
+        select(*(expressions[c].label(c) for c in columns))
+        .select_from(parent_class)
+        .group_by(parent_class.id_)
+        .order_by(parent_class.id_)
+    )
+    if "customer_name" in columns:
+        query = query.join(
+            CustomerORM, CustomerORM.id_ == parent_class.customer_id
+        ).group_by(CustomerORM.id_)
+    if "line_count" in columns or computed_total:
+        query = query.outerjoin(line_class, parent_key == parent_class.id_)
+    if computed_total:
+        query = query.outerjoin(ProductORM, ProductORM.id_ == line_class.product_id)
+    if ids:
+        query = query.where(parent_class.id_.in_(ids))
+    if id_range is not None:
+        query = query.where(parent_class.id_.between(*id_range))
+    return [dict(row) for row in session.execute(query).mappings()]
+
+
+_products = ProductORM.__table__
+
+_UPDATE_PRODUCT = (
+    update(_products)
+    .where(_products.c.id_ == bindparam("product_id"))
+    .values(
+        name=bindparam("name"),
+        quantity=bindparam("quantity"),
+        price=bindparam("price"),
+        version=_products.c.version + 1,
+    )
+)
+
+_BUSY_ERRORS = ("database is locked", "database table is locked", "database is busy")
+
+
+def _is_busy(error: OperationalError) -> bool:
+    return str(error.orig).lower().startswith(_BUSY_ERRORS)
+
+
+_RESERVE_STOCK = (
+    update(_products)
+    .where(
+        _products.c.id_ == bindparam("product_id"),
+        _products.c.version == bindparam("expected_version"),
+        _products.c.quantity >= bindparam("reserved"),
+    )
+    .values(
+        quantity=_products.c.quantity - bindparam("reserved"),
+        version=_products.c.version + 1,
+    )
+)
+
+
+_orders = OrderORM.__table__
+_order_lines = OrderProductORM.__table__
+_wishlists = WishlistORM.__table__
+_wishlist_lines = WishlistProductORM.__table__
+
+WISHLIST_CONVERSION_CHUNK = 10_000
+
+_MARK_RESERVED = (
+    update(_orders)
+    .where(_orders.c.id_ == bindparam("order_id"), _orders.c.reserved.is_(False))
+    .values(reserved=True)
+)
+
+_ORDERS_FROM_WISHLISTS = insert(_orders).from_select(
+    ["id_", "customer_id"],
+    select(bindparam("order_id", type_=Integer), _wishlists.c.customer_id).where(
+        _wishlists.c.id_ == bindparam("wishlist_id")
+    ),
+)
+
+_ORDER_LINES_FROM_WISHLISTS = insert(_order_lines).from_select(
+    ["order_id", "product_id", "quantity", "unit_price"],
+    select(
+        bindparam("order_id", type_=Integer),
+        _wishlist_lines.c.product_id,
+        _wishlist_lines.c.quantity,
+        _products.c.price,
+    )
+    .join(_products, _products.c.id_ == _wishlist_lines.c.product_id)
+    .where(_wishlist_lines.c.wishlist_id == bindparam("wishlist_id")),
+)
+
+
+def _allocate_orders_from_wishlists(ids: List[int]) -> Any:
+    next_id = select(func.coalesce(func.max(_orders.c.id_), 0)).scalar_subquery()
+    return insert(_orders).from_select(
+        ["id_", "customer_id"],
+        select(
+            next_id + func.row_number().over(order_by=_wishlists.c.id_),
+            _wishlists.c.customer_id,
+        ).where(_wishlists.c.id_.in_(ids)),
+    )
+
+
+def _check_wishlists_exist(session: Session, ids: List[int]):
+    found = set(
+        session.scalars(select(_wishlists.c.id_).where(_wishlists.c.id_.in_(ids)))
+    )
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise EntitiesNotFoundError(missing, "Wishlists")
+
+
+def _product_from_orm(product_orm: ProductORM) -> Product:
+    return Product(
+        id_=product_orm.id_,
+        name=product_orm.name,
+        quantity=product_orm.quantity,
+        price=product_orm.price,
+        version=product_orm.version,
+    )
+
+
+def _customer_from_orm(customer_orm: CustomerORM) -> Customer:
+    return Customer(id_=customer_orm.id_, name=customer_orm.name)
+
+
+def _lines_from_orm(
+    line_orms: Iterable[OrderProductORM | WishlistProductORM],
+) -> List[OrderLine]:
+    return [
+        OrderLine(
+            product=_product_from_orm(p.product),
+            quantity=p.quantity,
+            unit_price=getattr(p, "unit_price", None),
+        )
+        for p in line_orms
+    ]
+
+
+def _unit_price(line: OrderLine, product_orm: ProductORM) -> float:
+    return product_orm.price if line.unit_price is None else line.unit_price
+
+
+def _order_from_orm(order_orm: OrderORM) -> Order:
+    order = Order(
+        id_=order_orm.id_,
+        customer=_customer_from_orm(order_orm.customer),
+        lines=_lines_from_orm(order_orm.products),
+    )
+    order.mark_clean()
+    return order
+
+
+def _wishlist_from_orm(wishlist_orm: WishlistORM) -> Wishlist:
+    wishlist = Wishlist(
+        id_=wishlist_orm.id_,
+        customer=_customer_from_orm(wishlist_orm.customer),
+        lines=_lines_from_orm(wishlist_orm.products),
+    )
+    wishlist.mark_clean()
+    return wishlist
+
 
 class SqlAlchemyProductRepository(ProductRepository):
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        identity_map: IdentityMap | None = None,
+        router: SessionRouter | None = None,
+    ):
         self.session = session
+        self.router = SessionRouter(session) if router is None else router
+        self.identity_map = (
+            IdentityMap(maxsize=0) if identity_map is None else identity_map
+        )
 
     def add(self, entity: Product):
         product_orm = ProductORM(
+            id_=entity.id_,
             name=entity.name,
             quantity=entity.quantity,
             price=entity.price,
@@ -30,232 +347,595 @@ class SqlAlchemyProductRepository(ProductRepository):
         self.session.add(product_orm)
 
     def get(self, id_: int) -> Product:
-        product_orm = self.session.query(ProductORM).filter_by(id_=id_).one()
-        return Product(
-            id_=product_orm.id_,
-            name=product_orm.name,
-            quantity=product_orm.quantity,
-            price=product_orm.price,
-        )
+        return self.identity_map.get_or_load(Product, id_, lambda: self._load(id_))
+
+    def _load(self, id_: int) -> Product:
+        product_orm = self.router.reader.query(ProductORM).filter_by(id_=id_).one()
+        return _product_from_orm(product_orm)
 
     def list(self, ids: List[int] | None = None) -> List[Product]:
-        query = self.session.query(ProductORM)
+        query = self.router.reader.query(ProductORM)
         if ids:
             query = query.filter(ProductORM.id_.in_(ids))
         products_orm = query.all()
-        return [
-            Product(id_=p.id_, name=p.name, quantity=p.quantity, price=p.price)
-            for p in products_orm
-        ]
+        return [_product_from_orm(p) for p in products_orm]
 
     def update(self, id_: int, entity: Product):
+        self._invalidate([id_])
         product_orm = self.session.query(ProductORM).filter_by(id_=id_).one()
+        if entity.version is not None and entity.version != product_orm.version:
+            raise ConcurrencyError(f"Product {id_} was modified concurrently")
         product_orm.name = entity.name
         product_orm.quantity = entity.quantity
         product_orm.price = entity.price
         self.session.add(product_orm)
-        return self.get(id_)
+        try:
+            self.session.flush()
+        except StaleDataError as e:
+            raise ConcurrencyError(f"Product {id_} was modified concurrently") from e
+        product = _product_from_orm(product_orm)
+        self.identity_map.put(Product, id_, product)
+        return product
 
     def delete(self, id_: int):
+        self._invalidate([id_])
         product_orm = self.session.query(ProductORM).filter_by(id_=id_).one()
         self.session.delete(product_orm)
 
+    def add_many(self, entities: List[Product]):
+        if not entities:
+            return
+        self.session.execute(
+            insert(ProductORM),
+            [
+                {"id_": p.id_, "name": p.name, "quantity": p.quantity, "price": p.price}
+                for p in entities
+            ],
+        )
+
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[Product]:
+        return _iter_keyset(
+            self.router.reader, ProductORM, _product_from_orm, batch_size, after_id
+        )
+
+    def get_many(self, ids: List[int]) -> List[Product]:
+        products_orm = self.router.reader.scalars(
+            select(ProductORM).where(ProductORM.id_.in_(ids))
+        )
+        found = {p.id_: _product_from_orm(p) for p in products_orm}
+        return _ordered(found, ids, "Products")
+
+    def update_many(self, entities: List[Product]):
+        if not entities:
+            return
+        self._invalidate(p.id_ for p in entities)
+        self.session.execute(
+            _UPDATE_PRODUCT,
+            [
+                {
+                    "product_id": p.id_,
+                    "name": p.name,
+                    "quantity": p.quantity,
+                    "price": p.price,
+                }
+                for p in entities
+            ],
+        )
+        self._expire(p.id_ for p in entities)
+
+    def delete_many(self, ids: List[int]):
+        self._invalidate(ids)
+        self.session.execute(delete(ProductORM).where(ProductORM.id_.in_(ids)))
+
+    def snapshot(self) -> "CatalogSnapshot":
+        # pylint: disable-next=import-outside-toplevel
+        from domain.catalog import CatalogSnapshot
+
+        rows = self.router.reader.execute(
+            select(ProductORM.id_, ProductORM.price, ProductORM.quantity).order_by(
+                ProductORM.id_
+            )
+        ).all()
+        return CatalogSnapshot(
+            [r.id_ for r in rows], [r.price for r in rows], [r.quantity for r in rows]
+        )
+
+    def reserve(self, quantities: Dict[int, int]):
+        if not quantities:
+            return
+        rows = self.session.execute(
+            select(ProductORM.id_, ProductORM.version, ProductORM.quantity).where(
+                ProductORM.id_.in_(quantities)
+            )
+        ).all()
+        found = {row.id_: row for row in rows}
+        missing = [i for i in quantities if i not in found]
+        if missing:
+            raise ProductsNotFoundError(missing)
+        short = [i for i, n in quantities.items() if found[i].quantity < n]
+        if short:
+            raise OutOfStockError(short)
+        try:
+            result = self.session.execute(
+                _RESERVE_STOCK,
+                [
+                    {
+                        "product_id": i,
+                        "expected_version": found[i].version,
+                        "reserved": n,
+                    }
+                    for i, n in quantities.items()
+                ],
+            )
+        except OperationalError as e:
+            if not _is_busy(e):
+                raise
+            raise ConcurrencyError("Stock was modified concurrently") from e
+        if result.rowcount != len(quantities):
+            raise ConcurrencyError("Stock was modified concurrently")
+        self._invalidate(quantities)
+        self._expire(quantities)
+
+    def _expire(self, ids: Iterable[int]):
+        ids = set(ids)
+        for instance in list(self.session.identity_map.values()):
+            if isinstance(instance, ProductORM) and instance.id_ in ids:
+                self.session.expire(instance)
+
+    def _invalidate(self, ids: Iterable[int]):
+        self.identity_map.invalidate(Product, ids)
+        self.identity_map.invalidate_model(Order)
+        self.identity_map.invalidate_model(Wishlist)
+
 
 class SqlAlchemyCustomerRepository(CustomerRepository):
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        identity_map: IdentityMap | None = None,
+        router: SessionRouter | None = None,
+    ):
         self.session = session
+        self.router = SessionRouter(session) if router is None else router
+        self.identity_map = (
+            IdentityMap(maxsize=0) if identity_map is None else identity_map
+        )
 
     def add(self, entity: Customer):
-        customer_orm = CustomerORM(name=entity.name)
+        customer_orm = CustomerORM(id_=entity.id_, name=entity.name)
         self.session.add(customer_orm)
 
     def get(self, id_: int) -> Customer:
-        customer_orm = self.session.query(CustomerORM).filter_by(id_=id_).one()
-        return Customer(id_=customer_orm.id_, name=customer_orm.name)
+        return self.identity_map.get_or_load(Customer, id_, lambda: self._load(id_))
+
+    def _load(self, id_: int) -> Customer:
+        customer_orm = self.router.reader.query(CustomerORM).filter_by(id_=id_).one()
+        return _customer_from_orm(customer_orm)
 
     def list(self, ids: List[int] | None = None) -> List[Customer]:
-        query = self.session.query(CustomerORM)
+        query = self.router.reader.query(CustomerORM)
         if ids:
             query = query.filter(CustomerORM.id_.in_(ids))
         customers_orm = query.all()
-        return [Customer(id_=c.id_, name=c.name) for c in customers_orm]
+        return [_customer_from_orm(c) for c in customers_orm]
 
     def update(self, id_: int, entity: Customer):
+        self._invalidate([id_])
         customer_orm = self.session.query(CustomerORM).filter_by(id_=id_).one()
         customer_orm.name = entity.name
         self.session.add(customer_orm)
-        return self.get(id_)
+        customer = _customer_from_orm(customer_orm)
+        self.identity_map.put(Customer, id_, customer)
+        return customer
 
     def delete(self, id_: int):
+        self._invalidate([id_])
         customer_orm = self.session.query(CustomerORM).filter_by(id_=id_).one()
         self.session.delete(customer_orm)
 
+    def add_many(self, entities: List[Customer]):
+        if not entities:
+            return
+        self.session.execute(
+            insert(CustomerORM), [{"id_": c.id_, "name": c.name} for c in entities]
+        )
 
-class SqlAlchemyOrderRepository(OrderRepository):
-    def __init__(self, session: Session):
-        self.session = session
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[Customer]:
+        return _iter_keyset(
+            self.router.reader, CustomerORM, _customer_from_orm, batch_size, after_id
+        )
 
-    def add(self, entity: Order):
-        order_orm = OrderORM(
-            customer_id=entity.customer.id_,
+    def get_many(self, ids: List[int]) -> List[Customer]:
+        customers_orm = self.router.reader.scalars(
+            select(CustomerORM).where(CustomerORM.id_.in_(ids))
         )
-        order_orm.customer = (
-            self.session.query(CustomerORM).filter_by(id_=entity.customer.id_).one()
+        found = {c.id_: _customer_from_orm(c) for c in customers_orm}
+        return _ordered(found, ids, "Customers")
+
+    def update_many(self, entities: List[Customer]):
+        if not entities:
+            return
+        self._invalidate(c.id_ for c in entities)
+        self.session.execute(
+            update(CustomerORM), [{"id_": c.id_, "name": c.name} for c in entities]
         )
 
-        product_orms = [
-            self.session.query(ProductORM).filter_by(id_=p.id_).one()
-            for p in entity.products
-        ]
+    def delete_many(self, ids: List[int]):
+        self._invalidate(ids)
+        self.session.execute(delete(CustomerORM).where(CustomerORM.id_.in_(ids)))
+
+    def _invalidate(self, ids: Iterable[int]):
+        self.identity_map.invalidate(Customer, ids)
+        self.identity_map.invalidate_model(Order)
+        self.identity_map.invalidate_model(Wishlist)
+
+
+# pylint: disable-next=too-many-public-methods
+class SqlAlchemyOrderRepository(OrderRepository):
+    def __init__(
+        self,
+        session: Session,
+        identity_map: IdentityMap | None = None,
+        router: SessionRouter | None = None,
+    ):
+        self.session = session
+        self.router = SessionRouter(session) if router is None else router
+        self.identity_map = (
+            IdentityMap(maxsize=0) if identity_map is None else identity_map
+        )
+
+    def add(self, entity: Order):
+        check_customer_exists(self.session, entity.customer.id_)
+        product_orms = _get_products_by_ids(self.session, entity.lines)
+        order_orm = OrderORM(id_=entity.id_, customer_id=entity.customer.id_)
         order_orm.products = [
-            OrderProductORM(product=product_orms[i], order_id=order_orm.id_)
-            for i in range(len(product_orms))
+            OrderProductORM(
+                product=product_orm,
+                order_id=order_orm.id_,
+                quantity=entity.lines[product_orm.id_].quantity,
+                unit_price=_unit_price(entity.lines[product_orm.id_], product_orm),
+            )
+            for product_orm in product_orms
         ]
+        order_orm.total = sum(p.unit_price * p.quantity for p in order_orm.products)
         self.session.add(order_orm)
+        self.session.flush()
+        apply_customer_stats(
+            self.session, {}, {order_orm.id_: (order_orm.customer_id, order_orm.total)}
+        )
 
     def get(self, id_: int) -> Order:
-        order_orm = self.session.query(OrderORM).filter_by(id_=id_).one()
-        products = [
-            Product(
-                id_=p.product.id_,
-                name=p.product.name,
-                quantity=p.product.quantity,
-                price=p.product.price,
-            )
-            for p in order_orm.products
-        ]
-        return Order(
-            id_=order_orm.id_,
-            customer=Customer(id_=order_orm.customer.id_, name=order_orm.customer.name),
-            products=products,
-        )
+        return self.identity_map.get_or_load(Order, id_, lambda: self._load(id_))
+
+    def _load(self, id_: int) -> Order:
+        order_orm = self.router.reader.query(OrderORM).filter_by(id_=id_).one()
+        return _order_from_orm(order_orm)
 
-    def list(self, ids: List[int] | None = None) -> List[Order]:
-        query = self.session.query(OrderORM)
+    def list(
+        self, ids: List[int] | None = None, loader: str = "selectin"
+    ) -> List[Order]:
+        query = self.router.reader.query(OrderORM).options(
+            _loader_option(OrderORM.products, loader)
+        )
         if ids:
             query = query.filter(OrderORM.id_.in_(ids))
         orders_orm = query.all()
-        orders = []
-        for order_orm in orders_orm:
-            products = [
-                Product(
-                    id_=p.product.id_,
-                    name=p.product.name,
-                    quantity=p.product.quantity,
-                    price=p.product.price,
-                )
-                for p in order_orm.products
-            ]
-            orders.append(
-                Order(
-                    id_=order_orm.id_,
-                    customer=Customer(
-                        id_=order_orm.customer.id_, name=order_orm.customer.name
-                    ),
-                    products=products,
-                )
-            )
-        return orders
+        return [_order_from_orm(order_orm) for order_orm in orders_orm]
+
+    def list_headers(self, ids: List[int] | None = None) -> List[ProductLinesHeader]:
+        return _list_headers(self.router.reader, OrderORM, ids)
+
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return _project(self.router.reader, OrderORM, columns, ids, id_range)
 
     def update(self, id_: int, entity: Order):
-        order_orm = self.session.query(OrderORM).filter_by(id_=id_).one()
-        product_orms = [
-            self.session.query(ProductORM).filter_by(id_=p.id_).one()
-            for p in entity.products
-        ]
-        order_orm.products = [
-            OrderProductORM(product=i, order_id=order_orm.id_) for i in product_orms
-        ]
-        self.session.add(order_orm)
-        return self.get(id_)
+        self.identity_map.invalidate(Order, [id_])
+        write_line_changes(
+            self.session, OrderORM, id_, entity, tracking_customer_stats
+        )
+        return entity
 
     def delete(self, id_: int):
+        self.identity_map.invalidate(Order, [id_])
         order_orm = self.session.query(OrderORM).filter_by(id_=id_).one()
-        self.session.delete(order_orm)
+        with tracking_customer_stats(self.session, [id_]):
+            self.session.delete(order_orm)
+            self.session.flush()
+
+    def add_many(self, entities: List[Order]):
+        if not entities:
+            return
+        check_products_exist(
+            self.session, (id_ for order in entities for id_ in order.lines)
+        )
+        self.session.execute(
+            insert(OrderORM),
+            [{"id_": o.id_, "customer_id": o.customer.id_} for o in entities],
+        )
+        insert_lines(self.session, OrderORM, entities)
+        summaries = refresh_order_totals(self.session, (o.id_ for o in entities))
+        apply_customer_stats(self.session, {}, summaries)
+
+    def list_by_customer(self, customer_id: int) -> List[Order]:
+        orders_orm = self.router.reader.scalars(
+            select(OrderORM)
+            .where(OrderORM.customer_id == customer_id)
+            .order_by(OrderORM.id_)
+            .options(selectinload(OrderORM.products))
+        )
+        return [_order_from_orm(order_orm) for order_orm in orders_orm]
+
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[Order]:
+        return _iter_keyset(
+            self.router.reader,
+            OrderORM,
+            _order_from_orm,
+            batch_size,
+            after_id,
+            selectinload(OrderORM.products),
+        )
+
+    def get_many(self, ids: List[int]) -> List[Order]:
+        orders_orm = self.router.reader.scalars(
+            select(OrderORM)
+            .where(OrderORM.id_.in_(ids))
+            .options(selectinload(OrderORM.products))
+        )
+        found = {o.id_: _order_from_orm(o) for o in orders_orm}
+        return _ordered(found, ids, "Orders")
+
+    def update_many(self, entities: List[Order]):
+        if not entities:
+            return
+        self.identity_map.invalidate(Order, (e.id_ for e in entities))
+        check_products_exist(
+            self.session, (id_ for order in entities for id_ in order.lines)
+        )
+        ids = [o.id_ for o in entities]
+        with tracking_customer_stats(self.session, ids) as after:
+            self.session.execute(
+                update(OrderORM),
+                [{"id_": o.id_, "customer_id": o.customer.id_} for o in entities],
+            )
+            self.session.execute(
+                delete(OrderProductORM).where(OrderProductORM.order_id.in_(ids))
+            )
+            insert_lines(self.session, OrderORM, entities)
+            after.update(refresh_order_totals(self.session, ids))
+
+    def delete_many(self, ids: List[int]):
+        self.identity_map.invalidate(Order, ids)
+        with tracking_customer_stats(self.session, ids):
+            self.session.execute(
+                delete(OrderProductORM).where(OrderProductORM.order_id.in_(ids))
+            )
+            self.session.execute(delete(OrderORM).where(OrderORM.id_.in_(ids)))
+
+    def total(self, order_id: int) -> float:
+        query = select(OrderORM.total).where(OrderORM.id_ == order_id)
+        return float(self.router.reader.execute(query).scalar_one())
+
+    def totals(self, order_ids: List[int]) -> Dict[int, float]:
+        query = select(OrderORM.id_, OrderORM.total).where(
+            OrderORM.id_.in_(order_ids)
+        )
+        totals = {id_: float(total) for id_, total in self.router.reader.execute(query)}
+        missing = [i for i in order_ids if i not in totals]
+        if missing:
+            raise EntitiesNotFoundError(missing, "Orders")
+        return totals
+
+    def add_from_wishlists(
+        self, wishlist_ids: List[int], order_ids: List[int] | None = None
+    ) -> Dict[int, int]:
+        self.session.flush()
+        if order_ids is None:
+            converted = self._allocate_from_wishlists(sorted(set(wishlist_ids)))
+        else:
+            if len(order_ids) != len(wishlist_ids):
+                raise ValueError("Expected one order id per wishlist")
+            _check_wishlists_exist(self.session, list(wishlist_ids))
+            converted = dict(zip(wishlist_ids, order_ids))
+            if converted:
+                self.session.execute(_ORDERS_FROM_WISHLISTS, self._pairs(converted))
+        if converted:
+            self.session.execute(_ORDER_LINES_FROM_WISHLISTS, self._pairs(converted))
+            summaries = refresh_order_totals(self.session, converted.values())
+            apply_customer_stats(self.session, {}, summaries)
+        return converted
+
+    def customer_stats(self, customer_id: int) -> CustomerStats:
+        return load_customer_stats(self.router.reader, customer_id)
+
+    def rebuild_customer_stats(self) -> int:
+        self.session.flush()
+        return backfill_customer_stats(self.session)
+
+    def total_drift(self, tolerance: float = TOTAL_TOLERANCE) -> List[TotalDrift]:
+        return find_total_drift(self.router.reader, tolerance)
+
+    def rebuild_totals(self, tolerance: float = TOTAL_TOLERANCE) -> int:
+        self.session.flush()
+        freeze_unit_prices(self.session)
+        ids = [drift.order_id for drift in find_total_drift(self.session, tolerance)]
+        self.identity_map.invalidate(Order, ids)
+        with tracking_customer_stats(self.session, ids) as after:
+            after.update(refresh_order_totals(self.session, ids))
+        self.session.expire_all()
+        return len(ids)
+
+    def mark_reserved(self, order_id: int) -> bool:
+        self.session.flush()
+        try:
+            result = self.session.execute(_MARK_RESERVED, {"order_id": order_id})
+        except OperationalError as e:
+            if not _is_busy(e):
+                raise
+            raise ConcurrencyError("Order was reserved concurrently") from e
+        if result.rowcount:
+            return True
+        if self.session.get(OrderORM, order_id) is None:
+            raise EntitiesNotFoundError([order_id], "Orders")
+        return False
+
+    def _allocate_from_wishlists(self, wishlist_ids: List[int]) -> Dict[int, int]:
+        converted: Dict[int, int] = {}
+        for start in range(0, len(wishlist_ids), WISHLIST_CONVERSION_CHUNK):
+            chunk = wishlist_ids[start : start + WISHLIST_CONVERSION_CHUNK]
+            _check_wishlists_exist(self.session, chunk)
+            self.session.execute(_allocate_orders_from_wishlists(chunk))
+            last_id = self.session.scalar(select(func.max(_orders.c.id_)))
+            converted.update(zip(chunk, range(last_id - len(chunk) + 1, last_id + 1)))
+        return converted
+
+    @staticmethod
+    def _pairs(converted: Dict[int, int]) -> List[Dict[str, int]]:
+        return [
+            {"wishlist_id": wishlist_id, "order_id": order_id}
+            for wishlist_id, order_id in converted.items()
+        ]
 
 
 class SqlAlchemyWishlistRepository(WishlistRepository):
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        identity_map: IdentityMap | None = None,
+        router: SessionRouter | None = None,
+    ):
         self.session = session
+        self.router = SessionRouter(session) if router is None else router
+        self.identity_map = (
+            IdentityMap(maxsize=0) if identity_map is None else identity_map
+        )
 
     def add(self, entity: Wishlist):
-        wishlist_orm = WishlistORM()
-        wishlist_orm.customer = (
-            self.session.query(CustomerORM).filter_by(id_=entity.customer.id_).one()
-        )
-        product_orms = [
-            self.session.query(ProductORM).filter_by(id_=p.id_).one()
-            for p in entity.products
-        ]
+        check_customer_exists(self.session, entity.customer.id_)
+        wishlist_orm = WishlistORM(id_=entity.id_, customer_id=entity.customer.id_)
+        product_orms = _get_products_by_ids(self.session, entity.lines)
         wishlist_orm.products = [
-            WishlistProductORM(product=i, wishlist_id=wishlist_orm.id_)
-            for i in product_orms
-            for p in entity.products
+            WishlistProductORM(
+                product=product_orm,
+                wishlist_id=wishlist_orm.id_,
+                quantity=entity.lines[product_orm.id_].quantity,
+            )
+            for product_orm in product_orms
         ]
         self.session.add(wishlist_orm)
 
     def get(self, id_: int) -> Wishlist:
-        wishlist_orm = self.session.query(WishlistORM).filter_by(id_=id_).one()
-        products = [
-            Product(
-                id_=p.product.id_,
-                name=p.product.name,
-                quantity=p.product.quantity,
-                price=p.product.price,
-            )
-            for p in wishlist_orm.products
-        ]
-        return Wishlist(
-            id_=wishlist_orm.id_,
-            customer=Customer(
-                id_=wishlist_orm.customer.id_, name=wishlist_orm.customer.name
-            ),
-            products=products,
-        )
+        return self.identity_map.get_or_load(Wishlist, id_, lambda: self._load(id_))
 
-    def list(self, ids: List[int] | None = None) -> List[Wishlist]:
-        query = self.session.query(WishlistORM)
+    def _load(self, id_: int) -> Wishlist:
+        wishlist_orm = self.router.reader.query(WishlistORM).filter_by(id_=id_).one()
+        return _wishlist_from_orm(wishlist_orm)
+
+    def list(
+        self, ids: List[int] | None = None, loader: str = "selectin"
+    ) -> List[Wishlist]:
+        query = self.router.reader.query(WishlistORM).options(
+            _loader_option(WishlistORM.products, loader)
+        )
         if ids:
             query = query.filter(WishlistORM.id_.in_(ids))
         wishlists_orm = query.all()
-        wishlists = []
-        for wishlist_orm in wishlists_orm:
-            products = [
-                Product(
-                    id_=p.product.id_,
-                    name=p.product.name,
-                    quantity=p.product.quantity,
-                    price=p.product.price,
-                )
-                for p in wishlist_orm.products
-            ]
-            wishlists.append(
-                Wishlist(
-                    id_=wishlist_orm.id_,
-                    customer=Customer(
-                        id_=wishlist_orm.customer.id_, name=wishlist_orm.customer.name
-                    ),
-                    products=products,
-                )
-            )
-        return wishlists
+        return [_wishlist_from_orm(wishlist_orm) for wishlist_orm in wishlists_orm]
+
+    def list_headers(self, ids: List[int] | None = None) -> List[ProductLinesHeader]:
+        return _list_headers(self.router.reader, WishlistORM, ids)
+
+    def project(
+        self,
+        columns: Sequence[str],
+        ids: List[int] | None = None,
+        id_range: Tuple[int, int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return _project(self.router.reader, WishlistORM, columns, ids, id_range)
 
     def update(self, id_: int, entity: Wishlist):
-        wishlist_orm = self.session.query(WishlistORM).filter_by(id_=id_).one()
-        wishlist_orm.customer = (
-            self.session.query(CustomerORM).filter_by(id_=entity.customer.id_).one()
-        )
-        product_orms = [
-            self.session.query(ProductORM).filter_by(id_=p.id_).one()
-            for p in entity.products
-        ]
-        wishlist_orm.products = [
-            WishlistProductORM(product=i, wishlist_id=wishlist_orm.id_)
-            for i in product_orms
-        ]
-        self.session.add(wishlist_orm)
-        return self.get(id_)
+        self.identity_map.invalidate(Wishlist, [id_])
+        write_line_changes(self.session, WishlistORM, id_, entity)
+        return entity
 
     def delete(self, id_: int):
+        self.identity_map.invalidate(Wishlist, [id_])
         wishlist_orm = self.session.query(WishlistORM).filter_by(id_=id_).one()
         self.session.delete(wishlist_orm)
+
+    def add_many(self, entities: List[Wishlist]):
+        if not entities:
+            return
+        check_products_exist(
+            self.session, (id_ for wishlist in entities for id_ in wishlist.lines)
+        )
+        self.session.execute(
+            insert(WishlistORM),
+            [{"id_": w.id_, "customer_id": w.customer.id_} for w in entities],
+        )
+        insert_lines(self.session, WishlistORM, entities)
+
+    def list_by_customer(self, customer_id: int) -> List[Wishlist]:
+        wishlists_orm = self.router.reader.scalars(
+            select(WishlistORM)
+            .where(WishlistORM.customer_id == customer_id)
+            .order_by(WishlistORM.id_)
+            .options(selectinload(WishlistORM.products))
+        )
+        return [_wishlist_from_orm(wishlist_orm) for wishlist_orm in wishlists_orm]
+
+    def iter_all(
+        self, batch_size: int = 1000, after_id: int | None = None
+    ) -> Iterator[Wishlist]:
+        return _iter_keyset(
+            self.router.reader,
+            WishlistORM,
+            _wishlist_from_orm,
+            batch_size,
+            after_id,
+            selectinload(WishlistORM.products),
+        )
+
+    def get_many(self, ids: List[int]) -> List[Wishlist]:
+        wishlists_orm = self.router.reader.scalars(
+            select(WishlistORM)
+            .where(WishlistORM.id_.in_(ids))
+            .options(selectinload(WishlistORM.products))
+        )
+        found = {w.id_: _wishlist_from_orm(w) for w in wishlists_orm}
+        return _ordered(found, ids, "Wishlists")
+
+    def update_many(self, entities: List[Wishlist]):
+        if not entities:
+            return
+        self.identity_map.invalidate(Wishlist, (e.id_ for e in entities))
+        check_products_exist(
+            self.session, (id_ for wishlist in entities for id_ in wishlist.lines)
+        )
+        self.session.execute(
+            update(WishlistORM),
+            [{"id_": w.id_, "customer_id": w.customer.id_} for w in entities],
+        )
+        self.session.execute(
+            delete(WishlistProductORM).where(
+                WishlistProductORM.wishlist_id.in_([w.id_ for w in entities])
+            )
+        )
+        insert_lines(self.session, WishlistORM, entities)
+
+    def delete_many(self, ids: List[int]):
+        self.identity_map.invalidate(Wishlist, ids)
+        self.session.execute(
+            delete(WishlistProductORM).where(WishlistProductORM.wishlist_id.in_(ids))
+        )
+        self.session.execute(delete(WishlistORM).where(WishlistORM.id_.in_(ids)))
@@ -0,0 +1,53 @@
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+
+_WRITTEN = "routing_written"
+
+
+def _on_flush(session: Session, _flush_context):
+    session.info[_WRITTEN] = True
+
+
+def _on_execute(state: ORMExecuteState):
+    if not state.is_select:
+        state.session.info[_WRITTEN] = True
+
+
+def _on_transaction_end(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITTEN, None)
+
+
+class SessionRouter:
+    def __init__(self, primary: Session, replica: Session | None = None):
+        self.primary = primary
+        self.replica = replica
+        if replica is None:
+            return
+        if not event.contains(primary, "after_flush", _on_flush):
+            event.listen(primary, "after_flush", _on_flush)
+            event.listen(primary, "do_orm_execute", _on_execute)
+            event.listen(primary, "after_transaction_end", _on_transaction_end)
+
+    @property
+    def written(self) -> bool:
+        return bool(
+            self.primary.info.get(_WRITTEN)
+            or self.primary.new
+            or self.primary.deleted
+            or self.primary.dirty
+        )
+
+    @property
+    def reader(self) -> Session:
+        if self.replica is None or self.written:
+            return self.primary
+        return self.replica
+
+    def reset(self):
+        if self.replica is not None:
+            self.replica.rollback()
+
+    def close(self):
+        if self.replica is not None:
+            self.replica.close()
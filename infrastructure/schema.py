@@ -0,0 +1,87 @@
+import hashlib
+import threading
+import weakref
+from typing import Dict, Tuple
+from sqlalchemy import Column, Connection, Engine, MetaData, String, Table, text
+from sqlalchemy import delete, insert, inspect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateColumn
+from .orm import Base
+
+_fingerprints = Table(
+    "schema_fingerprint",
+    MetaData(),
+    Column("fingerprint", String, primary_key=True),
+)
+_SELECT_FINGERPRINT = text(f"SELECT fingerprint FROM {_fingerprints.name}")
+
+_bootstrapped: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+_cache: Dict[Tuple[int, Tuple[str, ...]], str] = {}
+_lock = threading.Lock()
+
+
+def schema_fingerprint(metadata: MetaData = Base.metadata) -> str:
+    key = (id(metadata), tuple(metadata.tables))
+    if key not in _cache:
+        description = [
+            repr(table) + repr(sorted(repr(index) for index in table.indexes))
+            for table in metadata.sorted_tables
+        ]
+        _cache[key] = hashlib.sha256("\n".join(description).encode()).hexdigest()
+    return _cache[key]
+
+
+def _stored_fingerprint(connection: Connection) -> str | None:
+    try:
+        with connection.begin_nested():
+            return connection.scalar(_SELECT_FINGERPRINT)
+    except DBAPIError:
+        return None
+
+
+def _add_missing_columns(connection: Connection, metadata: MetaData):
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {definition}"
+                )
+
+
+def _create_missing_indexes(connection: Connection, metadata: MetaData):
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def bootstrap_schema(
+    connection: Connection, metadata: MetaData = Base.metadata
+) -> bool:
+    fingerprint = schema_fingerprint(metadata)
+    if _stored_fingerprint(connection) == fingerprint:
+        return False
+    metadata.create_all(connection)
+    _add_missing_columns(connection, metadata)
+    _create_missing_indexes(connection, metadata)
+    _fingerprints.create(connection, checkfirst=True)
+    connection.execute(delete(_fingerprints))
+    connection.execute(insert(_fingerprints), {"fingerprint": fingerprint})
+    return True
+
+
+def ensure_schema(engine: Engine, metadata: MetaData = Base.metadata) -> bool:
+    if metadata is Base.metadata and engine in _bootstrapped:
+        return False
+    with _lock:
+        if metadata is Base.metadata and engine in _bootstrapped:
+            return False
+        with engine.begin() as connection:
+            created = bootstrap_schema(connection, metadata)
+        if metadata is Base.metadata:
+            _bootstrapped.add(engine)
+    return created
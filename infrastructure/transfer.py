@@ -0,0 +1,157 @@
+import csv
+import json
+from itertools import groupby, islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Tuple
+from sqlalchemy import Engine, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from domain.exceptions import InvalidRecordError
+from domain.models import Customer, Product
+from .orm import CustomerORM, OrderORM, OrderProductORM, ProductORM
+
+CHUNK_SIZE = 1000
+
+Record = Tuple[int, Dict[str, Any]]
+
+
+def read_records(file: IO[str], fmt: str) -> Iterator[Record]:
+    if fmt == "csv":
+        reader = csv.DictReader(file)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as e:
+                raise InvalidRecordError(line, e.msg) from e
+    else:
+        raise ValueError(f"Unsupported format: {fmt!r}")
+
+
+def detect_format(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return "jsonl" if suffix in ("jsonl", "ndjson") else suffix
+
+
+def product_from_record(line: int, record: Dict[str, Any]) -> Product:
+    try:
+        product = Product(
+            id_=int(record["id_"]),
+            name=str(record["name"]),
+            quantity=int(record["quantity"]),
+            price=float(record["price"]),
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidRecordError(line, f"{type(e).__name__}: {e}") from e
+    if product.quantity < 0 or product.price < 0:
+        raise InvalidRecordError(line, "quantity and price must not be negative")
+    return product
+
+
+def customer_from_record(line: int, record: Dict[str, Any]) -> Customer:
+    try:
+        return Customer(id_=int(record["id_"]), name=str(record["name"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidRecordError(line, f"{type(e).__name__}: {e}") from e
+
+
+_products = ProductORM.__table__
+_customers = CustomerORM.__table__
+
+
+def _upsert(table: Any, columns: Iterable[str], **values: Any) -> Any:
+    statement = sqlite_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.id_],
+        set_={**{c: statement.excluded[c] for c in columns}, **values},
+    )
+
+
+_UPSERT_PRODUCTS = _upsert(
+    _products, ("name", "quantity", "price"), version=_products.c.version + 1
+)
+_UPSERT_CUSTOMERS = _upsert(_customers, ("name",))
+
+
+def _import(
+    engine: Engine,
+    statement: Any,
+    records: Iterable[Record],
+    to_row: Callable[[int, Dict[str, Any]], Dict[str, Any]],
+    chunk_size: int,
+) -> int:
+    records = iter(records)
+    imported = 0
+    while chunk := [to_row(*record) for record in islice(records, chunk_size)]:
+        with engine.begin() as connection:
+            connection.execute(statement, chunk)
+        imported += len(chunk)
+    return imported
+
+
+def import_products(
+    engine: Engine, records: Iterable[Record], chunk_size: int = CHUNK_SIZE
+) -> int:
+    def to_row(line: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        product = product_from_record(line, record)
+        return {
+            "id_": product.id_,
+            "name": product.name,
+            "quantity": product.quantity,
+            "price": product.price,
+        }
+
+    return _import(engine, _UPSERT_PRODUCTS, records, to_row, chunk_size)
+
+
+def import_customers(
+    engine: Engine, records: Iterable[Record], chunk_size: int = CHUNK_SIZE
+) -> int:
+    def to_row(line: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        customer = customer_from_record(line, record)
+        return {"id_": customer.id_, "name": customer.name}
+
+    return _import(engine, _UPSERT_CUSTOMERS, records, to_row, chunk_size)
+
+
+def _order_rows_query():
+    return (
+        select(
+            OrderORM.id_,
+            OrderORM.customer_id,
+            OrderORM.total,
+            OrderProductORM.product_id,
+            OrderProductORM.quantity,
+            func.coalesce(OrderProductORM.unit_price, ProductORM.price).label("price"),
+        )
+        .outerjoin(OrderProductORM, OrderProductORM.order_id == OrderORM.id_)
+        .outerjoin(ProductORM, ProductORM.id_ == OrderProductORM.product_id)
+        .order_by(OrderORM.id_, OrderProductORM.product_id)
+    )
+
+
+def export_orders(engine: Engine, out: IO[str], batch_size: int = CHUNK_SIZE) -> int:
+    exported = 0
+    with engine.connect() as connection:
+        rows = connection.execution_options(yield_per=batch_size).execute(
+            _order_rows_query()
+        )
+        for order_id, order_rows in groupby(rows, key=lambda row: row.id_):
+            order_rows = list(order_rows)
+            lines = [
+                {"product_id": r.product_id, "quantity": r.quantity, "price": r.price}
+                for r in order_rows
+                if r.product_id is not None
+            ]
+            record = {
+                "id_": order_id,
+                "customer_id": order_rows[0].customer_id,
+                "lines": lines,
+                "total": order_rows[0].total,
+            }
+            out.write(json.dumps(record) + "\n")
+            exported += 1
+    return exported
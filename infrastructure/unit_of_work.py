@@ -1,5 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from domain.unit_of_work import UnitOfWork
+from infrastructure.identity_map import IdentityMap
+from infrastructure.metrics import QueryMetrics, QueryStats
+from infrastructure.routing import SessionRouter
+from infrastructure.schema import ensure_schema
 from infrastructure.repositories import (
     SqlAlchemyProductRepository,
     SqlAlchemyOrderRepository,
@@ -9,27 +14,95 @@ from infrastructure.repositories import (
 
 
 class SqlAlchemyUnitOfWork(UnitOfWork):
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        identity_map_size: int = 1024,
+        metrics: QueryMetrics | None = None,
+        read_session: Session | None = None,
+    ):
+        self.identity_map = IdentityMap(maxsize=identity_map_size)
+        self.router = SessionRouter(session, read_session)
         super().__init__(
-            SqlAlchemyProductRepository(session),
-            SqlAlchemyOrderRepository(session),
-            SqlAlchemyCustomerRepository(session),
-            SqlAlchemyWishlistRepository(session),
+            SqlAlchemyProductRepository(session, self.identity_map, self.router),
+            SqlAlchemyOrderRepository(session, self.identity_map, self.router),
+            SqlAlchemyCustomerRepository(session, self.identity_map, self.router),
+            SqlAlchemyWishlistRepository(session, self.identity_map, self.router),
         )
         self.session = session
+        self.read_session = read_session
+        self.metrics = metrics
+        self.stats: QueryStats | None = None
+        self._scope = None
+        if metrics is not None:
+            for tracked in filter(None, (session, read_session)):
+                metrics.attach(tracked.get_bind())
+                metrics.attach_session(tracked)
 
     def __enter__(self):
+        if self.metrics is not None:
+            self._scope = self.metrics.scope(type(self).__name__)
+            self.stats = self._scope.__enter__()
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        if exception_type is not None:
-            self.session.rollback()
-        else:
-            self.session.commit()
-        self.session.close()
+        try:
+            if exception_type is not None:
+                self.session.rollback()
+            else:
+                self.session.commit()
+            self.identity_map.clear()
+            self.session.close()
+            self.router.close()
+        finally:
+            if self._scope is not None:
+                self._scope.__exit__(exception_type, exception_value, traceback)
+                self._scope = None
 
-    def commit(self):
+    def _commit(self):
         self.session.commit()
+        self.router.reset()
 
-    def rollback(self):
+    def _rollback(self):
+        self.identity_map.clear()
         self.session.rollback()
+        self.router.reset()
+
+
+class SqlAlchemyUnitOfWorkFactory:
+    def __init__(
+        self,
+        engine: Engine,
+        identity_map_size: int = 1024,
+        metrics: QueryMetrics | None = None,
+        bootstrap: bool = True,
+        **session_options,
+    ):
+        self.engine = engine
+        self.read_engine: Engine | None = None
+        self.sessions = scoped_session(sessionmaker(bind=engine, **session_options))
+        self.read_sessions: scoped_session | None = None
+        self.identity_map_size = identity_map_size
+        self.metrics = metrics
+        self.bootstrap = bootstrap
+
+    def route_reads_to(self, read_engine: Engine) -> "SqlAlchemyUnitOfWorkFactory":
+        self.read_engine = read_engine
+        options = {**self.sessions.session_factory.kw, "bind": read_engine}
+        self.read_sessions = scoped_session(sessionmaker(**options))
+        return self
+
+    def __call__(self) -> SqlAlchemyUnitOfWork:
+        if self.bootstrap:
+            ensure_schema(self.engine)
+        return SqlAlchemyUnitOfWork(
+            self.sessions(),
+            self.identity_map_size,
+            self.metrics,
+            None if self.read_sessions is None else self.read_sessions(),
+        )
+
+    def remove(self):
+        self.sessions.remove()
+        if self.read_sessions is not None:
+            self.read_sessions.remove()
@@ -1,22 +1,31 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from domain.exceptions import EntitiesNotFoundError
 from domain.services import (
     OrderService,
     ProductService,
     CustomerService,
     WishlistService,
 )
-from infrastructure.orm import Base
-from infrastructure.unit_of_work import SqlAlchemyUnitOfWork
-from infrastructure.database import DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
-SessionFactory = sessionmaker(bind=engine)
-Base.metadata.create_all(engine)
+
+def create_uow_factory(url: str | None = None):
+    # pylint: disable=import-outside-toplevel
+    from infrastructure.database import (
+        DATABASE_URL,
+        create_database_engine,
+        create_read_only_engine,
+    )
+    from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+    url = url or DATABASE_URL
+    factory = SqlAlchemyUnitOfWorkFactory(create_database_engine(url))
+    try:
+        return factory.route_reads_to(create_read_only_engine(url))
+    except ValueError:
+        return factory
 
 
 def main():
-    uow = SqlAlchemyUnitOfWork(SessionFactory())
+    uow = create_uow_factory()()
 
     product_service = ProductService(uow)
     order_service = OrderService(uow)
@@ -24,6 +33,13 @@ def main():
     wishlist_service = WishlistService(uow)
 
     with uow:
+        try:
+            existing = product_service.get_many([1])
+        except EntitiesNotFoundError:
+            pass
+        else:
+            print(f"demo data already loaded: {existing[0]}")
+            return
         new_product1 = product_service.create(
             id_=1, name="product1", quantity=1, price=100
         )
@@ -0,0 +1,140 @@
+import random
+from itertools import islice
+from typing import Dict, Iterator, List
+from sqlalchemy import Engine, func, insert, select, update
+from infrastructure.orm import (
+    ProductORM,
+    CustomerORM,
+    OrderORM,
+    OrderProductORM,
+    WishlistORM,
+    WishlistProductORM,
+)
+
+CHUNK_SIZE = 10_000
+
+
+def _chunks(rows: Iterator[Dict], size: int = CHUNK_SIZE) -> Iterator[List[Dict]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _lines(rng: random.Random, products: int, lines: int) -> List[int]:
+    return rng.sample(range(1, products + 1), min(lines, products))
+
+
+def generate_products(count: int, seed: int = 0) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for id_ in range(1, count + 1):
+        yield {
+            "id_": id_,
+            "name": f"product{id_}",
+            "quantity": rng.randint(0, 1000),
+            "price": round(rng.uniform(1, 1000), 2),
+        }
+
+
+def generate_customers(count: int) -> Iterator[Dict]:
+    for id_ in range(1, count + 1):
+        yield {"id_": id_, "name": f"customer{id_}"}
+
+
+def generate_aggregates(
+    count: int, customers: int, products: int, lines: int, seed: int = 0
+) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for id_ in range(1, count + 1):
+        yield {
+            "id_": id_,
+            "customer_id": rng.randint(1, customers),
+            "lines": [
+                (product_id, rng.randint(1, 5))
+                for product_id in _lines(rng, products, lines)
+            ],
+        }
+
+
+def _insert_aggregates(connection, orm, line_orm, key: str, rows: Iterator[Dict]):
+    for chunk in _chunks(rows):
+        connection.execute(
+            insert(orm),
+            [{"id_": r["id_"], "customer_id": r["customer_id"]} for r in chunk],
+        )
+        connection.execute(
+            insert(line_orm),
+            [
+                {key: r["id_"], "product_id": product_id, "quantity": quantity}
+                for r in chunk
+                for product_id, quantity in r["lines"]
+            ],
+        )
+
+
+def _fill_order_totals(connection):
+    connection.execute(
+        update(OrderORM).values(
+            total=select(
+                func.coalesce(func.sum(ProductORM.price * OrderProductORM.quantity), 0)
+            )
+            .select_from(OrderProductORM)
+            .join(ProductORM, ProductORM.id_ == OrderProductORM.product_id)
+            .where(OrderProductORM.order_id == OrderORM.id_)
+            .scalar_subquery()
+        )
+    )
+
+
+def populate(
+    engine: Engine, size: int, lines: int = 3, seed: int = 0
+) -> Dict[str, int]:
+    counts = {
+        "products": size,
+        "customers": max(size // 10, 1),
+        "orders": max(size // 10, 1),
+        "wishlists": max(size // 10, 1),
+    }
+    with engine.begin() as connection:
+        for chunk in _chunks(generate_products(counts["products"], seed)):
+            connection.execute(insert(ProductORM), chunk)
+        for chunk in _chunks(generate_customers(counts["customers"])):
+            connection.execute(insert(CustomerORM), chunk)
+        _insert_aggregates(
+            connection,
+            OrderORM,
+            OrderProductORM,
+            "order_id",
+            generate_aggregates(
+                counts["orders"], counts["customers"], size, lines, seed + 1
+            ),
+        )
+        _fill_order_totals(connection)
+        _insert_aggregates(
+            connection,
+            WishlistORM,
+            WishlistProductORM,
+            "wishlist_id",
+            generate_aggregates(
+                counts["wishlists"], counts["customers"], size, lines, seed + 2
+            ),
+        )
+    return counts
+
+
+def populate_orders(
+    engine: Engine, orders: int, products: int = 1000, lines: int = 3, seed: int = 0
+) -> Dict[str, int]:
+    customers = max(orders // 10, 1)
+    with engine.begin() as connection:
+        for chunk in _chunks(generate_products(products, seed)):
+            connection.execute(insert(ProductORM), chunk)
+        for chunk in _chunks(generate_customers(customers)):
+            connection.execute(insert(CustomerORM), chunk)
+        _insert_aggregates(
+            connection,
+            OrderORM,
+            OrderProductORM,
+            "order_id",
+            generate_aggregates(orders, customers, products, lines, seed + 1),
+        )
+        _fill_order_totals(connection)
+    return {"products": products, "customers": customers, "orders": orders}
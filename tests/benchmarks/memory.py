@@ -0,0 +1,99 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+from domain.models import Customer, Order, Product
+
+
+@dataclass
+class DictProduct:
+    id_: int
+    name: str
+    quantity: int
+    price: float
+
+
+@dataclass
+class DictCustomer:
+    id_: int
+    name: str
+
+
+@dataclass
+class DictOrderLine:
+    product: DictProduct
+    quantity: int = 1
+
+
+@dataclass
+class DictOrder:
+    id_: int
+    customer: DictCustomer
+    lines: Dict[int, DictOrderLine] = field(default_factory=dict)
+
+
+def bytes_per_entity(factory: Callable[[int], object], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entities = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    list_overhead = sys.getsizeof(entities)
+    return (after - before - list_overhead) / count
+
+
+def measure(count: int) -> Dict[str, Dict[str, float]]:
+    customer = Customer(id_=1, name="customer1")
+    dict_customer = DictCustomer(id_=1, name="customer1")
+    products = [Product(id_=i, name="p", quantity=1, price=1.0) for i in range(3)]
+    dict_products = [
+        DictProduct(id_=i, name="p", quantity=1, price=1.0) for i in range(3)
+    ]
+    return {
+        "Product": {
+            "before": bytes_per_entity(
+                lambda i: DictProduct(id_=i, name="p", quantity=i, price=i / 2), count
+            ),
+            "after": bytes_per_entity(
+                lambda i: Product(id_=i, name="p", quantity=i, price=i / 2), count
+            ),
+        },
+        "Customer": {
+            "before": bytes_per_entity(lambda i: DictCustomer(id_=i, name="c"), count),
+            "after": bytes_per_entity(lambda i: Customer(id_=i, name="c"), count),
+        },
+        "Order[3 lines]": {
+            "before": bytes_per_entity(
+                lambda i: DictOrder(
+                    id_=i,
+                    customer=dict_customer,
+                    lines={p.id_: DictOrderLine(product=p) for p in dict_products},
+                ),
+                count,
+            ),
+            "after": bytes_per_entity(
+                lambda i: Order(id_=i, customer=customer, products=products), count
+            ),
+        },
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Domain model memory footprint")
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    for entity, sizes in measure(args.count).items():
+        print(
+            f"{entity:<16} before={sizes['before']:>8.1f} B "
+            f"after={sizes['after']:>8.1f} B"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
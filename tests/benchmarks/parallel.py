@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+from infrastructure.database import create_database_engine
+from infrastructure.parallel import SHARD_SIZE, run_batch_checkout
+from infrastructure.schema import ensure_schema
+from .data import populate_orders
+
+
+@dataclass
+class ScalingResult:
+    workers: int
+    seconds: float
+    orders: int
+    grand_total: float
+
+    @property
+    def orders_per_second(self) -> float:
+        return self.orders / self.seconds if self.seconds else 0.0
+
+
+def prepare(path: Path, orders: int, lines: int) -> str:
+    url = f"sqlite:///{path}"
+    engine = create_database_engine(url)
+    ensure_schema(engine)
+    populate_orders(engine, orders, lines=lines)
+    engine.dispose()
+    return url
+
+
+def measure(url: str, workers: int, shard_size: int) -> ScalingResult:
+    start = time.perf_counter()
+    report = run_batch_checkout(url, workers=workers, shard_size=shard_size)
+    return ScalingResult(
+        workers=workers,
+        seconds=time.perf_counter() - start,
+        orders=len(report.totals),
+        grand_total=report.grand_total,
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded batch checkout scaling")
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = prepare(Path(tmp) / "parallel.db", args.orders, args.lines)
+        baseline = None
+        for workers in args.workers:
+            result = measure(url, workers, args.shard_size)
+            baseline = baseline or result.seconds
+            print(
+                f"workers={result.workers:<3} seconds={result.seconds:>8.3f} "
+                f"orders/s={result.orders_per_second:>10.0f} "
+                f"speedup={baseline / result.seconds:>5.2f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+from sqlalchemy import Engine, event
+from domain.services import OrderService, WishlistService
+from infrastructure.database import create_database_engine
+from infrastructure.orm import Base
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+from .data import populate
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+@dataclass
+class Result:
+    operation: str
+    size: int
+    ops: int
+    seconds: float
+    ops_per_sec: float
+    queries_per_op: float
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[List[int]]:
+    counter = [0]
+
+    def before_cursor_execute(*_args):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def measure(
+    engine: Engine,
+    operation: str,
+    size: int,
+    call: Callable[[int], object],
+    args: List[int],
+) -> Result:
+    with count_queries(engine) as queries:
+        started = time.perf_counter()
+        for arg in args:
+            call(arg)
+        seconds = time.perf_counter() - started
+    return Result(
+        operation=operation,
+        size=size,
+        ops=len(args),
+        seconds=round(seconds, 6),
+        ops_per_sec=round(len(args) / seconds, 2) if seconds else float("inf"),
+        queries_per_op=round(queries[0] / len(args), 2),
+    )
+
+
+def operations(
+    factory: SqlAlchemyUnitOfWorkFactory, counts: Dict[str, int]
+) -> Dict[str, Callable[[int], object]]:
+    next_order_id = [counts["orders"]]
+
+    def in_uow(action):
+        def call(id_):
+            with factory() as uow:
+                return action(uow, id_)
+
+        return call
+
+    def update_order(uow, id_):
+        order = uow.order_repo.get(id_)
+        line = next(iter(order.lines.values()), None)
+        if line is not None:
+            order.add_product(line.product)
+        return uow.order_repo.update(id_, order)
+
+    def create_order_from_wishlist(uow, id_):
+        next_order_id[0] += 1
+        return WishlistService(uow).create_order_from_wishlist(id_, next_order_id[0])
+
+    def convert_wishlists(uow, id_):
+        last_id = min(id_ + 100, counts["wishlists"] + 1)
+        return WishlistService(uow).convert_many(list(range(id_, last_id)))
+
+    def stream_orders(uow, id_):
+        return sum(1 for _ in islice(uow.order_repo.iter_all(after_id=id_), 1000))
+
+    return {
+        "product_repo.get": in_uow(lambda uow, id_: uow.product_repo.get(id_)),
+        "order_repo.get": in_uow(lambda uow, id_: uow.order_repo.get(id_)),
+        "order_repo.list[100]": in_uow(
+            lambda uow, id_: uow.order_repo.list(list(range(id_, id_ + 100)))
+        ),
+        "order_repo.update": in_uow(update_order),
+        "order_repo.iter_all[1000]": in_uow(stream_orders),
+        "OrderService.checkout_order": in_uow(
+            lambda uow, id_: OrderService(uow).checkout_order(id_)
+        ),
+        "WishlistService.create_order_from_wishlist": in_uow(
+            create_order_from_wishlist
+        ),
+        "WishlistService.convert_many[100]": in_uow(convert_wishlists),
+    }
+
+
+def run_size(size: int, lines: int, samples: int, directory: Path) -> List[Result]:
+    engine = create_database_engine(f"sqlite:///{directory / f'bench_{size}.db'}")
+    Base.metadata.create_all(engine)
+    counts = populate(engine, size, lines)
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+    rng = random.Random(size)
+    results = []
+    for operation, call in operations(factory, counts).items():
+        entity = "products" if operation.startswith("product") else "orders"
+        if operation.startswith("Wishlist"):
+            entity = "wishlists"
+        upper = max(counts[entity] - 100, 1)
+        args = [rng.randint(1, upper) for _ in range(samples)]
+        result = measure(engine, operation, size, call, args)
+        print(
+            f"{operation:<45} size={size:<9} {result.ops_per_sec:>10.1f} ops/s "
+            f"{result.queries_per_op:>6.1f} queries/op"
+        )
+        results.append(result)
+    factory.remove()
+    engine.dispose()
+    return results
+
+
+def compare(results: List[Result], baseline_path: Path, threshold: float) -> bool:
+    baseline = {
+        (r["operation"], r["size"]): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    ok = True
+    for result in results:
+        previous = baseline.get((result.operation, result.size))
+        if previous is None:
+            continue
+        ratio = result.ops_per_sec / previous["ops_per_sec"]
+        regressed = ratio < 1 - threshold
+        more_queries = result.queries_per_op > previous["queries_per_op"]
+        ok = ok and not regressed and not more_queries
+        flag = "REGRESSION" if regressed or more_queries else "ok"
+        print(
+            f"{result.operation:<45} size={result.size:<9} x{ratio:.2f} "
+            f"queries {previous['queries_per_op']} -> {result.queries_per_op} {flag}"
+        )
+    return ok
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Repository and service benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--output", type=Path, default=Path("bench_baseline.json"))
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            result
+            for size in args.sizes
+            for result in run_size(size, args.lines, args.samples, Path(directory))
+        ]
+
+    args.output.write_text(
+        json.dumps(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": [asdict(r) for r in results],
+            },
+            indent=2,
+        )
+    )
+    if args.compare:
+        return 0 if compare(results, args.compare, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+ROOT = Path(__file__).resolve().parents[2]
+
+SCENARIOS = {
+    "import main": "import main",
+    "import main (eager ORM, before)": "import main, infrastructure.orm",
+    "create_all on existing db": (
+        "from infrastructure.database import create_database_engine\n"
+        "from infrastructure.orm import Base\n"
+        "Base.metadata.create_all(create_database_engine({url!r}))"
+    ),
+    "fingerprint bootstrap on existing db": (
+        "from infrastructure.database import create_database_engine\n"
+        "from infrastructure.schema import ensure_schema\n"
+        "ensure_schema(create_database_engine({url!r}))"
+    ),
+}
+
+TIMED = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "{code}\n"
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_start(code: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", TIMED.format(code=code)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(samples: int, names: Iterable[str] = tuple(SCENARIOS)) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'startup.db'}"
+        cold_start(SCENARIOS["fingerprint bootstrap on existing db"].format(url=url))
+        return {
+            name: statistics.median(
+                cold_start(SCENARIOS[name].format(url=url)) for _ in range(samples)
+            )
+            for name in names
+        }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start timings")
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args(argv)
+    for name, seconds in measure(args.samples).items():
+        print(f"{name:<40} {seconds * 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+from sqlalchemy import Engine, insert, select
+from domain.exceptions import ConcurrencyError, OutOfStockError
+from domain.services import OrderService
+from infrastructure.database import create_database_engine
+from infrastructure.orm import (
+    Base,
+    CustomerORM,
+    OrderORM,
+    OrderProductORM,
+    ProductORM,
+)
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+
+@dataclass
+class StockResult:  # pylint: disable=too-many-instance-attributes
+    threads: int
+    orders: int
+    reserved: int
+    rejected: int
+    conflicts: int
+    failed: int
+    seconds: float
+    oversold: bool
+
+    @property
+    def per_second(self) -> float:
+        return self.reserved / self.seconds if self.seconds else 0.0
+
+
+def populate(engine: Engine, products: int, orders: int, seed: int = 0):
+    rng = random.Random(seed)
+    with engine.begin() as connection:
+        connection.execute(insert(CustomerORM), [{"id_": 1, "name": "customer1"}])
+        connection.execute(
+            insert(ProductORM),
+            [
+                {"id_": i, "name": f"product{i}", "quantity": orders, "price": 1.0}
+                for i in range(1, products + 1)
+            ],
+        )
+        connection.execute(
+            insert(OrderORM),
+            [{"id_": i, "customer_id": 1} for i in range(1, orders + 1)],
+        )
+        connection.execute(
+            insert(OrderProductORM),
+            [
+                {"order_id": i, "product_id": p, "quantity": rng.randint(1, 3)}
+                for i in range(1, orders + 1)
+                for p in rng.sample(range(1, products + 1), min(2, products))
+            ],
+        )
+
+
+def run(  # pylint: disable=too-many-locals
+    path: Path, threads: int, orders: int, products: int, retries: int
+) -> StockResult:
+    engine = create_database_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    populate(engine, products, orders)
+    with engine.connect() as connection:
+        before = sum(connection.execute(select(ProductORM.quantity)).scalars())
+    factory = SqlAlchemyUnitOfWorkFactory(engine, expire_on_commit=False)
+    queue = list(range(orders, 0, -1))
+    lock = threading.Lock()
+    counts = {"reserved": 0, "rejected": 0, "conflicts": 0, "failed": 0, "units": 0}
+
+    def worker():
+        while True:
+            with lock:
+                if not queue:
+                    break
+                order_id = queue.pop()
+            try:
+                with factory() as uow:
+                    service = OrderService(uow)
+                    attempts = service.reserve_stock(order_id, retries=retries)
+                    units = sum(
+                        line.quantity for line in service.get(order_id).lines.values()
+                    )
+                outcome = {"reserved": 1, "conflicts": attempts - 1, "units": units}
+            except OutOfStockError:
+                outcome = {"rejected": 1}
+            except ConcurrencyError:
+                outcome = {"failed": 1, "conflicts": retries + 1}
+            finally:
+                factory.remove()
+            with lock:
+                for key, value in outcome.items():
+                    counts[key] += value
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    with engine.connect() as connection:
+        quantities = list(connection.execute(select(ProductORM.quantity)).scalars())
+    engine.dispose()
+    return StockResult(
+        threads=threads,
+        orders=orders,
+        reserved=counts["reserved"],
+        rejected=counts["rejected"],
+        conflicts=counts["conflicts"],
+        failed=counts["failed"],
+        seconds=seconds,
+        oversold=min(quantities) < 0 or before - sum(quantities) != counts["units"],
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent stock reservation")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--retries", type=int, default=10)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in args.threads:
+            result = run(
+                Path(tmp) / f"stock{threads}.db",
+                threads,
+                args.orders,
+                args.products,
+                args.retries,
+            )
+            print(
+                f"threads={result.threads:<3} "
+                f"reservations/s={result.per_second:>9.1f} "
+                f"reserved={result.reserved} rejected={result.rejected} "
+                f"conflicts={result.conflicts} failed={result.failed} "
+                f"oversold={result.oversold}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
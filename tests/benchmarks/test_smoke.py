@@ -0,0 +1,44 @@
+import json
+import pytest
+from tests.benchmarks.memory import measure
+from tests.benchmarks.run import main
+from tests.benchmarks import parallel, startup
+from tests.benchmarks.stock import run
+
+
+def test_benchmarks_run_and_compare(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    assert main(["--sizes", "200", "--samples", "2", "--output", str(baseline)]) == 0
+    results = json.loads(baseline.read_text())["results"]
+    assert {r["operation"] for r in results} >= {"order_repo.get", "OrderService.checkout_order"}
+    assert all(r["size"] == 200 and r["ops"] == 2 for r in results)
+
+    current = tmp_path / "current.json"
+    main(["--sizes", "200", "--samples", "2", "--output", str(current),
+          "--compare", str(baseline), "--threshold", "1"])
+    assert "queries" in capsys.readouterr().out
+
+
+def test_slotted_models_use_less_memory():
+    for entity, sizes in measure(2000).items():
+        assert sizes["after"] < sizes["before"], entity
+
+
+def test_concurrent_reservations_never_oversell(tmp_path):
+    result = run(tmp_path / "stock.db", threads=4, orders=40, products=3, retries=20)
+    assert result.reserved + result.rejected + result.failed == 40
+    assert not result.oversold
+
+
+def test_cold_start_does_not_pay_for_the_orm():
+    timings = startup.measure(
+        samples=3, names=["import main", "import main (eager ORM, before)"]
+    )
+    assert timings["import main"] < timings["import main (eager ORM, before)"]
+
+
+def test_parallel_checkout_scaling_results_agree(tmp_path):
+    url = parallel.prepare(tmp_path / "parallel.db", orders=300, lines=2)
+    results = [parallel.measure(url, workers, shard_size=50) for workers in (1, 2)]
+    assert {r.orders for r in results} == {300}
+    assert results[0].grand_total == pytest.approx(results[1].grand_total)
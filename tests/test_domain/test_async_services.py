@@ -0,0 +1,137 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+import pytest
+from domain.async_services import (
+    AsyncBaseService,
+    AsyncProductService,
+    AsyncOrderService,
+    AsyncCustomerService,
+    AsyncWishlistService,
+)
+from domain.models import Product, Order, Customer, TotalDrift
+from domain.services import (
+    BaseService,
+    ProductService,
+    OrderService,
+    CustomerService,
+    WishlistService,
+)
+
+service_pairs = [
+    (AsyncProductService, "product_repo"),
+    (AsyncOrderService, "order_repo"),
+    (AsyncCustomerService, "customer_repo"),
+    (AsyncWishlistService, "wishlist_repo"),
+]
+
+
+def public_methods(cls):
+    return {name for name in dir(cls) if not name.startswith("_")}
+
+
+@pytest.mark.parametrize("service, repo_name", service_pairs)
+def test_async_services_signature(service, repo_name):
+    assert issubclass(service, AsyncBaseService)
+    assert public_methods(BaseService) <= public_methods(service)
+
+
+@pytest.mark.parametrize("sync_service, async_service", [
+    (ProductService, AsyncProductService),
+    (OrderService, AsyncOrderService),
+    (CustomerService, AsyncCustomerService),
+    (WishlistService, AsyncWishlistService),
+])
+def test_async_services_match_sync_services(sync_service, async_service):
+    assert public_methods(sync_service) <= public_methods(async_service)
+
+
+@pytest.mark.parametrize("service, repo_name", service_pairs)
+def test_async_services_get_update_delete(service, repo_name):
+    mock_uow = AsyncMock()
+    setattr(mock_uow, repo_name, AsyncMock())
+    repo = getattr(mock_uow, repo_name)
+    repo.get.return_value = "entity"
+    service = service(mock_uow)
+
+    assert asyncio.run(service.get(1)) == "entity"
+    assert asyncio.run(service.update(1, "entity")) == "entity"
+    asyncio.run(service.delete(1))
+
+    repo.get.assert_awaited_once_with(1)
+    repo.update.assert_awaited_once_with(1, "entity")
+    repo.delete.assert_awaited_once_with(1)
+    assert mock_uow.commit.await_count == 2
+
+
+def test_async_order_service_add_product_to_order():
+    customer = Customer(id_=1, name="customer1")
+    product = Product(id_=1, name="product1", quantity=1, price=100)
+    mock_uow = AsyncMock()
+    mock_uow.order_repo.get.return_value = Order(id_=1, customer=customer)
+    service = AsyncOrderService(mock_uow)
+
+    order = asyncio.run(service.add_product_to_order(1, product, quantity=2))
+
+    assert order.checkout() == 200
+    mock_uow.order_repo.update.assert_awaited_once_with(1, order)
+    mock_uow.commit.assert_awaited_once()
+
+
+def test_async_wishlist_service_create_order_from_wishlist():
+    customer = Customer(id_=1, name="customer1")
+    product = Product(id_=1, name="product1", quantity=1, price=100)
+    mock_uow = AsyncMock()
+    mock_uow.order_repo.get.return_value = Order(
+        id_=2, customer=customer, products=[product]
+    )
+    service = AsyncWishlistService(mock_uow)
+
+    order = asyncio.run(service.create_order_from_wishlist(1, 2))
+
+    assert order == Order(id_=2, customer=customer, products=[product])
+    mock_uow.order_repo.add_from_wishlists.assert_awaited_once_with([1], [2])
+    mock_uow.order_repo.get.assert_awaited_once_with(2)
+    mock_uow.wishlist_repo.get.assert_not_awaited()
+    mock_uow.commit.assert_awaited_once()
+
+
+def test_async_wishlist_service_convert_many():
+    mock_uow = AsyncMock()
+    mock_uow.order_repo.add_from_wishlists.return_value = {1: 10, 2: 11}
+    service = AsyncWishlistService(mock_uow)
+
+    assert asyncio.run(service.convert_many([2, 1])) == {1: 10, 2: 11}
+    mock_uow.order_repo.add_from_wishlists.assert_awaited_once_with([2, 1])
+    mock_uow.commit.assert_awaited_once()
+
+
+def test_async_order_service_checks_and_rebuilds_stored_totals():
+    mock_uow = AsyncMock()
+    mock_uow.order_repo.total_drift.return_value = [TotalDrift(3, 0.0, 4.5)]
+    mock_uow.order_repo.rebuild_totals.return_value = 1
+    service = AsyncOrderService(mock_uow)
+
+    assert asyncio.run(service.total_drift()) == [TotalDrift(3, 0.0, 4.5)]
+    assert asyncio.run(service.rebuild_totals(0.01)) == 1
+    mock_uow.order_repo.rebuild_totals.assert_awaited_once_with(0.01)
+    mock_uow.commit.assert_awaited_once()
+
+
+def test_async_services_page():
+    products = [Product(id_=i, name=f"product{i}", quantity=1, price=100) for i in range(1, 4)]
+
+    async def iter_all(batch_size, after_id):
+        for product in products:
+            if product.id_ > (after_id or 0):
+                yield product
+
+    mock_uow = Mock()
+    mock_uow.product_repo.iter_all = iter_all
+    service = AsyncProductService(mock_uow)
+
+    first = asyncio.run(service.page(limit=2))
+    second = asyncio.run(service.page(limit=2, cursor=first.next_cursor))
+
+    assert first.items == products[:2]
+    assert second.items == products[2:]
+    assert second.next_cursor is None
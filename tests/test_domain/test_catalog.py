@@ -0,0 +1,78 @@
+import random
+import pytest
+from domain.exceptions import ProductsNotFoundError
+from domain.models import Customer, Order, Product
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable-next=wrong-import-position
+from domain.catalog import CatalogSnapshot  # noqa: E402
+
+
+@pytest.fixture
+def products():
+    rng = random.Random(1)
+    return [Product(id_=i, name=f"product{i}", quantity=rng.randint(0, 5),
+                    price=round(rng.uniform(0.01, 999.99), 2) / 3) for i in range(1, 101)]
+
+
+@pytest.fixture
+def orders(products):
+    rng = random.Random(2)
+    customer = Customer(id_=1, name="customer1")
+    orders = []
+    for i in range(200):
+        order = Order(id_=i, customer=customer)
+        for product in rng.sample(products, rng.randint(0, 10)):
+            order.add_product(product, quantity=rng.randint(1, 4))
+        orders.append(order)
+    return orders
+
+
+def test_order_totals_match_checkout_exactly(products, orders):
+    snapshot = CatalogSnapshot.from_products(products)
+    totals = snapshot.order_totals(orders)
+    assert totals.tolist() == [order.checkout() for order in orders]
+
+
+def test_order_totals_match_checkout_after_line_changes(products, orders):
+    rng = random.Random(3)
+    for order in orders:
+        for product_id in rng.sample(list(order.lines), len(order.lines) // 2):
+            order.remove_product(product_id, quantity=rng.choice([None, 1]))
+    snapshot = CatalogSnapshot.from_products(products)
+    assert snapshot.order_totals(orders) == pytest.approx([o.checkout() for o in orders])
+
+
+def test_stock_check_and_demand(products, orders):
+    snapshot = CatalogSnapshot.from_products(products)
+    expected = [all(line.product.quantity >= line.quantity for line in order.lines.values())
+                for order in orders]
+    assert snapshot.stock_check(orders).tolist() == expected
+
+    demand = snapshot.demand(orders)
+    product = products[0]
+    assert demand[snapshot.index[product.id_]] == sum(
+        order.lines[product.id_].quantity for order in orders if product.id_ in order.lines
+    )
+
+
+def test_reprice_returns_new_snapshot(products, orders):
+    snapshot = CatalogSnapshot.from_products(products)
+    discounted = snapshot.reprice(0.5, product_ids=[1, 2])
+    fixed = snapshot.reprice(prices=[1.0] * len(products))
+
+    assert discounted.prices[0] == snapshot.prices[0] * 0.5
+    assert discounted.prices[2] == snapshot.prices[2]
+    assert np.all(fixed.prices == 1.0)
+    assert fixed.order_totals(orders).tolist() == [
+        sum(line.quantity for line in order.lines.values()) for order in orders
+    ]
+
+
+def test_unknown_products_are_reported(products):
+    snapshot = CatalogSnapshot.from_products(products[:1])
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=products[:3])
+    with pytest.raises(ProductsNotFoundError) as error:
+        snapshot.order_totals([order])
+    assert error.value.ids == [2, 3]
@@ -1,5 +1,5 @@
 import pytest
-from domain.models import Product, Order, Customer, Wishlist
+from domain.models import Product, Order, OrderLine, Customer, Wishlist, LineChanges
 
 @pytest.fixture
 def two_same_products():
@@ -17,7 +17,8 @@ def test_add_product_to_order_same_products(two_same_products):
     order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=[])
     [order.add_product(product) for product in two_same_products]
     assert len(order.products) == 1
-    assert order.products[0].quantity == 2
+    assert order.lines[1].quantity == 2
+    assert order.products[0].quantity == 1
     assert order.checkout() == 200
 
 
@@ -25,21 +26,115 @@ def test_add_product_to_order_different_products(two_different_products):
     order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=[])
     [order.add_product(product) for product in two_different_products]
     assert len(order.products) == 2
-    assert order.products[0].quantity == 2
-    assert order.products[1].quantity == 3
-    assert order.checkout() == 800
+    assert order.lines[1].quantity == 1
+    assert order.lines[2].quantity == 1
+    assert order.checkout() == 300
+
+
+def test_add_product_to_order_with_quantity(two_different_products):
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"))
+    order.add_product(two_different_products[0], quantity=2)
+    order.add_product(two_different_products[1], quantity=3)
+    order.add_product(two_different_products[1])
+    assert order.lines[2].quantity == 4
+    assert order.checkout() == 1000
+
+
+def test_remove_product_from_order(two_different_products):
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"),
+                  lines=[OrderLine(product=two_different_products[0], quantity=3),
+                         OrderLine(product=two_different_products[1])])
+    order.remove_product(1, quantity=2)
+    assert order.lines[1].quantity == 1
+    order.remove_product(2)
+    assert list(order.lines) == [1]
+    with pytest.raises(KeyError):
+        order.remove_product(2)
+
+
+def test_order_keeps_running_total(two_different_products):
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"),
+                  lines=[OrderLine(product=two_different_products[0], quantity=3)])
+    assert order.checkout() == 300
+    order.add_product(two_different_products[1], quantity=2)
+    order.remove_product(1, quantity=2)
+    assert order.checkout() == 500
+    order.remove_product(2)
+    assert order.checkout() == 100
+
+
+def test_order_total_follows_line_changes():
+    products = [Product(id_=1, name="product1", quantity=1, price=0.1),
+                Product(id_=2, name="product2", quantity=1, price=0.2)]
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=products)
+    assert order.checkout() == pytest.approx(0.3)
+    order.remove_product(2)
+    assert order.checkout() == pytest.approx(0.1)
+    order.add_product(products[1], quantity=3)
+    order.add_product(products[1])
+    order.remove_product(2, quantity=1)
+    order.remove_product(1)
+    assert order.checkout() == pytest.approx(0.2 * 3)
+
+
+def test_order_constructor_merges_duplicate_products(two_same_products):
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=two_same_products)
+    assert order == Order(id_=1, customer=Customer(id_=1, name="customer1"),
+                          lines=[OrderLine(product=two_same_products[0], quantity=2)])
 
 
 def test_wishlist_add_product_same_products(two_same_products):
     wishlist = Wishlist(id_=1, customer=Customer(id_=1, name="customer1"), products=[])
     [wishlist.add_product(product) for product in two_same_products]
     assert len(wishlist.products) == 1
-    assert wishlist.products[0].quantity == 2
+    assert wishlist.lines[1].quantity == 2
 
 
 def test_wishlist_add_product_different_products(two_different_products):
     wishlist = Wishlist(id_=1, customer=Customer(id_=1, name="customer1"), products=[])
     [wishlist.add_product(product) for product in two_different_products]
     assert len(wishlist.products) == 2
-    assert wishlist.products[0].quantity == 2
-    assert wishlist.products[1].quantity == 3
+    assert wishlist.lines[1].quantity == 1
+    assert wishlist.lines[2].quantity == 1
+
+
+@pytest.mark.parametrize("entity", [
+    Product(id_=1, name="product1", quantity=1, price=100),
+    Customer(id_=1, name="customer1"),
+    OrderLine(product=Product(id_=1, name="product1", quantity=1, price=100)),
+    Order(id_=1, customer=Customer(id_=1, name="customer1")),
+    Wishlist(id_=1, customer=Customer(id_=1, name="customer1")),
+])
+def test_models_are_slotted(entity):
+    assert not hasattr(entity, "__dict__")
+
+
+def test_order_line_is_value_object(two_same_products):
+    line = OrderLine(product=two_same_products[0], quantity=2)
+    assert line == OrderLine(product=two_same_products[1], quantity=2)
+    assert line.total() == 200
+    with pytest.raises(AttributeError):
+        line.quantity = 3
+
+
+def test_product_lines_track_changes_since_mark_clean(two_different_products):
+    first, second = two_different_products
+    order = Order(id_=1, customer=Customer(id_=1, name="customer1"), products=[first])
+    assert order.changes() is None
+
+    order.mark_clean()
+    assert not order.changes()
+    order.add_product(first)
+    order.add_product(second)
+    assert order.changes() == LineChanges(
+        customer_id=None, added={2: 1}, changed={1: 2}, removed=[]
+    )
+
+    order.mark_clean()
+    order.remove_product(1)
+    order.customer = Customer(id_=2, name="customer2")
+    assert order.changes() == LineChanges(
+        customer_id=2, added={}, changed={}, removed=[1]
+    )
+    assert order == Order(id_=1, customer=Customer(id_=2, name="customer2"),
+                          products=[second])
@@ -0,0 +1,31 @@
+import pytest
+from domain.exceptions import InvalidCursorError
+from domain.models import Customer
+from domain.pagination import Page, chunked, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("after_id", [0, 1, 123456789])
+def test_cursor_round_trip(after_id):
+    cursor = encode_cursor(after_id)
+    assert decode_cursor(cursor) == after_id
+
+
+def test_decode_empty_cursor():
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(1)[:-3], "eyJhZnRlciI6ICJ4In0"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_chunked_splits_any_iterable():
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert not list(chunked([], 2))
+
+
+def test_page_of_sets_cursor_only_for_full_pages():
+    customers = [Customer(id_=i, name=f"customer{i}") for i in (1, 2)]
+    assert decode_cursor(Page.of(customers, 2).next_cursor) == 2
+    assert Page.of(customers, 3).next_cursor is None
@@ -0,0 +1,23 @@
+from domain.reports import CheckoutReport, CustomerSummary
+
+
+def test_checkout_report_from_rows_and_merge():
+    first = CheckoutReport.from_rows([
+        {"id_": 1, "customer_id": 1, "total": 10.0},
+        {"id_": 2, "customer_id": 2, "total": 5.0},
+    ])
+    second = CheckoutReport.from_rows([
+        {"id_": 3, "customer_id": 1, "total": 2.5},
+        {"id_": 4, "customer_id": 3, "total": 0.0},
+    ])
+
+    first.merge(second)
+
+    assert first.totals == {1: 10.0, 2: 5.0, 3: 2.5, 4: 0.0}
+    assert first.customers == {
+        1: CustomerSummary(orders=2, total=12.5),
+        2: CustomerSummary(orders=1, total=5.0),
+        3: CustomerSummary(orders=1, total=0.0),
+    }
+    assert first.grand_total == 17.5
+    assert second.customers[1] == CustomerSummary(orders=1, total=2.5)
@@ -1,8 +1,22 @@
 import pytest
 from abc import ABC
-from domain.repositories import BaseRepository, ProductRepository, OrderRepository, CustomerRepository, WishlistRepository
+from domain.async_repositories import (
+    AsyncProductRepository,
+    AsyncOrderRepository,
+    AsyncCustomerRepository,
+    AsyncWishlistRepository,
+)
+from domain.repositories import (
+    BaseRepository,
+    ProductRepository,
+    OrderRepository,
+    CustomerRepository,
+    WishlistRepository,
+    validate_projection,
+)
 
-function_names = ["add", "get", "list", "update", "delete"]
+function_names = ["add", "get", "list", "update", "delete",
+                  "add_many", "get_many", "update_many", "delete_many", "iter_all"]
 
 def test_base_repository_abstract():
     assert issubclass(BaseRepository, ABC)
@@ -16,4 +30,31 @@ def test_base_repository_abstract():
 def test_repositories_signature(repository):
     assert all(hasattr(repository, attr) for attr in function_names)
     assert issubclass(repository, BaseRepository)
-    assert all(callable(getattr(repository, attr)) for attr in function_names)
\ No newline at end of file
+    assert all(callable(getattr(repository, attr)) for attr in function_names)
+
+
+def test_order_repository_totals_signature():
+    assert all(callable(getattr(OrderRepository, attr)) for attr in ["total", "totals"])
+
+
+@pytest.mark.parametrize("repository", [OrderRepository, WishlistRepository])
+def test_lines_repositories_projection_signature(repository):
+    assert {"list_headers", "project"} <= repository.__abstractmethods__
+
+
+@pytest.mark.parametrize("repository, async_repository", [
+    (ProductRepository, AsyncProductRepository),
+    (OrderRepository, AsyncOrderRepository),
+    (CustomerRepository, AsyncCustomerRepository),
+    (WishlistRepository, AsyncWishlistRepository),
+])
+def test_async_repositories_match_sync_repositories(repository, async_repository):
+    assert repository.__abstractmethods__ == async_repository.__abstractmethods__
+
+
+def test_validate_projection():
+    validate_projection(["id_", "total"])
+    with pytest.raises(ValueError):
+        validate_projection(["id_", "password"])
+    with pytest.raises(ValueError):
+        validate_projection([])
@@ -1,8 +1,12 @@
 import pytest
 from unittest.mock import Mock, patch
+from domain.exceptions import ConcurrencyError
 from domain.services import BaseService, ProductService, OrderService, CustomerService, WishlistService
-from domain.models import Product, Order, Customer, Wishlist
-function_names = ["create", "get", "list", "update", "delete"]
+from domain.models import Product, Order, Customer, CustomerStats, TotalDrift, Wishlist
+from domain.pagination import decode_cursor, encode_cursor
+function_names = ["create", "get", "list", "update", "delete",
+                  "create_many", "get_many", "update_many", "delete_many",
+                  "iterate", "page"]
 
 @pytest.fixture(autouse=True)
 def cleanup_patches():
@@ -57,18 +61,19 @@ def test_services_create(service, repo_name, model, expected, kwargs):
     mock_model = Mock()
     mock_add = Mock()
     mock_uow = Mock()
-    setattr(model, "__new__", mock_model)
     setattr(mock_uow, repo_name, Mock())
     getattr(mock_uow, repo_name).add = mock_add
     mock_uow.commit = Mock()
 
     service = service(mock_uow)
+    assert service.model is model
+    patch.object(service, "model", mock_model).start()
     expected_object = expected
     mock_model.return_value = expected_object
         
     test_object = service.create(**kwargs)
 
-    mock_model.assert_called_once_with(model, **kwargs)
+    mock_model.assert_called_once_with(**kwargs)
     mock_add.assert_called_once_with(expected_object)
     mock_uow.commit.assert_called_once()
     assert test_object == expected_object
@@ -238,3 +243,189 @@ def test_services_delete(service, repo_name, id_):
     service.delete(id_)
     mock_delete.assert_called_once_with(id_)
     mock_uow.commit.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "service, repo_name",
+    [
+        (ProductService, "product_repo"),
+        (OrderService, "order_repo"),
+        (CustomerService, "customer_repo"),
+        (WishlistService, "wishlist_repo"),
+    ]
+)
+def test_services_create_many_commits_once_per_chunk(service, repo_name):
+    mock_uow = Mock()
+    service = service(mock_uow)
+    patch.object(service, "model", Mock(side_effect=lambda **kwargs: kwargs)).start()
+    items = [{"id_": i} for i in range(5)]
+
+    created = service.create_many(items, chunk_size=2)
+
+    add_many = getattr(mock_uow, repo_name).add_many
+    assert [c.args[0] for c in add_many.call_args_list] == [items[0:2], items[2:4], items[4:5]]
+    assert mock_uow.commit.call_count == 3
+    assert created == items
+
+
+def test_services_bulk_update_delete_get_use_chunks():
+    mock_uow = Mock()
+    service = ProductService(mock_uow)
+    products = [Product(id_=i, name=f"product{i}", quantity=1, price=100) for i in range(3)]
+    mock_uow.product_repo.get_many.side_effect = lambda ids: [products[i] for i in ids]
+
+    assert service.get_many([0, 1, 2], chunk_size=2) == products
+    assert service.update_many(products, chunk_size=2) == products
+    service.delete_many(iter([0, 1, 2]), chunk_size=2)
+
+    assert mock_uow.product_repo.update_many.call_count == 2
+    mock_uow.product_repo.delete_many.assert_any_call([2])
+    assert mock_uow.commit.call_count == 4
+
+
+def test_services_page_returns_next_cursor():
+    mock_uow = Mock()
+    products = [Product(id_=i, name=f"product{i}", quantity=1, price=100) for i in range(1, 6)]
+    mock_uow.product_repo.iter_all.side_effect = (
+        lambda batch_size, after_id: (p for p in products if p.id_ > (after_id or 0))
+    )
+    service = ProductService(mock_uow)
+
+    first = service.page(limit=2)
+    second = service.page(limit=2, cursor=first.next_cursor)
+    last = service.page(limit=2, cursor=encode_cursor(4))
+
+    assert first.items == products[:2]
+    assert decode_cursor(first.next_cursor) == 2
+    assert second.items == products[2:4]
+    assert last.items == products[4:]
+    assert last.next_cursor is None
+    assert list(service.iterate(cursor=second.next_cursor)) == products[4:]
+
+
+def test_order_service_checkout_uses_repository_totals():
+    mock_uow = Mock()
+    mock_uow.order_repo.total.return_value = 300.0
+    mock_uow.order_repo.totals.side_effect = lambda ids: {i: 10.0 * i for i in ids}
+    service = OrderService(mock_uow)
+
+    assert service.checkout_order(1) == 300.0
+    assert service.checkout_many(range(1, 6), chunk_size=2) == {i: 10.0 * i for i in range(1, 6)}
+    mock_uow.order_repo.get.assert_not_called()
+    assert mock_uow.order_repo.totals.call_count == 3
+
+
+def test_customer_service_stats_read_maintained_aggregates():
+    mock_uow = Mock()
+    mock_uow.order_repo.customer_stats.side_effect = [
+        CustomerStats(1, 2, 50.0, 7),
+        CustomerStats(1, 2, 50.0, 7),
+        CustomerStats(2),
+    ]
+    mock_uow.order_repo.rebuild_customer_stats.return_value = 3
+    service = CustomerService(mock_uow)
+
+    assert service.stats(1) == CustomerStats(1, 2, 50.0, 7)
+    assert service.last_order(1) is mock_uow.order_repo.get.return_value
+    assert service.last_order(2) is None
+    mock_uow.order_repo.get.assert_called_once_with(7)
+    mock_uow.order_repo.list.assert_not_called()
+    assert service.rebuild_stats() == 3
+    mock_uow.commit.assert_called_once()
+
+
+def test_order_service_checks_and_rebuilds_stored_totals():
+    mock_uow = Mock()
+    mock_uow.order_repo.total_drift.return_value = [TotalDrift(1, 10.0, 12.0)]
+    mock_uow.order_repo.rebuild_totals.return_value = 1
+    service = OrderService(mock_uow)
+
+    assert service.total_drift(0.5) == [TotalDrift(1, 10.0, 12.0)]
+    mock_uow.order_repo.total_drift.assert_called_once_with(0.5)
+    mock_uow.commit.assert_not_called()
+    assert service.rebuild_totals() == 1
+    mock_uow.commit.assert_called_once()
+
+
+def test_wishlist_service_converts_without_loading_wishlists():
+    mock_uow = Mock()
+    mock_uow.order_repo.add_from_wishlists.side_effect = [{1: 2}, {1: 10, 3: 11}]
+    service = WishlistService(mock_uow)
+
+    assert service.create_order_from_wishlist(1, 2) is mock_uow.order_repo.get.return_value
+    assert service.convert_many([3, 1]) == {1: 10, 3: 11}
+    assert mock_uow.order_repo.add_from_wishlists.call_args_list == [
+        (([1], [2]),),
+        (([3, 1],),),
+    ]
+    mock_uow.order_repo.get.assert_called_once_with(2)
+    mock_uow.wishlist_repo.get.assert_not_called()
+    assert mock_uow.commit.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "service, repo_name",
+    [(OrderService, "order_repo"), (WishlistService, "wishlist_repo")]
+)
+def test_services_list_by_customer(service, repo_name):
+    mock_uow = Mock()
+    getattr(mock_uow, repo_name).list_by_customer.return_value = ["entity"]
+    assert service(mock_uow).list_by_customer(1) == ["entity"]
+    getattr(mock_uow, repo_name).list_by_customer.assert_called_once_with(1)
+
+
+def test_order_service_reserve_stock_retries_on_conflict():
+    mock_uow = Mock()
+    mock_uow.order_repo.get.return_value = Order(
+        id_=1,
+        customer=Customer(id_=1, name="customer1"),
+        products=[Product(id_=1, name="product1", quantity=5, price=10.0)],
+    )
+    mock_uow.product_repo.reserve.side_effect = [ConcurrencyError(), None]
+
+    assert OrderService(mock_uow).reserve_stock(1) == 2
+    mock_uow.product_repo.reserve.assert_called_with({1: 1})
+    mock_uow.rollback.assert_called_once()
+    mock_uow.commit.assert_called_once()
+
+
+def test_order_service_reserve_stock_gives_up_after_retries():
+    mock_uow = Mock()
+    mock_uow.order_repo.get.return_value = Order(
+        id_=1, customer=Customer(id_=1, name="customer1")
+    )
+    mock_uow.product_repo.reserve.side_effect = ConcurrencyError()
+
+    with pytest.raises(ConcurrencyError):
+        OrderService(mock_uow).reserve_stock(1, retries=2)
+    assert mock_uow.product_repo.reserve.call_count == 3
+    mock_uow.commit.assert_not_called()
+
+
+def test_order_service_reserve_stock_skips_reserved_order():
+    mock_uow = Mock()
+    mock_uow.order_repo.get.return_value = Order(
+        id_=1, customer=Customer(id_=1, name="customer1")
+    )
+    mock_uow.order_repo.mark_reserved.return_value = False
+
+    assert OrderService(mock_uow).reserve_stock(1) == 0
+    mock_uow.order_repo.mark_reserved.assert_called_once_with(1)
+    mock_uow.product_repo.reserve.assert_not_called()
+    mock_uow.commit.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "service, repo_name",
+    [(OrderService, "order_repo"), (WishlistService, "wishlist_repo")]
+)
+def test_services_headers_and_projection(service, repo_name):
+    mock_uow = Mock()
+    repo = getattr(mock_uow, repo_name)
+    repo.list_headers.return_value = ["header"]
+    repo.project.return_value = [{"id_": 1}]
+
+    assert service(mock_uow).list_headers([1]) == ["header"]
+    assert service(mock_uow).project(["id_"], id_range=(1, 10)) == [{"id_": 1}]
+    repo.list_headers.assert_called_once_with([1])
+    repo.project.assert_called_once_with(["id_"], None, (1, 10))
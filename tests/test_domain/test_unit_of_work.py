@@ -0,0 +1,182 @@
+import asyncio
+from unittest.mock import Mock
+import pytest
+from domain.async_unit_of_work import AsyncUnitOfWork
+from domain.exceptions import BatchRolledBackError, ConcurrencyError
+from domain.models import Customer, Order, Product
+from domain.services import OrderService
+from domain.unit_of_work import UnitOfWork
+
+
+class FakeUnitOfWork(UnitOfWork):
+    def __init__(self):
+        super().__init__(Mock(), Mock(), Mock(), Mock())
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        pass
+
+    def _commit(self):
+        self.calls.append("commit")
+
+    def _rollback(self):
+        self.calls.append("rollback")
+
+
+class FakeAsyncUnitOfWork(AsyncUnitOfWork):
+    def __init__(self):
+        super().__init__(Mock(), Mock(), Mock(), Mock())
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        pass
+
+    async def _commit(self):
+        self.calls.append("commit")
+
+    async def _rollback(self):
+        self.calls.append("rollback")
+
+
+def test_commit_without_batch_is_immediate():
+    uow = FakeUnitOfWork()
+    uow.commit()
+    uow.commit()
+    assert uow.calls == ["commit", "commit"]
+    assert uow.commit_stats.saved == 0
+
+
+def test_batch_groups_commits_until_exit():
+    uow = FakeUnitOfWork()
+    with uow.batch() as batch:
+        for _ in range(5):
+            uow.commit()
+        assert not uow.calls
+        assert batch.pending == 5
+    assert uow.calls == ["commit"]
+    assert (uow.commit_stats.requested, uow.commit_stats.committed) == (5, 1)
+    assert uow.commit_stats.saved == 4
+
+
+def test_batch_flushes_every_n_operations():
+    uow = FakeUnitOfWork()
+    with uow.batch(max_operations=2):
+        for _ in range(5):
+            uow.commit()
+        assert uow.calls == ["commit", "commit"]
+    assert uow.calls == ["commit"] * 3
+
+
+def test_batch_flushes_after_delay(monkeypatch):
+    clock = iter([0.0, 0.001, 0.010, 0.011])
+    monkeypatch.setattr("domain.unit_of_work.time.monotonic", lambda: next(clock))
+    uow = FakeUnitOfWork()
+    with uow.batch(max_delay_ms=5):
+        uow.commit()
+        uow.commit()
+        assert uow.calls == ["commit"]
+    assert uow.calls == ["commit"]
+
+
+def test_batch_rolls_back_on_error():
+    uow = FakeUnitOfWork()
+    with pytest.raises(ValueError):
+        with uow.batch():
+            uow.commit()
+            raise ValueError
+    assert uow.calls == ["rollback"]
+    assert uow.commit_stats.discarded == 1
+
+
+def test_rollback_inside_batch_fails_at_the_rollback():
+    uow = FakeUnitOfWork()
+    tail = []
+    with pytest.raises(BatchRolledBackError) as error:
+        with uow.batch():
+            uow.commit()
+            uow.commit()
+            uow.rollback()
+            tail.append(uow.commit())
+    assert error.value.discarded == 2
+    assert not tail
+    assert uow.calls == ["rollback"]
+
+
+def test_batch_never_commits_after_a_discarding_rollback():
+    uow = FakeUnitOfWork()
+    with pytest.raises(BatchRolledBackError):
+        with uow.batch():
+            uow.commit()
+            with pytest.raises(BatchRolledBackError):
+                uow.rollback()
+            uow.commit()
+    assert uow.calls == ["rollback", "rollback"]
+
+    with pytest.raises(BatchRolledBackError):
+        with uow.batch():
+            uow.commit()
+            with pytest.raises(BatchRolledBackError):
+                uow.rollback()
+    assert "commit" not in uow.calls
+
+
+def test_rollback_without_pending_operations_keeps_the_batch():
+    uow = FakeUnitOfWork()
+    with uow.batch():
+        uow.rollback()
+        uow.commit()
+    assert uow.calls == ["rollback", "commit"]
+
+
+def test_reserve_stock_retries_inside_batch():
+    uow = FakeUnitOfWork()
+    uow.order_repo.get.return_value = Order(
+        id_=1,
+        customer=Customer(id_=1, name="customer1"),
+        products=[Product(id_=1, name="product1", quantity=5, price=10.0)],
+    )
+    uow.product_repo.reserve.side_effect = [ConcurrencyError(), None]
+    with uow.batch():
+        assert OrderService(uow).reserve_stock(1) == 2
+    assert uow.calls == ["rollback", "commit"]
+
+    uow.calls.clear()
+    uow.product_repo.reserve.side_effect = ConcurrencyError()
+    with pytest.raises(BatchRolledBackError):
+        with uow.batch():
+            uow.commit()
+            OrderService(uow).reserve_stock(1)
+    assert uow.calls == ["rollback"]
+
+
+def test_nested_batch_joins_outer_batch():
+    uow = FakeUnitOfWork()
+    with uow.batch() as outer:
+        with uow.batch() as inner:
+            uow.commit()
+        assert inner is outer
+        assert not uow.calls
+    assert uow.calls == ["commit"]
+
+
+def test_async_batch_groups_commits():
+    uow = FakeAsyncUnitOfWork()
+
+    async def run():
+        async with uow.batch(max_operations=3):
+            for _ in range(4):
+                await uow.commit()
+        with pytest.raises(BatchRolledBackError):
+            async with uow.batch():
+                await uow.commit()
+                await uow.rollback()
+
+    asyncio.run(run())
+    assert uow.calls == ["commit", "commit", "rollback"]
+    assert uow.commit_stats.saved == 2
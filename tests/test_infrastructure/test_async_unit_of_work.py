@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from domain.async_services import (
+    AsyncProductService,
+    AsyncOrderService,
+    AsyncCustomerService,
+)
+from domain.models import Customer
+from infrastructure.orm import Base
+
+pytest.importorskip("aiosqlite")
+
+# pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from infrastructure.async_unit_of_work import AsyncSqlAlchemyUnitOfWork  # noqa: E402
+
+
+async def place_orders(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with AsyncSqlAlchemyUnitOfWork(session_factory()) as uow:
+        await AsyncCustomerService(uow).create(id_=1, name="customer1")
+        await AsyncProductService(uow).create_many(
+            {"id_": i, "name": f"product{i}", "quantity": 10, "price": 10.0 * i}
+            for i in range(1, 4)
+        )
+        await AsyncOrderService(uow).create_many(
+            {"id_": i, "customer": Customer(id_=1, name="customer1")} for i in range(1, 4)
+        )
+
+    async def add_line(order_id):
+        async with AsyncSqlAlchemyUnitOfWork(session_factory()) as uow:
+            product = await AsyncProductService(uow).get(order_id)
+            await AsyncOrderService(uow).add_product_to_order(order_id, product, 2)
+
+    await asyncio.gather(*(add_line(i) for i in range(1, 4)))
+
+    async with AsyncSqlAlchemyUnitOfWork(session_factory()) as uow:
+        service = AsyncOrderService(uow)
+        totals = [await service.checkout_order(i) for i in range(1, 4)]
+        streamed = [order.id_ async for order in service.iterate(batch_size=2)]
+        snapshot = await AsyncProductService(uow).snapshot()
+    await engine.dispose()
+    return totals, streamed, snapshot
+
+
+def test_async_unit_of_work_round_trip(tmp_path):
+    totals, streamed, snapshot = asyncio.run(place_orders(tmp_path))
+    assert totals == [20.0, 40.0, 60.0]
+    assert streamed == [1, 2, 3]
+    assert snapshot.ids.tolist() == [1, 2, 3]
+    assert snapshot.prices.tolist() == [10.0, 20.0, 30.0]
+
+
+async def reserve_twice(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with AsyncSqlAlchemyUnitOfWork(session_factory()) as uow:
+        customer = await AsyncCustomerService(uow).create(id_=1, name="customer1")
+        product = await AsyncProductService(uow).create(
+            id_=1, name="product1", quantity=10, price=10.0
+        )
+        orders = AsyncOrderService(uow)
+        await orders.create(id_=1, customer=customer, products=[product])
+        attempts = [await orders.reserve_stock(1), await orders.reserve_stock(1)]
+        quantity = (await AsyncProductService(uow).get(1)).quantity
+    await engine.dispose()
+    return attempts, quantity
+
+
+def test_async_reserve_stock_reserves_an_order_once(tmp_path):
+    assert asyncio.run(reserve_twice(tmp_path)) == ([1, 0], 9)
@@ -0,0 +1,208 @@
+import io
+import json
+import pytest
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import sessionmaker
+from cli import main
+from domain.models import Customer, CustomerStats, Order, Product, TotalDrift
+from domain.services import (
+    CustomerService,
+    OrderService,
+    ProductService,
+    WishlistService,
+)
+from infrastructure.database import create_database_engine
+from infrastructure.orm import (
+    CustomerORM,
+    CustomerStatsORM,
+    OrderORM,
+    OrderProductORM,
+    ProductORM,
+)
+from infrastructure.schema import ensure_schema
+from infrastructure.transfer import import_products, read_records
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWork
+
+
+@pytest.fixture
+def uow(engine):
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(CustomerORM(id_=i, name=f"customer{i}") for i in (1, 2))
+        session.add_all(
+            ProductORM(id_=i, name=f"product{i}", quantity=10, price=10.0 * i)
+            for i in range(1, 6)
+        )
+        session.commit()
+    with SqlAlchemyUnitOfWork(sessionmaker(bind=engine)()) as uow:
+        yield uow
+
+
+def _expected(uow, customer_id):
+    orders = OrderService(uow).list_by_customer(customer_id)
+    return CustomerStats(
+        customer_id=customer_id,
+        order_count=len(orders),
+        total_spent=pytest.approx(sum(o.checkout() for o in orders)),
+        last_order_id=max((o.id_ for o in orders), default=None),
+    )
+
+
+def _assert_consistent(uow):
+    for customer_id in (1, 2):
+        assert CustomerService(uow).stats(customer_id) == _expected(uow, customer_id)
+
+
+def test_order_writes_keep_customer_stats_in_step(uow):
+    customers = CustomerService(uow)
+    orders = OrderService(uow)
+    first, second = Customer(id_=1, name="customer1"), Customer(id_=2, name="customer2")
+    products = uow.product_repo.list()
+
+    assert customers.stats(1) == CustomerStats(customer_id=1)
+    assert customers.last_order(1) is None
+
+    orders.create(id_=1, customer=first, products=products[:2])
+    orders.create(id_=2, customer=first, products=[])
+    orders.add_product_to_order(2, products[4])
+    _assert_consistent(uow)
+    assert customers.stats(1) == CustomerStats(1, 2, 80.0, 2)
+    assert customers.last_order(1).id_ == 2
+
+    orders.delete(2)
+    assert customers.stats(1) == CustomerStats(1, 1, 30.0, 1)
+
+    uow.order_repo.add_many([Order(id_=5, customer=second, products=products[2:4])])
+    moved = uow.order_repo.get(1)
+    moved.customer = second
+    uow.order_repo.update(1, moved)
+    uow.commit()
+    _assert_consistent(uow)
+    assert customers.stats(1) == CustomerStats(1, 0, 0.0, None)
+    assert customers.stats(2).last_order_id == 5
+
+    uow.order_repo.update_many([Order(id_=5, customer=first, products=products[:1])])
+    uow.order_repo.delete_many([1])
+    uow.commit()
+    _assert_consistent(uow)
+
+
+def test_rollback_discards_stats_changes(uow):
+    OrderService(uow).create(
+        id_=1, customer=Customer(id_=1, name="customer1"), products=[]
+    )
+    uow.order_repo.add(
+        Order(id_=2, customer=Customer(id_=1, name="customer1"))
+    )
+    uow.rollback()
+    assert CustomerService(uow).stats(1).order_count == 1
+
+
+def test_rebuild_totals_repairs_drift_and_customer_stats(uow):
+    orders = OrderService(uow)
+    orders.create(
+        id_=1,
+        customer=Customer(id_=1, name="customer1"),
+        products=uow.product_repo.list()[:3],
+    )
+    orders.create(id_=2, customer=Customer(id_=1, name="customer1"), products=[])
+    uow.session.execute(
+        update(OrderProductORM)
+        .where(OrderProductORM.order_id == 1, OrderProductORM.product_id == 3)
+        .values(unit_price=50.0)
+    )
+    uow.commit()
+
+    assert orders.checkout_order(1) == 60.0
+    assert orders.project(["id_", "total"]) == [
+        {"id_": 1, "total": 60.0}, {"id_": 2, "total": 0.0}
+    ]
+    assert orders.total_drift() == [TotalDrift(1, 60.0, 80.0)]
+    assert orders.rebuild_totals() == 1
+    assert orders.total_drift() == []
+    assert orders.get(1).checkout() == 80.0
+    assert CustomerService(uow).stats(1) == CustomerStats(1, 2, 80.0, 2)
+
+    uow.session.execute(
+        update(OrderProductORM)
+        .where(OrderProductORM.order_id == 1, OrderProductORM.product_id == 1)
+        .values(unit_price=None)
+    )
+    uow.session.execute(update(ProductORM).where(ProductORM.id_ == 1).values(price=15.0))
+    assert orders.rebuild_totals() == 1
+    assert orders.checkout_order(1) == 85.0
+    assert CustomerService(uow).stats(1) == CustomerStats(1, 2, 85.0, 2)
+
+
+def test_price_writes_leave_existing_orders_alone(uow, engine):
+    orders = OrderService(uow)
+    products = uow.product_repo.list()
+    orders.create(id_=1, customer=Customer(id_=1, name="customer1"), products=products[:1])
+    orders.create(id_=2, customer=Customer(id_=2, name="customer2"), products=products[1:3])
+    ProductService(uow).update(1, Product(id_=1, name="product1", quantity=10, price=50.0))
+    assert orders.checkout_order(1) == orders.get(1).checkout() == 10.0
+
+    order = orders.add_product_to_order(1, uow.product_repo.get(2))
+    assert order.checkout() == orders.checkout_order(1) == orders.get(1).checkout() == 30.0
+    orders.add_product_to_order(1, uow.product_repo.get(1))
+    assert orders.checkout_order(1) == orders.get(1).checkout() == 40.0
+    _assert_consistent(uow)
+
+    uow.product_repo.update_many([
+        Product(id_=2, name="product2", quantity=10, price=5.0),
+        Product(id_=3, name="product3", quantity=1, price=30.0),
+    ])
+    uow.commit()
+    records = read_records(
+        io.StringIO('{"id_": 3, "name": "product3", "quantity": 1, "price": 1.5}\n'), "jsonl"
+    )
+    assert import_products(engine, records) == 1
+    uow.order_repo.update_many([orders.get(1)])
+    uow.commit()
+    assert orders.checkout_many([1, 2]) == {1: 40.0, 2: 50.0}
+    assert CustomerService(uow).stats(2) == CustomerStats(2, 1, 50.0, 2)
+    assert orders.total_drift() == []
+
+    orders.create(id_=3, customer=Customer(id_=2, name="customer2"), products=products[:3])
+    assert orders.checkout_order(3) == orders.get(3).checkout() == 56.5
+    _assert_consistent(uow)
+
+
+def test_wishlist_conversion_updates_stats_and_rebuild_backfills(uow):
+    customer = Customer(id_=2, name="customer2")
+    products = uow.product_repo.list()
+    WishlistService(uow).create_many(
+        {"id_": i, "customer": customer, "products": products[:i]} for i in (1, 2)
+    )
+    WishlistService(uow).convert_many([1, 2])
+    _assert_consistent(uow)
+
+    uow.session.execute(delete(CustomerStatsORM))
+    uow.commit()
+    assert CustomerService(uow).stats(2).order_count == 0
+    assert CustomerService(uow).rebuild_stats() == 1
+    _assert_consistent(uow)
+
+
+def test_cli_rebuilds_totals_then_customer_stats_for_existing_orders(tmp_path, capsys):
+    database = f"sqlite:///{tmp_path / 'stats.db'}"
+    engine = create_database_engine(database)
+    ensure_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(CustomerORM), [{"id_": 1, "name": "customer1"}])
+        connection.execute(
+            insert(ProductORM), [{"id_": 1, "name": "p", "quantity": 1, "price": 2.5}]
+        )
+        connection.execute(insert(OrderORM), [{"id_": 7, "customer_id": 1}])
+        connection.execute(
+            insert(OrderProductORM), [{"order_id": 7, "product_id": 1, "quantity": 2}]
+        )
+
+    assert main(["--database", database, "check", "order-totals"]) == 1
+    assert json.loads(capsys.readouterr().out) == {"id_": 7, "stored": 0.0, "computed": 5.0}
+    assert main(["--database", database, "rebuild", "order-totals"]) == 0
+    assert main(["--database", database, "check", "order-totals"]) == 0
+    assert main(["--database", database, "rebuild", "customer-stats"]) == 0
+    assert "rebuilt customer-stats: 1" in capsys.readouterr().err
+    with SqlAlchemyUnitOfWork(sessionmaker(bind=engine)()) as uow:
+        assert CustomerService(uow).stats(1) == CustomerStats(1, 1, 5.0, 7)
+    engine.dispose()
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import event, text
+from domain.services import CustomerService, ProductService
+from infrastructure.database import create_database_engine
+from infrastructure.orm import Base
+from infrastructure.schema import ensure_schema
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+
+
+def test_engine_accepts_custom_pragmas_and_pool_options(tmp_path):
+    engine = create_database_engine(
+        f"sqlite:///{tmp_path / 'custom.db'}",
+        pragmas={"busy_timeout": 100},
+        pool_size=2,
+        max_overflow=0,
+    )
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 100
+    assert engine.pool.size() == 2
+    engine.dispose()
+
+
+def test_unit_of_work_factory_gives_each_thread_its_own_session(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'threads.db'}")
+    Base.metadata.create_all(engine)
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+
+    def worker(thread_id):
+        uow = factory()
+        with uow:
+            ProductService(uow).create_many(
+                {"id_": thread_id * 100 + i, "name": "p", "quantity": 1, "price": 1.0}
+                for i in range(50)
+            )
+        factory.remove()
+        return uow.session
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sessions = list(executor.map(worker, range(8)))
+
+    assert len({id(session) for session in sessions}) == 8
+    with factory() as uow:
+        assert len(ProductService(uow).list()) == 400
+    engine.dispose()
+
+
+def test_batch_groups_service_commits_into_one_transaction(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    ensure_schema(engine)
+    commits = []
+    event.listen(engine, "commit", commits.append)
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+
+    with factory() as uow:
+        with uow.batch():
+            for i in range(1, 21):
+                CustomerService(uow).create(id_=i, name=f"customer{i}")
+        assert len(commits) == 1
+        assert uow.commit_stats.saved == 19
+
+        with pytest.raises(RuntimeError):
+            with uow.batch():
+                CustomerService(uow).create(id_=21, name="customer21")
+                raise RuntimeError
+    factory.remove()
+
+    with factory() as uow:
+        assert len(CustomerService(uow).list()) == 20
+    engine.dispose()
@@ -0,0 +1,44 @@
+from domain.models import Product
+from infrastructure.identity_map import IdentityMap
+from infrastructure.orm import ProductORM
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWork
+
+
+def test_identity_map_evicts_least_recently_used():
+    identity_map = IdentityMap(maxsize=2)
+    identity_map.put(Product, 1, "first")
+    identity_map.put(Product, 2, "second")
+    assert identity_map.get_or_load(Product, 1, lambda: None) == "first"
+    identity_map.put(Product, 3, "third")
+
+    assert (Product, 1) in identity_map
+    assert (Product, 2) not in identity_map
+    assert len(identity_map) == 2
+    assert (identity_map.hits, identity_map.misses) == (1, 0)
+
+
+def test_identity_map_disabled_with_zero_size():
+    identity_map = IdentityMap(maxsize=0)
+    identity_map.get_or_load(Product, 1, lambda: "first")
+    identity_map.get_or_load(Product, 1, lambda: "first")
+    assert len(identity_map) == 0
+    assert identity_map.misses == 2
+
+
+def test_unit_of_work_returns_cached_entity_until_invalidated(session, statements):
+    session.add(ProductORM(id_=1, name="product1", quantity=1, price=100))
+    session.commit()
+    uow = SqlAlchemyUnitOfWork(session)
+
+    first = uow.product_repo.get(1)
+    statements.clear()
+    assert uow.product_repo.get(1) is first
+    assert statements == []
+
+    uow.product_repo.update(1, Product(id_=1, name="renamed", quantity=1, price=100))
+    assert uow.product_repo.get(1).name == "renamed"
+
+    uow.rollback()
+    assert len(uow.identity_map) == 0
+    assert uow.product_repo.get(1).name == "product1"
+    assert (uow.identity_map.hits, uow.identity_map.misses) == (2, 2)
@@ -0,0 +1,249 @@
+import pytest
+from domain.exceptions import (
+    BatchRolledBackError,
+    DuplicateEntityError,
+    EntitiesNotFoundError,
+    OutOfStockError,
+    ProductsNotFoundError,
+)
+from domain.models import Customer, CustomerStats, Order, Product, Wishlist
+from domain.services import CustomerService, OrderService, ProductService, WishlistService
+from infrastructure.in_memory import InMemoryUnitOfWork
+
+
+@pytest.fixture
+def uow():
+    uow = InMemoryUnitOfWork()
+    with uow:
+        ProductService(uow).create_many(
+            {"id_": i, "name": f"product{i}", "quantity": 10, "price": 10.0 * i}
+            for i in range(1, 4)
+        )
+        CustomerService(uow).create(id_=1, name="customer1")
+    return uow
+
+
+def test_services_run_on_in_memory_unit_of_work(uow):
+    customer = Customer(id_=1, name="customer1")
+    product = Product(id_=2, name="product2", quantity=10, price=20.0)
+    wishlists = WishlistService(uow)
+    orders = OrderService(uow)
+
+    with uow:
+        wishlists.create(id_=1, customer=customer)
+        wishlists.add_product_to_wishlist(1, product, quantity=2)
+        wishlists.create_order_from_wishlist(1, 10)
+        order = orders.add_product_to_order(
+            10, Product(id_=3, name="product3", quantity=10, price=30.0)
+        )
+
+    assert orders.get(10) == order
+    assert orders.checkout_order(10) == 70.0
+    assert orders.checkout_many([10]) == {10: order.checkout()}
+    assert [o.id_ for o in orders.iterate(batch_size=1)] == [10]
+    assert [o.id_ for o in uow.order_repo.list_by_customer(1)] == [10]
+
+
+def test_returned_entities_are_detached_from_storage(uow):
+    product = uow.product_repo.get(1)
+    product.price = 0
+    assert uow.product_repo.get(1).price == 10.0
+
+
+def test_rollback_restores_last_commit(uow):
+    customer = Customer(id_=1, name="customer1")
+    with pytest.raises(RuntimeError):
+        with uow:
+            uow.order_repo.add(Order(id_=1, customer=customer))
+            uow.product_repo.update(1, Product(id_=1, name="renamed", quantity=0, price=1.0))
+            uow.product_repo.delete(2)
+            raise RuntimeError
+
+    assert uow.order_repo.list() == []
+    assert uow.order_repo.list_by_customer(1) == []
+    assert [p.name for p in uow.product_repo.list()] == ["product1", "product2", "product3"]
+
+
+def test_snapshot_restore(uow):
+    snapshot = uow.snapshot()
+    uow.product_repo.update(1, Product(id_=1, name="product1", quantity=1, price=99.0))
+    uow.customer_repo.add(Customer(id_=2, name="customer2"))
+    uow.restore(snapshot)
+
+    assert uow.product_repo.get(1).price == 10.0
+    assert uow.customer_repo.get_many([1]) == [Customer(id_=1, name="customer1")]
+    with pytest.raises(EntitiesNotFoundError):
+        uow.customer_repo.get(2)
+
+
+def test_integrity_errors(uow):
+    with pytest.raises(DuplicateEntityError):
+        uow.product_repo.add(Product(id_=1, name="product1", quantity=1, price=1.0))
+    with pytest.raises(ProductsNotFoundError):
+        OrderService(uow).create(id_=1, customer=Customer(id_=1, name="customer1"),
+                                 products=[Product(id_=99, name="x", quantity=1, price=1.0)])
+    with pytest.raises(EntitiesNotFoundError):
+        OrderService(uow).create(id_=1, customer=Customer(id_=999, name="ghost"), products=[])
+
+
+def test_product_snapshot(uow):
+    pytest.importorskip("numpy")
+    snapshot = ProductService(uow).snapshot()
+    assert snapshot.ids.tolist() == [1, 2, 3]
+    assert snapshot.prices.tolist() == [10.0, 20.0, 30.0]
+
+
+def test_list_by_customer(uow):
+    customers = [Customer(id_=1, name="customer1"), Customer(id_=2, name="customer2")]
+    uow.customer_repo.add(customers[1])
+    uow.order_repo.add_many([Order(id_=i, customer=customers[i % 2]) for i in range(1, 6)])
+    uow.order_repo.update(4, Order(id_=4, customer=customers[1]))
+
+    assert [o.id_ for o in OrderService(uow).list_by_customer(2)] == [1, 3, 4, 5]
+    assert [o.id_ for o in OrderService(uow).list_by_customer(1)] == [2]
+    assert WishlistService(uow).list_by_customer(1) == []
+
+
+def test_product_reserve_is_rolled_back(uow):
+    with uow:
+        uow.product_repo.reserve({1: 4, 2: 10})
+        with pytest.raises(OutOfStockError):
+            uow.product_repo.reserve({1: 7})
+        uow.rollback()
+    assert uow.product_repo.get(1).quantity == 10
+
+    with uow:
+        uow.product_repo.reserve({1: 4, 2: 10})
+    assert [p.quantity for p in uow.product_repo.list()] == [6, 0, 10]
+
+
+def test_reserve_stock_reserves_an_order_once(uow):
+    orders = OrderService(uow)
+    with uow:
+        orders.create(
+            id_=1,
+            customer=Customer(id_=1, name="customer1"),
+            products=[Product(id_=1, name="product1", quantity=10, price=10.0)],
+        )
+        assert uow.order_repo.mark_reserved(1)
+        uow.rollback()
+        assert orders.reserve_stock(1) == 1
+        assert orders.reserve_stock(1) == 0
+    assert uow.product_repo.get(1).quantity == 9
+
+    with uow:
+        orders.delete(1)
+        orders.create(id_=1, customer=Customer(id_=1, name="customer1"))
+        assert orders.reserve_stock(1) == 1
+
+
+def test_batch_rollback_restores_uncommitted_rows(uow):
+    customers = CustomerService(uow)
+    with pytest.raises(BatchRolledBackError):
+        with uow.batch(max_operations=2):
+            for i in range(2, 5):
+                customers.create(id_=i, name=f"customer{i}")
+            uow.rollback()
+            customers.create(id_=5, name="customer5")
+    assert [c.id_ for c in customers.list()] == [1, 2, 3]
+    assert uow.commit_stats.discarded == 1
+
+
+def test_iter_all_keeps_id_order_across_writes_and_rollback(uow):
+    products = uow.product_repo
+    with uow:
+        products.add_many(
+            [Product(id_=i, name=f"product{i}", quantity=1, price=1.0) for i in (9, 5)]
+        )
+        products.delete(2)
+        products.add(Product(id_=7, name="product7", quantity=1, price=1.0))
+        uow.rollback()
+        products.delete(1)
+
+    assert [p.id_ for p in products.iter_all(batch_size=2)] == [2, 3]
+    assert [p.id_ for p in products.iter_all(batch_size=1, after_id=2)] == [3]
+    assert [p.id_ for p in products.list()] == [2, 3]
+
+
+def test_headers_and_projection(uow):
+    customer = Customer(id_=1, name="customer1")
+    products = uow.product_repo.list()
+    uow.order_repo.add_many([
+        Order(id_=2, customer=customer, products=products[:2]),
+        Order(id_=1, customer=customer),
+    ])
+
+    assert [h.id_ for h in OrderService(uow).list_headers()] == [1, 2]
+    assert OrderService(uow).project(["id_", "customer_name", "line_count", "total"]) == [
+        {"id_": 1, "customer_name": "customer1", "line_count": 0, "total": 0.0},
+        {"id_": 2, "customer_name": "customer1", "line_count": 2, "total": 30.0},
+    ]
+    assert WishlistService(uow).project(["id_"]) == []
+    with pytest.raises(ValueError):
+        OrderService(uow).project(["name"])
+
+
+def test_convert_wishlists_to_orders(uow):
+    customer = Customer(id_=1, name="customer1")
+    products = uow.product_repo.list()
+    uow.wishlist_repo.add_many([
+        Wishlist(id_=1, customer=customer, products=products[:2]),
+        Wishlist(id_=2, customer=customer, products=products[2:]),
+    ])
+
+    assert WishlistService(uow).create_order_from_wishlist(2, 5).lines == (
+        uow.wishlist_repo.get(2).lines
+    )
+    assert WishlistService(uow).convert_many([2, 1]) == {1: 6, 2: 7}
+    assert OrderService(uow).checkout_many([6, 7]) == {6: 30.0, 7: 30.0}
+    with pytest.raises(DuplicateEntityError):
+        uow.order_repo.add_from_wishlists([1], [5])
+    with pytest.raises(EntitiesNotFoundError):
+        WishlistService(uow).convert_many([3])
+
+
+def test_customer_stats_follow_writes_and_rollback(uow):
+    customer = Customer(id_=1, name="customer1")
+    products = uow.product_repo.list()
+    customers = CustomerService(uow)
+    orders = OrderService(uow)
+    with uow:
+        orders.create(id_=1, customer=customer, products=products[:1])
+        orders.create(id_=2, customer=customer, products=[])
+        orders.add_product_to_order(2, products[2])
+    assert customers.stats(1) == CustomerStats(1, 2, 40.0, 2)
+    assert customers.last_order(1).id_ == 2
+
+    uow.order_repo.delete(2)
+    uow.order_repo.delete_many([1])
+    assert customers.stats(1) == CustomerStats(1)
+    uow.rollback()
+    assert customers.stats(1) == CustomerStats(1, 2, 40.0, 2)
+
+    orders.delete(2)
+    assert customers.stats(1) == CustomerStats(1, 1, 10.0, 1)
+    assert customers.rebuild_stats() == 1
+    assert customers.stats(1) == CustomerStats(1, 1, 10.0, 1)
+    assert customers.stats(5) == CustomerStats(5)
+
+
+def test_price_writes_leave_existing_orders_alone(uow):
+    customer = Customer(id_=1, name="customer1")
+    orders = OrderService(uow)
+    orders.create(id_=1, customer=customer, products=uow.product_repo.list()[:1])
+    ProductService(uow).update(1, Product(id_=1, name="product1", quantity=10, price=50.0))
+
+    order = orders.add_product_to_order(1, uow.product_repo.get(2))
+    assert order.checkout() == orders.checkout_order(1) == orders.get(1).checkout() == 30.0
+    orders.add_product_to_order(1, uow.product_repo.get(1))
+    assert orders.checkout_order(1) == orders.get(1).checkout() == 40.0
+    assert CustomerService(uow).stats(1) == CustomerStats(1, 1, 40.0, 1)
+
+    uow.product_repo.update_many([Product(id_=2, name="product2", quantity=10, price=5.0)])
+    assert orders.project(["total"]) == [{"total": 40.0}]
+    assert CustomerService(uow).stats(1).total_spent == 40.0
+    assert orders.total_drift() == []
+    assert orders.rebuild_totals() == 0
+
+    orders.create(id_=2, customer=customer, products=uow.product_repo.list()[:2])
+    assert orders.checkout_order(2) == orders.get(2).checkout() == 55.0
@@ -0,0 +1,97 @@
+import logging
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from domain.models import Customer, Order, Product
+from domain.services import OrderService
+from infrastructure.metrics import QueryMetrics, statement_shape
+from infrastructure.orm import CustomerORM, ProductORM
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWork
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == (
+        "SELECT * FROM t WHERE id IN (?, ...)"
+    )
+
+
+def seed(session):
+    session.add(CustomerORM(id_=1, name="customer1"))
+    session.add_all(
+        ProductORM(id_=i, name=f"product{i}", quantity=1, price=10.0) for i in range(1, 4)
+    )
+    session.commit()
+
+
+def test_unit_of_work_and_service_scopes(session):
+    seed(session)
+    reported = []
+    metrics = QueryMetrics(on_stats=reported.append)
+    uow = SqlAlchemyUnitOfWork(session, metrics=metrics)
+    service = metrics.instrument(OrderService(uow))
+
+    with uow:
+        service.create(id_=1, customer=Customer(id_=1, name="customer1"),
+                       products=[Product(id_=1, name="product1", quantity=1, price=10.0)])
+        assert service.checkout_order(1) == 10.0
+        service.get(1)
+
+    assert [stats.name for stats in reported] == [
+        "OrderService.create",
+        "OrderService.checkout_order",
+        "OrderService.get",
+        "SqlAlchemyUnitOfWork",
+    ]
+    # pylint: disable-next=unbalanced-tuple-unpacking
+    create, checkout, get, scope = reported
+    assert checkout.statements == 1
+    assert create.rows_affected >= 2
+    assert get.entities_loaded >= 2
+    assert scope.statements >= create.statements + checkout.statements + get.statements
+    assert uow.stats is scope
+    assert metrics.totals["OrderService.checkout_order"].statements == 1
+
+
+def test_repeated_statement_shape_is_reported(session, caplog):
+    seed(session)
+    metrics = QueryMetrics(repeat_threshold=2)
+    uow = SqlAlchemyUnitOfWork(session, metrics=metrics)
+    customer = Customer(id_=1, name="customer1")
+
+    with caplog.at_level(logging.WARNING, logger="infrastructure.metrics"):
+        with uow:
+            for i in range(1, 4):
+                uow.order_repo.add(Order(id_=i, customer=customer,
+                                         products=[Product(i, f"product{i}", 1, 10.0)]))
+                session.flush()
+
+    assert uow.stats.repeated
+    assert sum("Possible N+1" in r.message for r in caplog.records) == len(uow.stats.repeated)
+
+
+def test_rows_returned_counts_core_and_orm_selects(session):
+    session.add_all(
+        ProductORM(id_=i, name=f"product{i}", quantity=1, price=1.0) for i in range(1, 51)
+    )
+    session.commit()
+    metrics = QueryMetrics()
+    uow = SqlAlchemyUnitOfWork(session, metrics=metrics)
+
+    with metrics.scope("snapshot") as snapshot:
+        uow.product_repo.snapshot()
+    with metrics.scope("list") as listed:
+        uow.product_repo.list()
+    assert (snapshot.rows_returned, snapshot.rows_affected) == (50, 0)
+    assert (listed.rows_returned, listed.entities_loaded) == (50, 50)
+
+
+def test_failed_statement_does_not_leak_start_time(session):
+    metrics = QueryMetrics()
+    uow = SqlAlchemyUnitOfWork(session, metrics=metrics)
+    with metrics.scope("failing") as failing:
+        with pytest.raises(OperationalError):
+            session.execute(text("SELECT * FROM missing_table"))
+        session.rollback()
+        uow.product_repo.list()
+    assert session.connection().info.get("query_metrics_started") == []
+    assert failing.statements == 1
@@ -0,0 +1,74 @@
+import json
+import pytest
+from sqlalchemy import insert
+from cli import main
+from domain.services import OrderService
+from infrastructure.database import create_database_engine
+from infrastructure.orm import CustomerORM, OrderORM, OrderProductORM, ProductORM
+from infrastructure.parallel import run_batch_checkout, shard_ranges
+from infrastructure.schema import ensure_schema
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'parallel.db'}"
+    engine = create_database_engine(url)
+    ensure_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(CustomerORM), [{"id_": i, "name": f"customer{i}"} for i in (1, 2, 3)]
+        )
+        connection.execute(
+            insert(ProductORM),
+            [{"id_": i, "name": f"product{i}", "quantity": 1, "price": float(i)}
+             for i in range(1, 6)],
+        )
+        connection.execute(
+            insert(OrderORM),
+            [{"id_": i, "customer_id": i % 3 + 1} for i in range(1, 48)],
+        )
+        connection.execute(
+            insert(OrderProductORM),
+            [{"order_id": i, "product_id": i % 5 + 1, "quantity": i % 4}
+             for i in range(1, 48) if i % 7],
+        )
+    yield url, engine
+    engine.dispose()
+
+
+def test_shard_ranges():
+    assert shard_ranges(1, 10, 4) == [(1, 4), (5, 8), (9, 10)]
+    assert shard_ranges(5, 5, 100) == [(5, 5)]
+    with pytest.raises(ValueError):
+        shard_ranges(1, 10, 0)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_checkout_matches_service_totals(database, workers):
+    url, engine = database
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+    with factory() as uow:
+        expected = OrderService(uow).checkout_many(range(1, 48))
+    factory.remove()
+
+    report = run_batch_checkout(url, workers=workers, shard_size=10)
+
+    assert report.totals == expected
+    assert sum(s.orders for s in report.customers.values()) == 47
+    assert report.customers[1].total == pytest.approx(
+        sum(total for id_, total in expected.items() if id_ % 3 == 0)
+    )
+
+
+def test_batch_checkout_of_empty_database(tmp_path):
+    report = run_batch_checkout(f"sqlite:///{tmp_path / 'empty.db'}", workers=2)
+    assert report.totals == {}
+
+
+def test_cli_report(database, capsys):
+    url, _ = database
+    assert main(["--database", url, "report", "--workers", "1", "--shard-size", "5"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["orders"] == 47
+    assert set(summary["customers"]) == {"1", "2", "3"}
@@ -0,0 +1,487 @@
+import sqlite3
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from domain.exceptions import (
+    ConcurrencyError,
+    EntitiesNotFoundError,
+    OutOfStockError,
+    ProductsNotFoundError,
+)
+from domain.models import Product, ProductLinesHeader, Customer, Order, Wishlist
+from infrastructure.orm import ProductORM, CustomerORM
+from infrastructure.repositories import (
+    SqlAlchemyCustomerRepository,
+    SqlAlchemyProductRepository,
+    SqlAlchemyOrderRepository,
+    SqlAlchemyWishlistRepository,
+)
+
+
+@pytest.fixture
+def catalog(session):
+    session.add(CustomerORM(id_=1, name="customer1"))
+    session.add_all(
+        ProductORM(id_=i, name=f"product{i}", quantity=1, price=100.0 * i)
+        for i in range(1, 201)
+    )
+    session.commit()
+    return [Product(id_=i, name=f"product{i}", quantity=1, price=100.0 * i)
+            for i in range(1, 201)]
+
+
+@pytest.mark.parametrize("lines", [1, 200])
+def test_order_add_query_count_does_not_depend_on_lines(session, statements, catalog, lines):
+    repo = SqlAlchemyOrderRepository(session)
+    statements.clear()
+    repo.add(Order(id_=1, customer=Customer(id_=1, name="customer1"), products=catalog[:lines]))
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 2
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_writes_reject_unknown_customer(session, catalog, repo_class, model):
+    repo = repo_class(session)
+    with pytest.raises(EntitiesNotFoundError) as error:
+        repo.add(model(id_=1, customer=Customer(id_=999, name="ghost"), products=catalog[:1]))
+    assert (error.value.entity, error.value.ids) == ("Customers", [999])
+
+    repo.add(model(id_=1, customer=Customer(id_=1, name="customer1"), products=catalog[:1]))
+    session.commit()
+    entity = repo.get(1)
+    entity.customer = Customer(id_=999, name="ghost")
+    with pytest.raises(EntitiesNotFoundError):
+        repo.update(1, entity)
+    session.rollback()
+    assert repo.get(1).customer.id_ == 1
+
+
+def test_order_add_deduplicates_products(session, catalog):
+    repo = SqlAlchemyOrderRepository(session)
+    products = [catalog[2], catalog[0], catalog[2]]
+    repo.add(Order(id_=1, customer=Customer(id_=1, name="customer1"), products=products))
+    session.commit()
+    assert sorted(p.id_ for p in repo.get(1).products) == [1, 3]
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_add_keeps_the_given_id(session, catalog, repo_class, model):
+    repo = repo_class(session)
+    repo.add(model(id_=99, customer=Customer(id_=1, name="customer1"), products=catalog[:1]))
+    session.commit()
+    assert [e.id_ for e in repo.list()] == [99]
+    assert repo.get(99).lines[1].quantity == 1
+
+
+def test_product_and_customer_add_keep_the_given_id(session, catalog):
+    products = SqlAlchemyProductRepository(session)
+    customers = SqlAlchemyCustomerRepository(session)
+    products.add(Product(id_=500, name="product500", quantity=1, price=9.0))
+    customers.add(Customer(id_=42, name="customer42"))
+    session.commit()
+    assert [p.id_ for p in products.list()][-2:] == [200, 500]
+    assert [c.id_ for c in customers.list()] == [1, 42]
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_add_reports_all_missing_products(session, catalog, repo_class, model):
+    repo = repo_class(session)
+    products = [catalog[0], Product(id_=1000, name="x", quantity=1, price=1),
+                Product(id_=1001, name="y", quantity=1, price=1)]
+    with pytest.raises(ProductsNotFoundError) as error:
+        repo.add(model(id_=1, customer=Customer(id_=1, name="customer1"), products=products))
+    assert error.value.ids == [1000, 1001]
+
+
+def test_wishlist_update_query_count_does_not_depend_on_lines(session, statements, catalog):
+    repo = SqlAlchemyWishlistRepository(session)
+    customer = Customer(id_=1, name="customer1")
+    repo.add(Wishlist(id_=1, customer=customer, products=catalog[:2]))
+    session.commit()
+    counts = []
+    for lines in (10, 200):
+        statements.clear()
+        repo.update(1, Wishlist(id_=1, customer=customer, products=catalog[:lines]))
+        counts.append(sum(s.lstrip().upper().startswith("SELECT") for s in statements))
+        session.commit()
+    assert counts[0] == counts[1]
+
+
+def test_product_bulk_crud(session):
+    repo = SqlAlchemyProductRepository(session)
+    products = [Product(id_=i, name=f"product{i}", quantity=i, price=10.0) for i in range(1, 6)]
+    repo.add_many(products)
+    session.commit()
+    products[0].price = 20.0
+    repo.update_many(products[:2])
+    repo.delete_many([5])
+    session.commit()
+
+    assert repo.get_many([2, 1]) == [products[1], products[0]]
+    with pytest.raises(EntitiesNotFoundError) as error:
+        repo.get_many([4, 5])
+    assert error.value.ids == [5]
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_aggregate_bulk_crud(session, catalog, repo_class, model):
+    repo = repo_class(session)
+    customer = Customer(id_=1, name="customer1")
+    entities = [model(id_=i, customer=customer, products=catalog[:i]) for i in range(1, 4)]
+    repo.add_many(entities)
+    session.commit()
+    repo.update_many([model(id_=1, customer=customer, products=catalog[5:8])])
+    repo.delete_many([3])
+    session.commit()
+
+    first, second = repo.get_many([1, 2])
+    assert sorted(p.id_ for p in first.products) == [6, 7, 8]
+    assert sorted(p.id_ for p in second.products) == [1, 2]
+    assert repo.list([3]) == []
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_line_quantities_round_trip(session, catalog, repo_class, model):
+    repo = repo_class(session)
+    entity = model(id_=1, customer=Customer(id_=1, name="customer1"))
+    entity.add_product(catalog[0], quantity=3)
+    entity.add_product(catalog[1])
+    repo.add(entity)
+    session.commit()
+    entity.add_product(catalog[1])
+    repo.update(1, entity)
+    session.commit()
+
+    assert repo.get(1) == entity
+    assert repo.get_many([1])[0].lines[2].quantity == 2
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_iter_all_streams_in_keyset_batches(session, statements, catalog, repo_class, model):
+    repo = repo_class(session)
+    customer = Customer(id_=1, name="customer1")
+    repo.add_many([model(id_=i, customer=customer, products=catalog[:i % 7]) for i in range(1, 26)])
+    session.commit()
+    statements.clear()
+
+    entities = list(repo.iter_all(batch_size=10, after_id=3))
+
+    assert len(statements) == 6
+    assert [e.id_ for e in entities] == list(range(4, 26))
+    assert entities == repo.list(list(range(4, 26)))
+
+
+def test_order_totals_match_checkout(session, statements, catalog):
+    repo = SqlAlchemyOrderRepository(session)
+    customer = Customer(id_=1, name="customer1")
+    orders = [Order(id_=i, customer=customer) for i in range(1, 6)]
+    for i, order in enumerate(orders):
+        for product in catalog[i:i + 3]:
+            order.add_product(product, quantity=i)
+    repo.add_many(orders)
+    session.commit()
+    statements.clear()
+
+    totals = repo.totals([1, 2, 3, 4, 5])
+
+    assert len(statements) == 1
+    assert totals == {order.id_: order.checkout() for order in orders}
+    assert repo.total(3) == orders[2].checkout()
+    assert repo.totals([1]) == {1: 0.0}
+    with pytest.raises(EntitiesNotFoundError):
+        repo.totals([1, 100])
+
+
+def test_product_snapshot(session, catalog):
+    pytest.importorskip("numpy")
+    snapshot = SqlAlchemyProductRepository(session).snapshot()
+    assert snapshot.ids.tolist() == [p.id_ for p in catalog]
+    assert snapshot.prices.tolist() == [p.price for p in catalog]
+    assert snapshot.stock.tolist() == [p.quantity for p in catalog]
+
+
+@pytest.mark.parametrize("repo_class, model, table", [
+    (SqlAlchemyOrderRepository, Order, "orders"),
+    (SqlAlchemyWishlistRepository, Wishlist, "wishlists"),
+])
+def test_list_by_customer_uses_index(session, catalog, repo_class, model, table):
+    session.add(CustomerORM(id_=2, name="customer2"))
+    repo = repo_class(session)
+    customers = [Customer(id_=1, name="customer1"), Customer(id_=2, name="customer2")]
+    repo.add_many([model(id_=i, customer=customers[i % 2], products=catalog[:i % 4])
+                   for i in range(1, 11)])
+    session.commit()
+
+    entities = repo.list_by_customer(2)
+    plan = session.execute(
+        text(f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE customer_id = 2")
+    ).all()
+
+    assert [e.id_ for e in entities] == [1, 3, 5, 7, 9]
+    assert entities == repo.list([1, 3, 5, 7, 9])
+    assert f"ix_{table}_customer_id" in " ".join(row[-1] for row in plan)
+    assert repo.list_by_customer(3) == []
+
+
+@pytest.mark.parametrize("table, column", [
+    ("products", "name"),
+    ("order_products", "product_id"),
+    ("wishlist_products", "product_id"),
+])
+def test_lookup_indexes_exist(session, table, column):
+    indexes = session.execute(text(f"PRAGMA index_list({table})")).all()
+    assert f"ix_{table}_{column}" in [row[1] for row in indexes]
+
+
+def test_product_reserve_decrements_stock_and_bumps_version(session, catalog):
+    session.get(ProductORM, 1).quantity = 10
+    session.get(ProductORM, 2).quantity = 10
+    session.commit()
+    repo = SqlAlchemyProductRepository(session)
+
+    repo.reserve({1: 3, 2: 10})
+    session.commit()
+
+    assert repo.get(1).quantity == 7
+    assert repo.get(2).quantity == 0
+    assert repo.get(1).version == 3
+
+
+def test_product_reserve_rejects_missing_and_short_stock(session, catalog):
+    repo = SqlAlchemyProductRepository(session)
+
+    with pytest.raises(ProductsNotFoundError):
+        repo.reserve({1: 1, 999: 1})
+    with pytest.raises(OutOfStockError) as exc:
+        repo.reserve({1: 1, 2: 2})
+    assert exc.value.ids == [2]
+    assert repo.get(1).quantity == 1
+
+
+def test_product_reserve_detects_concurrent_change(session, catalog):
+    repo = SqlAlchemyProductRepository(session)
+    original = session.execute
+    calls = []
+
+    def execute(statement, *args, **kwargs):
+        if not calls and args:
+            calls.append(statement)
+            session.execute(text("UPDATE products SET version = version + 1 WHERE id_ = 1"))
+        return original(statement, *args, **kwargs)
+
+    session.execute = execute
+    with pytest.raises(ConcurrencyError):
+        repo.reserve({1: 1})
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("database is locked", ConcurrencyError),
+    ("disk I/O error", OperationalError),
+])
+def test_product_reserve_maps_only_busy_errors(session, catalog, message, expected):
+    repo = SqlAlchemyProductRepository(session)
+    original = session.execute
+
+    def execute(statement, *args, **kwargs):
+        if args:
+            raise OperationalError("UPDATE", {}, sqlite3.OperationalError(message))
+        return original(statement, *args, **kwargs)
+
+    session.execute = execute
+    with pytest.raises(expected):
+        repo.reserve({1: 1})
+
+
+def test_order_mark_reserved_records_the_reservation(session, catalog):
+    repo = SqlAlchemyOrderRepository(session)
+    repo.add(Order(id_=1, customer=Customer(id_=1, name="customer1"), products=catalog[:1]))
+    assert repo.mark_reserved(1)
+    session.commit()
+
+    assert not SqlAlchemyOrderRepository(session).mark_reserved(1)
+    with pytest.raises(EntitiesNotFoundError):
+        repo.mark_reserved(999)
+    repo.delete(1)
+    repo.add(Order(id_=1, customer=Customer(id_=1, name="customer1")))
+    assert repo.mark_reserved(1)
+
+
+def test_product_update_rejects_stale_version(session, catalog):
+    repo = SqlAlchemyProductRepository(session)
+    stale = repo.get(1)
+    repo.reserve({1: 1})
+    session.commit()
+
+    stale.name = "renamed"
+    with pytest.raises(ConcurrencyError):
+        repo.update(1, stale)
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_update_writes_only_changed_lines(session, statements, catalog, repo_class, model):
+    tracks_stats = repo_class is SqlAlchemyOrderRepository
+
+    def expected(*writes):
+        return ["SELECT", *writes, "UPDATE", "INSERT"] if tracks_stats else list(writes)
+
+    repo = repo_class(session)
+    repo.add(model(id_=1, customer=Customer(id_=1, name="customer1"), products=catalog[:-1]))
+    session.commit()
+    entity = repo.get(1)
+
+    statements.clear()
+    entity.add_product(catalog[-1])
+    assert repo.update(1, entity) is entity
+    assert [s.split()[0] for s in statements] == ["SELECT", *expected("INSERT")]
+    assert "FROM products" in statements[0]
+
+    statements.clear()
+    entity.add_product(catalog[0])
+    entity.remove_product(2)
+    repo.update(1, entity)
+    assert [s.split()[0] for s in statements] == expected("DELETE", "UPDATE")
+
+    statements.clear()
+    repo.update(1, entity)
+    assert statements == []
+    session.commit()
+    assert repo.get(1) == entity
+    if tracks_stats:
+        assert repo.total(1) == entity.checkout()
+        assert repo.customer_stats(1).total_spent == pytest.approx(repo.total(1))
+        assert repo.total_drift() == []
+
+
+@pytest.mark.parametrize("repo_class, model", [
+    (SqlAlchemyOrderRepository, Order),
+    (SqlAlchemyWishlistRepository, Wishlist),
+])
+def test_update_of_untracked_entity_diffs_against_database(session, catalog, repo_class, model):
+    session.add(CustomerORM(id_=2, name="customer2"))
+    repo = repo_class(session)
+    repo.add(model(id_=1, customer=Customer(id_=1, name="customer1"), products=catalog[:3]))
+    session.commit()
+    assert repo.get(1).customer.id_ == 1
+
+    entity = model(id_=1, customer=Customer(id_=2, name="customer2"))
+    entity.add_product(catalog[1], quantity=5)
+    entity.add_product(catalog[3])
+    repo.update(1, entity)
+    session.commit()
+
+    assert repo.get(1) == entity
+    with pytest.raises(ProductsNotFoundError):
+        entity.add_product(Product(id_=1000, name="x", quantity=1, price=1))
+        repo.update(1, entity)
+    with pytest.raises(EntitiesNotFoundError):
+        repo.update(2, model(id_=2, customer=Customer(id_=1, name="customer1")))
+
+
+@pytest.fixture
+def orders(session, catalog):
+    customer = Customer(id_=1, name="customer1")
+    SqlAlchemyOrderRepository(session).add_many(
+        [Order(id_=i, customer=customer, products=catalog[i:i + 3]) for i in range(1, 51)]
+    )
+    session.commit()
+    session.expunge_all()
+
+
+@pytest.mark.parametrize("loader, queries", [("selectin", 2), ("joined", 1)])
+def test_order_list_eager_loaders(session, statements, orders, loader, queries):
+    statements.clear()
+    listed = SqlAlchemyOrderRepository(session).list(loader=loader)
+    assert len(statements) == queries
+    assert len(listed) == 50
+    assert all(len(order.lines) == 3 for order in listed)
+
+
+def test_order_list_lazy_loader_and_unknown_loader(session, statements, orders):
+    statements.clear()
+    SqlAlchemyOrderRepository(session).list(loader="lazy")
+    assert len(statements) == 51
+    with pytest.raises(ValueError):
+        SqlAlchemyOrderRepository(session).list(loader="eager")
+
+
+@pytest.mark.parametrize("repo_class", [SqlAlchemyOrderRepository, SqlAlchemyWishlistRepository])
+def test_list_headers_skips_lines(session, statements, catalog, repo_class):
+    repo = repo_class(session)
+    customer = Customer(id_=1, name="customer1")
+    model = Order if repo_class is SqlAlchemyOrderRepository else Wishlist
+    repo.add_many([model(id_=i, customer=customer, products=catalog[:5]) for i in (1, 2, 3)])
+    session.commit()
+
+    statements.clear()
+    headers = repo.list_headers([3, 1])
+    assert headers == [ProductLinesHeader(id_=1, customer=customer),
+                       ProductLinesHeader(id_=3, customer=customer)]
+    assert len(statements) == 1
+    assert "_products" not in statements[0]
+
+
+def test_order_projection_fetches_only_requested_columns(session, statements, orders):
+    repo = SqlAlchemyOrderRepository(session)
+    statements.clear()
+    rows = repo.project(["id_", "customer_name"], ids=[2, 1])
+    assert rows == [{"id_": 1, "customer_name": "customer1"},
+                    {"id_": 2, "customer_name": "customer1"}]
+    assert "products" not in statements[0]
+
+    statements.clear()
+    rows = repo.project(["id_", "line_count", "total"])
+    assert len(statements) == 1
+    assert len(rows) == 50
+    assert rows[0] == {"id_": 1, "line_count": 3, "total": repo.total(1)}
+    assert rows[0]["total"] == 900.0
+    assert [r["id_"] for r in repo.project(["id_"], id_range=(10, 12))] == [10, 11, 12]
+    with pytest.raises(ValueError):
+        repo.project(["id_", "password"])
+
+
+def test_order_add_from_wishlists_copies_lines_server_side(session, statements, catalog):
+    customer = Customer(id_=1, name="customer1")
+    SqlAlchemyWishlistRepository(session).add_many(
+        [Wishlist(id_=i, customer=customer, products=catalog[i:i + 2]) for i in (1, 2, 3)]
+    )
+    session.add(CustomerORM(id_=2, name="customer2"))
+    session.commit()
+    repo = SqlAlchemyOrderRepository(session)
+
+    statements.clear()
+    assert repo.add_from_wishlists([2], [7]) == {2: 7}
+    assert [s.split()[0] for s in statements] == [
+        "SELECT", "INSERT", "INSERT", "UPDATE", "INSERT"
+    ]
+    assert repo.add_from_wishlists([3, 1, 3]) == {1: 8, 3: 9}
+    session.commit()
+
+    assert [o.id_ for o in repo.list()] == [7, 8, 9]
+    assert repo.get(7).lines == SqlAlchemyWishlistRepository(session).get(2).lines
+    assert repo.totals([7, 8, 9]) == {7: 700.0, 8: 500.0, 9: 900.0}
+    assert not repo.add_from_wishlists([])
+    with pytest.raises(EntitiesNotFoundError):
+        repo.add_from_wishlists([1, 4])
+    with pytest.raises(ValueError):
+        repo.add_from_wishlists([1, 2], [10])
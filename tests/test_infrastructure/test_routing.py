@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from domain.models import Product
+from domain.services import ProductService
+from infrastructure.database import (
+    create_database_engine,
+    create_read_only_engine,
+    read_only_url,
+)
+from infrastructure.schema import ensure_schema
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'routing.db'}"
+    primary = create_database_engine(url)
+    ensure_schema(primary)
+    replica = create_read_only_engine(url)
+    yield primary, replica
+    replica.dispose()
+    primary.dispose()
+
+
+def _record(engine):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return executed
+
+
+def test_read_only_url_requires_sqlite_file():
+    assert read_only_url("sqlite:///warehouse.db") == (
+        "sqlite:///file:warehouse.db?mode=ro&uri=true"
+    )
+    with pytest.raises(ValueError):
+        read_only_url("sqlite://")
+
+
+def test_read_only_engine_rejects_writes(engines):
+    _, replica = engines
+    with replica.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("DELETE FROM products"))
+
+
+def test_reads_use_replica_until_unit_of_work_writes(engines):
+    primary, replica = engines
+    factory = SqlAlchemyUnitOfWorkFactory(primary).route_reads_to(replica)
+    with factory() as uow:
+        ProductService(uow).create(id_=1, name="product1", quantity=5, price=1.0)
+    primary_statements, replica_statements = _record(primary), _record(replica)
+
+    with factory() as uow:
+        service = ProductService(uow)
+        assert service.get(1).quantity == 5
+        assert uow.router.reader is uow.read_session
+        assert replica_statements == ["SELECT"]
+        assert not primary_statements
+
+        uow.product_repo.update_many(
+            [Product(id_=1, name="product1", quantity=3, price=1.0)]
+        )
+        assert uow.router.reader is uow.session
+        assert [p.quantity for p in service.list()] == [3]
+        assert replica_statements == ["SELECT"]
+
+        uow.commit()
+        assert uow.router.reader is uow.read_session
+        assert [p.quantity for p in service.list()] == [3]
+        assert replica_statements == ["SELECT", "SELECT"]
+
+
+def test_pending_objects_keep_reads_on_primary(engines):
+    primary, replica = engines
+    factory = SqlAlchemyUnitOfWorkFactory(primary).route_reads_to(replica)
+    with factory() as uow:
+        uow.product_repo.add(Product(id_=None, name="pending", quantity=1, price=1.0))
+        assert uow.router.reader is uow.session
+        assert [p.name for p in uow.product_repo.list()] == ["pending"]
+        uow.rollback()
+        assert uow.router.reader is uow.read_session
+        assert uow.product_repo.list() == []
+
+
+def test_without_read_engine_everything_uses_primary(engines):
+    primary, _ = engines
+    with SqlAlchemyUnitOfWorkFactory(primary)() as uow:
+        assert uow.router.reader is uow.session
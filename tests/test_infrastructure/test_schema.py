@@ -0,0 +1,150 @@
+import subprocess
+import sys
+from pathlib import Path
+from sqlalchemy import (
+    Column,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    event,
+    inspect,
+)
+from infrastructure.database import create_database_engine
+from infrastructure.orm import Base
+from infrastructure.schema import ensure_schema, schema_fingerprint
+from infrastructure.unit_of_work import SqlAlchemyUnitOfWorkFactory
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+    return statements
+
+
+def test_ensure_schema_skips_ddl_when_fingerprint_matches(tmp_path):
+    url = f"sqlite:///{tmp_path / 'schema.db'}"
+    engine = create_database_engine(url)
+    assert ensure_schema(engine) is True
+    assert ensure_schema(engine) is False
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    engine.dispose()
+
+    restarted = create_database_engine(url)
+    statements = count_statements(restarted)
+    assert ensure_schema(restarted) is False
+    queries = [s for s in statements if "SAVEPOINT" not in s]
+    assert queries == ["SELECT fingerprint FROM schema_fingerprint"]
+    restarted.dispose()
+
+
+def test_ensure_schema_reruns_ddl_when_metadata_changes(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    metadata = MetaData()
+    Table("first", metadata, Column("id_", Integer, primary_key=True))
+    assert ensure_schema(engine, metadata) is True
+    assert ensure_schema(engine, metadata) is False
+
+    Table("second", metadata, Column("id_", Integer, primary_key=True))
+    assert ensure_schema(engine, metadata) is True
+    assert "second" in inspect(engine).get_table_names()
+    engine.dispose()
+
+
+def test_ensure_schema_adds_columns_to_existing_tables(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    before, after = MetaData(), MetaData()
+    Table("orders", before, Column("id_", Integer, primary_key=True))
+    Table(
+        "orders",
+        after,
+        Column("id_", Integer, primary_key=True),
+        Column("total", Float, nullable=False, server_default="0"),
+    )
+    assert ensure_schema(engine, before) is True
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO orders (id_) VALUES (1)")
+
+    assert ensure_schema(engine, after) is True
+    assert [c["name"] for c in inspect(engine).get_columns("orders")] == ["id_", "total"]
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT total FROM orders").scalar() == 0
+    engine.dispose()
+
+
+def baseline_metadata():
+    metadata = MetaData()
+    Table(
+        "products",
+        metadata,
+        Column("id_", Integer, primary_key=True),
+        Column("name", String),
+        Column("quantity", Integer),
+        Column("price", Float),
+    )
+    Table("customers", metadata, Column("id_", Integer, primary_key=True))
+    for parent, lines in (("orders", "order_products"), ("wishlists", "wishlist_products")):
+        Table(
+            parent,
+            metadata,
+            Column("id_", Integer, primary_key=True),
+            Column("customer_id", Integer, ForeignKey("customers.id_")),
+        )
+        Table(
+            lines,
+            metadata,
+            Column(f"{parent[:-1]}_id", Integer, ForeignKey(f"{parent}.id_"), primary_key=True),
+            Column("product_id", Integer, ForeignKey("products.id_"), primary_key=True),
+        )
+    return metadata
+
+
+def test_ensure_schema_upgrades_a_baseline_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    engine = create_database_engine(url)
+    baseline_metadata().create_all(engine)
+    assert ensure_schema(engine) is True
+    engine.dispose()
+
+    restarted = create_database_engine(url)
+    assert ensure_schema(restarted) is False
+    inspector = inspect(restarted)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= existing
+    assert "ix_order_products_product_id" in {
+        index["name"] for index in inspector.get_indexes("order_products")
+    }
+    restarted.dispose()
+
+
+def test_fingerprint_is_stable():
+    assert schema_fingerprint() == schema_fingerprint()
+    assert len(schema_fingerprint()) == 64
+
+
+def test_unit_of_work_factory_bootstraps_on_first_use(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'lazy.db'}")
+    statements = count_statements(engine)
+    factory = SqlAlchemyUnitOfWorkFactory(engine)
+    assert not statements
+
+    with factory() as uow:
+        assert uow.customer_repo.list() == []
+    assert any("CREATE TABLE orders" in s for s in statements)
+    factory.remove()
+    engine.dispose()
+
+
+def test_entry_points_do_not_import_sqlalchemy():
+    code = "import sys, main, cli, domain.services; print('sqlalchemy' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,118 @@
+import io
+import json
+import pytest
+from sqlalchemy import select
+from cli import main
+from domain.exceptions import InvalidRecordError
+from domain.models import Customer, Order, Product
+from infrastructure.orm import CustomerORM, ProductORM
+from infrastructure.repositories import SqlAlchemyOrderRepository
+from infrastructure.transfer import (
+    detect_format,
+    export_orders,
+    import_customers,
+    import_products,
+    read_records,
+)
+
+
+def test_import_products_from_csv_upserts_in_chunks(engine, statements):
+    csv_file = io.StringIO(
+        "id_,name,quantity,price\n"
+        + "".join(f"{i},product{i},{i},{i}.5\n" for i in range(1, 6))
+    )
+    assert import_products(engine, read_records(csv_file, "csv"), chunk_size=2) == 5
+    assert sum(s.startswith("INSERT INTO products") for s in statements) == 3
+
+    jsonl_file = io.StringIO(
+        '{"id_": 2, "name": "renamed", "quantity": 7, "price": 1}\n\n'
+        '{"id_": 6, "name": "product6", "quantity": 6, "price": 6}\n'
+    )
+    assert import_products(engine, read_records(jsonl_file, "jsonl")) == 2
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(ProductORM.id_, ProductORM.name, ProductORM.quantity,
+                   ProductORM.version).order_by(ProductORM.id_)
+        ).all()
+    assert len(rows) == 6
+    assert tuple(rows[1]) == (2, "renamed", 7, 2)
+    assert tuple(rows[0]) == (1, "product1", 1, 1)
+
+
+@pytest.mark.parametrize("content, fmt, line", [
+    ("id_,name,quantity,price\n1,p,1,1\n2,p,many,1\n", "csv", 3),
+    ("id_,name,quantity,price\n1,p,-1,1\n", "csv", 2),
+    ('{"id_": 1, "name": "p", "quantity": 1, "price": 1}\n{"id_": 2}\n', "jsonl", 2),
+    ('{"id_": 1,\n', "jsonl", 1),
+])
+def test_import_reports_invalid_line(engine, content, fmt, line):
+    with pytest.raises(InvalidRecordError) as error:
+        import_products(engine, read_records(io.StringIO(content), fmt))
+    assert error.value.line == line
+
+
+def test_import_customers(engine):
+    records = read_records(io.StringIO("id_,name\n1,customer1\n2,customer2\n"), "csv")
+    assert import_customers(engine, records) == 2
+    with engine.connect() as connection:
+        assert connection.scalar(select(CustomerORM.name).where(CustomerORM.id_ == 2)) == (
+            "customer2"
+        )
+
+
+def test_export_orders_streams_jsonl(engine, session):
+    session.add(CustomerORM(id_=1, name="customer1"))
+    session.add_all(
+        ProductORM(id_=i, name=f"product{i}", quantity=1, price=10.0 * i)
+        for i in range(1, 4)
+    )
+    session.commit()
+    customer = Customer(id_=1, name="customer1")
+    products = [Product(id_=i, name=f"product{i}", quantity=1, price=10.0 * i)
+                for i in range(1, 4)]
+    order = Order(id_=1, customer=customer, products=products[:2])
+    order.add_product(products[1], quantity=2)
+    SqlAlchemyOrderRepository(session).add_many([order, Order(id_=2, customer=customer)])
+    session.commit()
+
+    out = io.StringIO()
+    assert export_orders(engine, out, batch_size=1) == 2
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records == [
+        {
+            "id_": 1,
+            "customer_id": 1,
+            "lines": [
+                {"product_id": 1, "quantity": 1, "price": 10.0},
+                {"product_id": 2, "quantity": 3, "price": 20.0},
+            ],
+            "total": 70.0,
+        },
+        {"id_": 2, "customer_id": 1, "lines": [], "total": 0},
+    ]
+
+
+def test_detect_format():
+    assert detect_format("catalog.CSV") == "csv"
+    assert detect_format("catalog.ndjson") == "jsonl"
+
+
+def test_cli_imports_and_exports(tmp_path, capsys):
+    database = f"sqlite:///{tmp_path / 'cli.db'}"
+    (tmp_path / "products.csv").write_text("id_,name,quantity,price\n1,product1,1,10\n")
+    (tmp_path / "customers.jsonl").write_text('{"id_": 1, "name": "customer1"}\n')
+
+    assert main(["--database", database, "import", "products",
+                 str(tmp_path / "products.csv")]) == 0
+    assert main(["--database", database, "import", "customers",
+                 str(tmp_path / "customers.jsonl")]) == 0
+    assert main(["--database", database, "export", "orders",
+                 str(tmp_path / "orders.jsonl")]) == 0
+    assert (tmp_path / "orders.jsonl").read_text() == ""
+    assert "imported products: 1" in capsys.readouterr().err
+
+    (tmp_path / "bad.csv").write_text("id_,name,quantity,price\nx,p,1,1\n")
+    assert main(["--database", database, "import", "products",
+                 str(tmp_path / "bad.csv")]) == 1
+    assert "line 2" in capsys.readouterr().err